@@ -0,0 +1,52 @@
+import logging
+import time
+
+from common import fake_mt5
+
+import price_action_script
+from batch_orders import place_orders
+from symbol_cache import invalidate
+
+LATENCY = 0.02
+
+# Opening N orders one place_trade at a time versus one place_orders batch,
+# with every order_send taking LATENCY seconds
+if __name__ == "__main__":
+    logging.disable(logging.ERROR)
+    print(f"{'orders':>7} {'sequential ms':>14} {'batch ms':>9} {'placed':>7}")
+    for orders in (1, 10, 50):
+        fake_mt5.reset()
+        fake_mt5.initialize()
+        fake_mt5.set_order_latency(LATENCY)
+        symbols = [f"SYM{i}" for i in range(10)]
+        for name in symbols:
+            fake_mt5.add_symbol(name)
+        intents = [
+            {
+                "symbol": symbols[i % len(symbols)],
+                "volume": 0.1,
+                "action": "BUY" if i % 2 else "SELL",
+                "stop_loss": 0.001,
+                "take_profit": 0.002,
+            }
+            for i in range(orders)
+        ]
+
+        invalidate()
+        start = time.perf_counter()
+        for intent in intents:
+            price_action_script.place_trade(
+                intent["symbol"],
+                intent["volume"],
+                intent["action"],
+                intent["stop_loss"],
+                intent["take_profit"],
+            )
+        sequential = time.perf_counter() - start
+
+        invalidate()
+        summary = place_orders(intents)
+        print(
+            f"{orders:>7} {sequential * 1000:>14.1f} {summary['elapsed_ms']:>9.1f} "
+            f"{summary['placed']:>7}"
+        )
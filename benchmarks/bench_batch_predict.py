@@ -0,0 +1,30 @@
+import tempfile
+
+from common import make_candles, make_model, timeit
+
+from price_action_script import predict_action, predict_actions_batch, preprocess_data
+
+# Per-symbol latency of predict_action in a loop vs one predict_actions_batch call
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        model_path, scaler_path = make_model(directory)
+        base = preprocess_data(make_candles(200))
+        predict_action(base, model_path, scaler_path)  # warm the model cache
+
+        print(f"{'symbols':>8} {'per-call ms/sym':>16} {'batch ms/sym':>13} {'speedup':>8}")
+        for count in (1, 10, 100, 1000):
+            frames = {f"SYM{i}": base.tail(60 + i % 50) for i in range(count)}
+
+            def per_call():
+                for df in frames.values():
+                    predict_action(df, model_path, scaler_path)
+
+            def batch():
+                predict_actions_batch(frames, model_path, scaler_path)
+
+            per_call_time = timeit(per_call, repeat=1 if count >= 100 else 3)
+            batch_time = timeit(batch)
+            print(
+                f"{count:>8} {per_call_time / count * 1e3:>16.3f} "
+                f"{batch_time / count * 1e3:>13.3f} {per_call_time / batch_time:>7.1f}x"
+            )
@@ -0,0 +1,48 @@
+import logging
+import time
+
+from common import fake_mt5
+
+from bulk_close import build_close_request, close_positions
+
+# Sequential closes (the old mt5_trade_manager loop) vs the concurrent bulk close
+ORDER_LATENCY = 0.005
+
+
+def open_positions(count, symbols=10):
+    fake_mt5.reset()
+    fake_mt5.initialize()
+    fake_mt5.set_order_latency(ORDER_LATENCY)
+    names = [f"SYM{i}" for i in range(symbols)]
+    for name in names:
+        fake_mt5.add_symbol(name)
+    for i in range(count):
+        fake_mt5.add_position(names[i % symbols], type=i % 2)
+    return fake_mt5.positions_get()
+
+
+def close_sequentially(positions):
+    for position in positions:
+        tick = fake_mt5.symbol_info_tick(position.symbol)
+        fake_mt5.order_send(build_close_request(position, tick, "Close trade via API"))
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    print(f"order_send latency: {ORDER_LATENCY * 1000:.0f} ms")
+    print(f"{'positions':>10} {'sequential ms':>14} {'bulk ms':>8} {'ticks':>6} {'speedup':>8}")
+    for count in (10, 50, 200):
+        positions = open_positions(count)
+        start = time.perf_counter()
+        close_sequentially(positions)
+        sequential = time.perf_counter() - start
+
+        positions = open_positions(count)
+        start = time.perf_counter()
+        summary = close_positions(positions, max_workers=16)
+        bulk = time.perf_counter() - start
+        assert len(summary["closed"]) == count, summary
+        print(
+            f"{count:>10} {sequential * 1000:>14.1f} {bulk * 1000:>8.1f} "
+            f"{fake_mt5.calls['symbol_info_tick']:>6} {sequential / bulk:>7.1f}x"
+        )
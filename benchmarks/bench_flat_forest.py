@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+import joblib
+import numpy as np
+
+from common import make_candles, make_model, timeit
+
+from flat_forest import FlatForest, export_forest, save_flat_forest
+from price_action_script import FEATURE_COLUMNS, preprocess_data
+
+# Flat-array forest vs joblib.load + scaler.transform + model.predict
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        model_path, scaler_path = make_model(directory, n=5000, n_estimators=100)
+        flat_path = os.path.join(directory, "price_action_model.npz")
+        model, scaler = joblib.load(model_path), joblib.load(scaler_path)
+        save_flat_forest(export_forest(model, scaler), flat_path)
+        flat = FlatForest.load(flat_path)
+
+        test = preprocess_data(make_candles(20000, seed=7))[FEATURE_COLUMNS]
+        expected = model.predict(scaler.transform(test))
+        got = flat.predict(test.to_numpy())
+        assert np.array_equal(expected, got), "flat forest disagrees with sklearn"
+        assert np.allclose(
+            model.predict_proba(scaler.transform(test)), flat.predict_proba(test.to_numpy())
+        )
+        print(f"predictions identical on {len(test)} rows")
+
+        load_sklearn = timeit(lambda: (joblib.load(model_path), joblib.load(scaler_path)))
+        load_flat = timeit(lambda: FlatForest.load(flat_path))
+        print(f"load: joblib {load_sklearn * 1000:.2f} ms, flat {load_flat * 1000:.2f} ms")
+
+        one = test.tail(1)
+        one_array = one.to_numpy()
+        for label, rows, rows_array in (
+            ("1 row", one, one_array),
+            ("1000 rows", test.tail(1000), test.tail(1000).to_numpy()),
+        ):
+            sklearn_time = timeit(lambda: model.predict(scaler.transform(rows)), repeat=20)
+            flat_time = timeit(lambda: flat.predict(rows_array), repeat=20)
+            print(
+                f"{label}: sklearn {sklearn_time * 1000:.3f} ms, "
+                f"flat {flat_time * 1000:.3f} ms ({sklearn_time / flat_time:.1f}x)"
+            )
+
+        # The full per-signal path predict_action used to take on every call
+        full = timeit(
+            lambda: joblib.load(model_path).predict(joblib.load(scaler_path).transform(one))
+        )
+        print(f"joblib.load + predict per signal: {full * 1000:.2f} ms")
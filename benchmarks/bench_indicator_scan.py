@@ -0,0 +1,56 @@
+import contextlib
+import io
+import logging
+import tempfile
+import time
+
+from common import fake_mt5
+
+import indicators
+import price_action_script
+import swing_trading
+from candle_store import CandleStore
+
+SYMBOLS = 20
+SCANS = 5
+
+
+# Both strategies over every symbol on their own timeframes (swing on M15,
+# price action on M1), in one process. In production they are separate
+# processes, and on different timeframes they share no series anyway, so
+# the cache only pays off for repeat scans within a bar in one process.
+def scan(names, store):
+    with contextlib.redirect_stdout(io.StringIO()):  # get_data prints every frame
+        for name in names:
+            swing_trading.analyze_market(name, store=store)
+            df = price_action_script.get_candlestick_data(
+                name, fake_mt5.TIMEFRAME_M1, store=store
+            )
+            price_action_script.preprocess_data(df, name, fake_mt5.TIMEFRAME_M1)
+
+
+# Several scans within one bar, with and without the shared indicator cache
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    fake_mt5.reset()
+    fake_mt5.initialize()
+    fake_mt5.set_time(1_750_000_000)
+    names = [f"SYM{i}" for i in range(SYMBOLS)]
+    for name in names:
+        fake_mt5.add_symbol(name)
+    store = CandleStore(tempfile.mkdtemp())
+    scan(names, store)  # fill the candle store first
+
+    print(f"{'cache':>8} {'first scan ms':>14} {'later scans ms':>15} {'hits':>6} {'misses':>7}")
+    for max_entries in (0, 512):
+        cache = indicators.indicator_cache = indicators.IndicatorCache(max_entries)
+        times = []
+        for _ in range(SCANS):
+            start = time.perf_counter()
+            scan(names, store)
+            times.append(time.perf_counter() - start)
+        later = sum(times[1:]) / len(times[1:])
+        print(
+            f"{'off' if max_entries == 0 else 'shared':>8} {times[0] * 1000:>14.1f} "
+            f"{later * 1000:>15.1f} {cache.hits:>6} {cache.misses:>7}"
+        )
@@ -0,0 +1,93 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from common import make_candles, timeit
+
+import kernels
+from candle_store import RATES_DTYPE
+
+
+# The pandas definitions the kernels replace, as indicators.py had them
+def pandas_sma(close, window, min_periods=None):
+    return close.rolling(window=window, min_periods=min_periods).mean().to_numpy()
+
+
+def pandas_rsi(close, period=14):
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+    loss = delta.where(delta < 0, 0).abs().rolling(window=period).mean()
+    return (100 - 100 / (1 + gain / loss)).to_numpy()
+
+
+def pandas_macd(close, short_period=12, long_period=26, signal_period=9):
+    short_ema = close.ewm(span=short_period, adjust=False).mean()
+    long_ema = close.ewm(span=long_period, adjust=False).mean()
+    line = short_ema - long_ema
+    signal = line.ewm(span=signal_period, adjust=False).mean()
+    return np.stack([line.to_numpy(), signal.to_numpy(), (line - signal).to_numpy()])
+
+
+# Same layout as mt5.copy_rates_from_pos
+def make_rates(n, seed=0):
+    candles = make_candles(n, seed)
+    rates = np.zeros(n, dtype=RATES_DTYPE)
+    rates["time"] = candles["time"].astype("int64") // 10**9
+    for name in ("open", "high", "low", "close", "tick_volume"):
+        rates[name] = candles[name].to_numpy()
+    return rates
+
+
+# What swing_trading.analyze_market used to do with the rates: build a
+# DataFrame, convert the times, then run the pandas indicators
+def analysis_pandas(rates):
+    df = pd.DataFrame(rates)
+    df["time"] = pd.to_datetime(df["time"], unit="s")
+    df.set_index("time", inplace=True)
+    close = df["close"]
+    return (
+        pandas_sma(close, 5, 1)[-2:],
+        pandas_sma(close, 20, 1)[-2:],
+        pandas_rsi(close, 14)[-1],
+        pandas_macd(close)[:, -1],
+    )
+
+
+# The same analysis on the close field of the rates array
+def analysis_kernels(rates):
+    close = rates["close"]
+    return (
+        kernels.sma(close, 5, 1)[-2:],
+        kernels.sma(close, 20, 1)[-2:],
+        kernels.rsi(close, 14, last_only=True),
+        kernels.macd(close, last_only=True),
+    )
+
+
+# Peak bytes allocated by fn()
+def peak_allocated(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+# Swing analysis over N bars: DataFrame + pandas versus kernels on the rates array
+# (tests/test_kernels.py checks that both give the same values)
+if __name__ == "__main__":
+    print(
+        f"{'bars':>6} {'pandas ms':>10} {'kernels ms':>11} "
+        f"{'pandas KiB':>11} {'kernels KiB':>12}"
+    )
+    for n in (100, 1000, 10000):
+        rates = make_rates(n)
+        pandas_time = timeit(lambda: analysis_pandas(rates), repeat=50)
+        kernel_time = timeit(lambda: analysis_kernels(rates), repeat=50)
+        pandas_peak = peak_allocated(lambda: analysis_pandas(rates))
+        kernel_peak = peak_allocated(lambda: analysis_kernels(rates))
+        print(
+            f"{n:>6} {pandas_time * 1000:>10.3f} {kernel_time * 1000:>11.3f} "
+            f"{pandas_peak / 1024:>11.1f} {kernel_peak / 1024:>12.1f}"
+        )
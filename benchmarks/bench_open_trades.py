@@ -0,0 +1,64 @@
+import json
+import logging
+import time
+
+from common import fake_mt5
+
+from mt5_trade_manager import get_open_trades
+from open_trades import ndjson_records
+
+SYMBOLS = 20
+DASHBOARD_FIELDS = "symbol,type,volume,price_open,price_current,sl,tp,profit"
+
+
+# JSON payload of one get_open_trades call, timed from positions_get to bytes
+def measure(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = fn()
+        best = min(best, time.perf_counter() - start)
+    return len(payload), best
+
+
+def as_json(**options):
+    return lambda: json.dumps(get_open_trades(**options)).encode()
+
+
+def as_ndjson(**options):
+    return lambda: b"".join(
+        (json.dumps(record) + "\n").encode()
+        for record in ndjson_records(get_open_trades(**options))
+    )
+
+
+# A dashboard poll between two ticks of a single symbol, against sending everything
+if __name__ == "__main__":
+    logging.disable(logging.ERROR)
+    print(f"{'positions':>9}  {'mode':<28} {'payload KiB':>11} {'ms':>8}")
+    for count in (10, 1000, 10000):
+        fake_mt5.reset()
+        fake_mt5.initialize()
+        names = [f"SYM{i}" for i in range(SYMBOLS)]
+        for name in names:
+            fake_mt5.add_symbol(name)
+        for i in range(count):
+            fake_mt5.add_position(names[i % SYMBOLS], type=i % 2, magic=234000 + i % 3)
+
+        token = get_open_trades(DASHBOARD_FIELDS, since="")["token"]
+
+        # Each delta is taken against the same token after one symbol moved
+        def delta():
+            return json.dumps(get_open_trades(DASHBOARD_FIELDS, since=token)).encode()
+
+        fake_mt5.set_price(names[0], 1.2)
+        modes = [
+            ("all fields (before)", as_json()),
+            ("projected", as_json(fields=DASHBOARD_FIELDS)),
+            ("projected, one magic", as_json(fields=DASHBOARD_FIELDS, magic=234000)),
+            ("delta, 1 of 20 symbols moved", delta),
+            ("all fields, NDJSON", as_ndjson()),
+        ]
+        for label, fn in modes:
+            size, seconds = measure(fn)
+            print(f"{count:>9}  {label:<28} {size / 1024:>11.1f} {seconds * 1000:>8.2f}")
@@ -0,0 +1,72 @@
+import logging
+import time
+
+import numpy as np
+
+from common import fake_mt5
+
+import order_sender
+from symbol_cache import get_tick, invalidate
+
+LATENCY = 0.005
+ORDERS = 100
+
+
+def market_order(symbol):
+    tick = get_tick(symbol, max_age=0)
+    return {
+        "action": fake_mt5.TRADE_ACTION_DEAL,
+        "symbol": symbol,
+        "volume": 0.1,
+        "type": fake_mt5.ORDER_TYPE_BUY,
+        "price": tick.ask,
+        "magic": 234000,
+        "comment": "bench",
+        "type_time": fake_mt5.ORDER_TIME_GTC,
+    }
+
+
+# What every script did before: one send, deviation 10, IOC
+def send_once(request):
+    request = dict(request, deviation=10, type_filling=fake_mt5.ORDER_FILLING_IOC)
+    return fake_mt5.order_send(request), 1
+
+
+def run(send, symbol, filling_mode, storm):
+    fake_mt5.reset()
+    fake_mt5.initialize()
+    fake_mt5.set_order_latency(LATENCY)
+    fake_mt5.add_symbol(symbol, filling_mode=filling_mode)
+    fake_mt5.set_requote_storm(storm, jitter_points=30, seed=1)
+    invalidate()
+    order_sender.reset()
+    filled, attempts, times = 0, [], []
+    for _ in range(ORDERS):
+        start = time.perf_counter()
+        result, sends = send(market_order(symbol))
+        attempts.append(sends)
+        if result is not None and result.retcode == fake_mt5.TRADE_RETCODE_DONE:
+            filled += 1
+            times.append(time.perf_counter() - start)
+    p50, p95 = np.percentile(times, [50, 95]) * 1000 if times else (np.nan, np.nan)
+    return filled / ORDERS, np.mean(attempts), p50, p95
+
+
+# Fill rate and time to fill under requote storms, and on a FOK-only symbol
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    both = fake_mt5.SYMBOL_FILLING_FOK | fake_mt5.SYMBOL_FILLING_IOC
+    cases = [(f"storm {storm:.0%}", both, storm) for storm in (0.0, 0.2, 0.5, 0.8)]
+    cases.append(("FOK only", fake_mt5.SYMBOL_FILLING_FOK, 0.0))
+    print(
+        f"{'market':<10} {'sender':<12} {'filled':>7} {'attempts':>9} "
+        f"{'p50 ms':>7} {'p95 ms':>7}"
+    )
+    for label, filling_mode, storm in cases:
+        senders = (("single send", send_once), ("send_order", order_sender.send_order))
+        for name, send in senders:
+            fill_rate, attempts, p50, p95 = run(send, "EURUSD", filling_mode, storm)
+            print(
+                f"{label:<10} {name:<12} {fill_rate:>7.0%} {attempts:>9.2f} "
+                f"{p50:>7.1f} {p95:>7.1f}"
+            )
@@ -0,0 +1,33 @@
+import logging
+
+from common import fake_mt5
+
+from position_monitor import PositionMonitor
+
+# Cycle latency of the position monitor with many positions across many symbols
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    print(f"{'positions':>10} {'symbols':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for positions, symbols in ((10, 2), (100, 10), (500, 25), (2000, 50)):
+        fake_mt5.reset()
+        fake_mt5.initialize()
+        names = [f"SYM{i}" for i in range(symbols)]
+        for name in names:
+            fake_mt5.add_symbol(name)
+        for i in range(positions):
+            fake_mt5.add_position(names[i % symbols], type=i % 2)
+
+        # Target above any profit the flat fake prices produce: measure pure monitoring
+        monitor = PositionMonitor(target_profit_usd=1e9, poll_interval=0)
+        monitor.run(max_cycles=50)
+        stats = monitor.stats()
+        print(
+            f"{positions:>10} {symbols:>8} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['max_ms']:>8.2f}"
+        )
+        calls = dict(fake_mt5.calls)
+        print(
+            f"{'':>10} terminal calls per cycle: positions_get="
+            f"{calls['positions_get'] / 50:.0f} symbol_info_tick="
+            f"{calls['symbol_info_tick'] / 50:.0f}"
+        )
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import time
+
+from common import HELPERS_DIR
+
+# Module each Node-triggered command runs, up to its first terminal call.
+# Login is a request to the long-lived trade manager worker, so its start-up
+# is the trade_manager entry; run_benchmarks times the login itself.
+COMMANDS = {
+    "price_action": "price_action_script",
+    "swing": "swing_trading",
+    "trade_manager": "mt5_trade_manager",
+}
+
+TARGET_MS = 300
+
+
+def _script(module):
+    return (
+        f"import sys; sys.path.insert(0, {HELPERS_DIR!r}); "
+        "import fake_mt5; fake_mt5.install(); "
+        f"import {module}; import MetaTrader5; MetaTrader5.initialize()"
+    )
+
+
+# Best-of-N wall time from process start to the first terminal call
+def time_to_first_call(module, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", _script(module)], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Heaviest imports made by the command's module (and by the fake terminal),
+# from `python -X importtime`, as (module, ms)
+def import_breakdown(module, top=6):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _script(module)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Each nesting level adds two spaces; keep the first two levels
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1 and name.strip() != module:
+            imports.append((name.strip(), int(cumulative) / 1000))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    print(f"{'command':>14} {'ms':>8}  heaviest imports (cumulative ms)")
+    for command, module in COMMANDS.items():
+        elapsed_ms = time_to_first_call(module) * 1000
+        flag = "" if elapsed_ms < TARGET_MS else f"  (over {TARGET_MS} ms target)"
+        print(f"{command:>14} {elapsed_ms:>8.1f}{flag}")
+        for name, ms in import_breakdown(module):
+            print(f"{'':>24}{name:<28} {ms:>8.1f}")
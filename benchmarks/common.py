@@ -0,0 +1,66 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Make the helper scripts importable and point MetaTrader5 at the fake terminal
+HELPERS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "helpers")
+sys.path.insert(0, os.path.abspath(HELPERS_DIR))
+
+import fake_mt5  # noqa: E402
+
+fake_mt5.install()
+
+
+# Synthetic M1 candles: a random walk with realistic-looking highs and lows
+def make_candles(n, seed=0, start_price=1.1, start_time=1_700_000_000, period=60):
+    rng = np.random.default_rng(seed)
+    close = start_price + np.cumsum(rng.normal(0, 1e-4, n))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    spread = np.abs(rng.normal(0, 5e-5, n))
+    return pd.DataFrame(
+        {
+            "time": pd.to_datetime(start_time + np.arange(n) * period, unit="s"),
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+            "tick_volume": rng.integers(1, 100, n),
+            "spread": np.full(n, 10),
+            "real_volume": np.zeros(n, dtype=np.int64),
+        }
+    )
+
+
+# Fit a RandomForest and scaler on synthetic candles and save them like train_model does
+def make_model(directory, n=2000, n_estimators=100, seed=0):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    import joblib
+    from price_action_script import FEATURE_COLUMNS, preprocess_data
+
+    data = preprocess_data(make_candles(n, seed))
+    target = (data["close"].shift(-1) > data["close"]).astype(int).values
+    scaler = StandardScaler()
+    features = scaler.fit_transform(data[FEATURE_COLUMNS])
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=seed)
+    model.fit(features, target)
+
+    model_path = os.path.join(directory, "price_action_model.pkl")
+    scaler_path = os.path.join(directory, "scaler.pkl")
+    joblib.dump(model, model_path)
+    joblib.dump(scaler, scaler_path)
+    return model_path, scaler_path
+
+
+# Best-of-N wall time of fn() in seconds
+def timeit(fn, repeat=5):
+    import time
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,226 @@
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from common import fake_mt5, make_candles, make_model, timeit
+
+import mt5_trade_manager
+import price_action_script
+import swing_trading
+from indicators import indicator_cache
+from model_cache import model_cache
+from session_manager import SessionManager
+from symbol_cache import invalidate
+
+# End-to-end timings of the trading scripts against the fake terminal.
+#   python run_benchmarks.py <results.json> [<baseline.json> [<threshold>]]
+# With a baseline, exits 1 when any case is slower than baseline * threshold.
+
+ORDER_LATENCY = 0.001
+DEFAULT_THRESHOLD = 1.5
+
+
+def reset_terminal(symbols=1, positions=0):
+    fake_mt5.reset()
+    fake_mt5.initialize()
+    fake_mt5.set_time(1_750_000_000)
+    fake_mt5.set_order_latency(ORDER_LATENCY)
+    names = [f"SYM{i}" for i in range(symbols)]
+    for name in names:
+        fake_mt5.add_symbol(name, volume_min=0.25, volume_step=0.25)
+    for i in range(positions):
+        fake_mt5.add_position(names[i % symbols], type=i % 2)
+    invalidate()
+    return names
+
+
+# get_data prints the tail of every frame it fetches
+def analyze_quietly(names):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [swing_trading.analyze_market(name) for name in names]
+
+
+def run_cases(directory):
+    results = {}
+
+    def record(name, seconds, **params):
+        results[name] = {"seconds": seconds, "params": params}
+        print(f"{name:<56} {seconds * 1000:>10.3f} ms")
+
+    reset_terminal()
+    for count in (100, 1000, 10000):
+        record(
+            f"get_candlestick_data[bars={count}]",
+            timeit(
+                lambda: price_action_script.get_candlestick_data(
+                    "SYM0", fake_mt5.TIMEFRAME_M1, count
+                )
+            ),
+            bars=count,
+        )
+
+    for count in (1000, 10000, 100000):
+        candles = make_candles(count)
+        record(
+            f"preprocess_data[bars={count}]",
+            timeit(lambda: price_action_script.preprocess_data(candles.copy())),
+            bars=count,
+        )
+
+    model_path, scaler_path = make_model(directory)
+    processed = price_action_script.preprocess_data(make_candles(200))
+    model_cache.invalidate()
+    record(
+        "predict_action[cold]",
+        timeit(
+            lambda: (
+                model_cache.invalidate(),
+                price_action_script.predict_action(processed, model_path, scaler_path),
+            ),
+            repeat=3,
+        ),
+    )
+    record(
+        "predict_action[cached]",
+        timeit(
+            lambda: price_action_script.predict_action(processed, model_path, scaler_path),
+            repeat=20,
+        ),
+    )
+
+    training = price_action_script.preprocess_data(make_candles(2000))
+    cwd = os.getcwd()
+    os.chdir(directory)  # train_model writes its model and search history to cwd
+    try:
+        record(
+            "train_model[bars=2000,budget=2s]",
+            timeit(
+                lambda: price_action_script.train_model(training.copy(), time_budget=2.0),
+                repeat=1,
+            ),
+            bars=2000,
+        )
+    finally:
+        os.chdir(cwd)
+
+    # Cold: every run computes its indicators; cached: the bars are unchanged
+    # since the last run, so every indicator comes from indicator_cache
+    for symbols in (1, 10):
+        names = reset_terminal(symbols)
+        record(
+            f"swing_trading.analyze_market[symbols={symbols}]",
+            timeit(lambda: (indicator_cache.clear(), analyze_quietly(names))),
+            symbols=symbols,
+        )
+        record(
+            f"swing_trading.analyze_market[symbols={symbols},cached]",
+            timeit(lambda: analyze_quietly(names)),
+            symbols=symbols,
+        )
+
+    for symbols in (1, 10):
+        names = reset_terminal(symbols)
+        record(
+            f"place_trade[symbols={symbols}]",
+            timeit(
+                lambda: [
+                    price_action_script.place_trade(name, 0.25, "BUY", 0.001, 0.002)
+                    for name in names
+                ]
+            ),
+            symbols=symbols,
+        )
+
+    # Logins as the worker serves them: a new session, a call on the active
+    # account, and calls alternating between two accounts
+    reset_terminal()
+    fake_mt5.add_account(1001, "a", "Fake-Demo")
+    fake_mt5.add_account(1002, "b", "Fake-Demo")
+    record(
+        "session_manager.open",
+        timeit(lambda: SessionManager().open(1001, "a", "Fake-Demo"), repeat=20),
+    )
+    sessions = SessionManager()
+    sessions.open(1001, "a", "Fake-Demo")
+    sessions.open(1002, "b", "Fake-Demo")
+    record(
+        "session_manager.run[reuse]",
+        timeit(lambda: sessions.run(1002, "Fake-Demo", fake_mt5.account_info), repeat=20),
+    )
+    record(
+        "session_manager.run[switch]",
+        timeit(
+            lambda: [
+                sessions.run(login, "Fake-Demo", fake_mt5.account_info)
+                for login in (1001, 1002)
+            ],
+            repeat=20,
+        )
+        / 2,
+    )
+
+    for positions in (10, 100):
+        for command in ("close_all_trades", "close_trades_in_profit", "close_trades_in_loss"):
+
+            def run_command():
+                reset_terminal(10, positions)
+                fake_mt5.set_price("SYM0", 1.2)
+                start = time.perf_counter()
+                getattr(mt5_trade_manager, command)()
+                return time.perf_counter() - start
+
+            record(
+                f"mt5_trade_manager.{command}[positions={positions}]",
+                min(run_command() for _ in range(3)),
+                positions=positions,
+            )
+    return results
+
+
+# Cases slower than baseline * threshold
+def find_regressions(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous and result["seconds"] > previous["seconds"] * threshold:
+            regressions.append((name, previous["seconds"], result["seconds"]))
+    return regressions
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python run_benchmarks.py <results.json> [<baseline.json> [<threshold>]]")
+        sys.exit(1)
+
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as directory:
+        results = run_cases(directory)
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "order_latency": ORDER_LATENCY,
+        },
+        "results": results,
+    }
+    with open(sys.argv[1], "w") as f:
+        json.dump(report, f, indent=2)
+
+    if len(sys.argv) > 2:
+        with open(sys.argv[2]) as f:
+            baseline = json.load(f)
+        threshold = float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_THRESHOLD
+        regressions = find_regressions(results, baseline, threshold)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {threshold}x baseline.")
@@ -1,37 +1,31 @@
-import { exec } from 'child_process';
-import { promisify } from 'util';
-import path from 'path';
-import { fileURLToPath } from 'url';
+import { runTradeManagerCommand } from '../helpers/mt5TradeManagerWorker.mjs';
 
-// Get current directory path
-const __filename = fileURLToPath(import.meta.url);
-const __dirname = path.dirname(__filename);
-const execPromise = promisify(exec);
-
-// Define the absolute path to the Python script
-const pythonScriptPath = path.join(__dirname, '..', 'helpers', 'mt5_trade_manager.py');
+// Account to run against, from ?login=...&server=... (the current account when omitted)
+const sessionFrom = (req) => {
+    const { login, server } = req.query;
+    return login && server ? { login: Number(login), server } : null;
+};
 
-// Route to get all open trades
+// Route to get open trades. Optional query: fields=a,b, symbol, magic, since=<token>
+// (changes since that snapshot; empty for the first call) and format=ndjson.
 const getAllOpenedTrades = async (req, res) => {
+    const { fields = null, symbol = null, magic = null, since = null, format } = req.query;
+    const args = [fields, symbol, magic === null ? null : Number(magic), since];
     try {
-        const { stdout, stderr } = await execPromise(`python "${pythonScriptPath}" get_open_trades`);
-
-        if (stderr) {
-            console.error(`Error: ${stderr}`);
-            return res.status(500).json({ error: 'Failed to retrieve open trades' });
-        }
-
-        let trades;
-        try {
-            trades = JSON.parse(stdout);
-        } catch (parseError) {
-            console.error('Parsing error:', parseError);
-            return res.status(500).json({ error: 'Failed to parse open trades data' });
+        if (format !== 'ndjson') {
+            const trades = await runTradeManagerCommand('get_open_trades', args, sessionFrom(req));
+            return res.json(trades);
         }
-
-        res.json(trades);
+        res.type('application/x-ndjson');
+        await runTradeManagerCommand('get_open_trades', args, sessionFrom(req), (record) => {
+            res.write(`${JSON.stringify(record)}\n`);
+        });
+        res.end();
     } catch (error) {
         console.error('Error:', error);
+        if (res.headersSent) {
+            return res.end();
+        }
         res.status(500).json({ error: 'Failed to retrieve open trades' });
     }
 };
@@ -39,21 +33,7 @@ const getAllOpenedTrades = async (req, res) => {
 // Route to close all open trades
 const closeAllOpenedTrades = async (req, res) => {
     try {
-        const { stdout, stderr } = await execPromise(`python "${pythonScriptPath}" close_all_trades`);
-
-        if (stderr) {
-            console.error(`Error: ${stderr}`);
-            return res.status(500).json({ error: 'Failed to close all trades' });
-        }
-
-        let result;
-        try {
-            result = JSON.parse(stdout);
-        } catch (parseError) {
-            console.error('Parsing error:', parseError);
-            return res.status(500).json({ error: 'Failed to parse close all trades result' });
-        }
-
+        const result = await runTradeManagerCommand('close_all_trades', [], sessionFrom(req));
         res.json(result);
     } catch (error) {
         console.error('Error:', error);
@@ -64,21 +44,7 @@ const closeAllOpenedTrades = async (req, res) => {
 // Route to check if autotrade is active
 const checkAutotradeStatus = async (req, res) => {
     try {
-        const { stdout, stderr } = await execPromise(`python "${pythonScriptPath}" is_autotrade_active`);
-
-        if (stderr) {
-            console.error(`Error: ${stderr}`);
-            return res.status(500).json({ error: 'Failed to retrieve autotrade status' });
-        }
-
-        let status;
-        try {
-            status = JSON.parse(stdout);
-        } catch (parseError) {
-            console.error('Parsing error:', parseError);
-            return res.status(500).json({ error: 'Failed to parse autotrade status' });
-        }
-
+        const status = await runTradeManagerCommand('is_autotrade_active', [], sessionFrom(req));
         res.json(status);
     } catch (error) {
         console.error('Error:', error);
@@ -94,22 +60,7 @@ const setAutotradeStatus = async (req, res) => {
             return res.status(400).json({ error: 'Invalid status value' });
         }
 
-        const statusStr = status ? 'true' : 'false'; // Convert boolean to string
-        const { stdout, stderr } = await execPromise(`python "${pythonScriptPath}" set_autotrade ${statusStr}`);
-
-        if (stderr) {
-            console.error(`Error: ${stderr}`);
-            return res.status(500).json({ error: 'Failed to set autotrade status' });
-        }
-
-        let result;
-        try {
-            result = JSON.parse(stdout);
-        } catch (parseError) {
-            console.error('Parsing error:', parseError);
-            return res.status(500).json({ error: 'Failed to parse set autotrade result' });
-        }
-
+        const result = await runTradeManagerCommand('set_autotrade', [status], sessionFrom(req));
         res.json(result);
     } catch (error) {
         console.error('Error:', error);
@@ -120,21 +71,7 @@ const setAutotradeStatus = async (req, res) => {
 // Route to close all trades in profit
 const closeAllTradesInProfit = async (req, res) => {
     try {
-        const { stdout, stderr } = await execPromise(`python "${pythonScriptPath}" close_trades_in_profit`);
-
-        if (stderr) {
-            console.error(`Error: ${stderr}`);
-            return res.status(500).json({ error: 'Failed to close all trades in profit' });
-        }
-
-        let result;
-        try {
-            result = JSON.parse(stdout);
-        } catch (parseError) {
-            console.error('Parsing error:', parseError);
-            return res.status(500).json({ error: 'Failed to parse close trades in profit result' });
-        }
-
+        const result = await runTradeManagerCommand('close_trades_in_profit', [], sessionFrom(req));
         res.json(result);
     } catch (error) {
         console.error('Error:', error);
@@ -145,21 +82,7 @@ const closeAllTradesInProfit = async (req, res) => {
 // Route to close all trades in loss
 const closeAllTradesInLoss = async (req, res) => {
     try {
-        const { stdout, stderr } = await execPromise(`python "${pythonScriptPath}" close_trades_in_loss`);
-
-        if (stderr) {
-            console.error(`Error: ${stderr}`);
-            return res.status(500).json({ error: 'Failed to close all trades in loss' });
-        }
-
-        let result;
-        try {
-            result = JSON.parse(stdout);
-        } catch (parseError) {
-            console.error('Parsing error:', parseError);
-            return res.status(500).json({ error: 'Failed to parse close trades in loss result' });
-        }
-
+        const result = await runTradeManagerCommand('close_trades_in_loss', [], sessionFrom(req));
         res.json(result);
     } catch (error) {
         console.error('Error:', error);
@@ -0,0 +1,198 @@
+import json
+import logging
+import sys
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from model_cache import load_model_and_scaler
+from price_action_script import FEATURE_COLUMNS, preprocess_data
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Minimum SL/TP distance in points, same floor as calculate_sltp
+MIN_STOP_POINTS = 10
+
+
+# Load bar history from a CSV file or a NumPy (.npy structured array / .npz) file
+def load_history(path):
+    if path.endswith(".csv"):
+        df = pd.read_csv(path)
+    else:
+        data = np.load(path, allow_pickle=False)
+        if isinstance(data, np.lib.npyio.NpzFile):
+            df = pd.DataFrame({name: data[name] for name in data.files})
+        else:
+            df = pd.DataFrame(data)
+    if pd.api.types.is_numeric_dtype(df["time"]):
+        df["time"] = pd.to_datetime(df["time"], unit="s")
+    else:
+        df["time"] = pd.to_datetime(df["time"])
+    return df
+
+
+# Model decisions for every bar in one predict_proba pass
+def predict_all(data, model_path="price_action_model.pkl", scaler_path="scaler.pkl"):
+    model, scaler = load_model_and_scaler(model_path, scaler_path)
+    features_scaled = scaler.transform(data[FEATURE_COLUMNS])
+    probabilities = model.predict_proba(features_scaled)
+    return np.asarray(model.classes_)[probabilities.argmax(axis=1)]
+
+
+# Resolve SL/TP exits for a trade opened at the close of a signal bar. One
+# trade is open at a time: signals before the open trade's exit bar are skipped.
+def simulate_trades(
+    data,
+    predictions,
+    stop_loss_pips,
+    take_profit_pips,
+    point,
+    max_hold=1,
+    volume=1.0,
+    contract_size=100000.0,
+    spread_points=0.0,
+):
+    close = data["close"].to_numpy(dtype=float)
+    high = data["high"].to_numpy(dtype=float)
+    low = data["low"].to_numpy(dtype=float)
+    n = len(close) - max_hold
+    if n <= 0:
+        return pd.DataFrame()
+
+    direction = np.where(predictions[:n] == 1, 1.0, -1.0)
+    entry = close[:n]
+    stop_distance = max(stop_loss_pips * point, MIN_STOP_POINTS * point)
+    target_distance = max(take_profit_pips * point, MIN_STOP_POINTS * point)
+    sl = entry - direction * stop_distance
+    tp = entry + direction * target_distance
+
+    # Rows: signal bar, columns: the max_hold bars after it
+    future_high = sliding_window_view(high[1:], max_hold)[:n]
+    future_low = sliding_window_view(low[1:], max_hold)[:n]
+    is_buy = (direction > 0)[:, None]
+    hit_sl = np.where(is_buy, future_low <= sl[:, None], future_high >= sl[:, None])
+    hit_tp = np.where(is_buy, future_high >= tp[:, None], future_low <= tp[:, None])
+
+    any_sl = hit_sl.any(axis=1)
+    any_tp = hit_tp.any(axis=1)
+    first_sl = np.where(any_sl, hit_sl.argmax(axis=1), max_hold)
+    first_tp = np.where(any_tp, hit_tp.argmax(axis=1), max_hold)
+    # When both levels fall inside the same bar, assume the stop was hit first
+    stopped = any_sl & (first_sl <= first_tp)
+    took_profit = any_tp & ~stopped
+    offset = np.where(stopped, first_sl, np.where(took_profit, first_tp, max_hold - 1))
+
+    exit_index = np.arange(n) + 1 + offset
+    exit_price = np.where(
+        stopped, sl, np.where(took_profit, tp, close[np.arange(n) + max_hold])
+    )
+    pnl = (
+        ((exit_price - entry) * direction - spread_points * point)
+        * volume
+        * contract_size
+    )
+
+    # Every signal's exit is known up front, so walking from one trade's exit
+    # bar to the next takes one step per trade actually opened
+    taken = []
+    i = 0
+    while i < n:
+        taken.append(i)
+        i = exit_index[i]
+    taken = np.asarray(taken, dtype=np.int64)
+
+    times = data["time"].to_numpy()
+    reasons = np.where(stopped, "sl", np.where(took_profit, "tp", "time"))
+    return pd.DataFrame(
+        {
+            "entry_time": times[taken],
+            "exit_time": times[exit_index[taken]],
+            "action": np.where(direction[taken] > 0, "BUY", "SELL"),
+            "entry": entry[taken],
+            "exit": exit_price[taken],
+            "sl": sl[taken],
+            "tp": tp[taken],
+            "exit_reason": reasons[taken],
+            "pnl": pnl[taken],
+            "exit_index": exit_index[taken],
+        }
+    )
+
+
+# Summary statistics and equity curve for a trade list
+def summarize(trades, initial_balance=10000.0):
+    if trades.empty:
+        return {"trades": 0}, np.array([initial_balance])
+
+    ordered = trades.sort_values("exit_index", kind="stable")
+    equity = initial_balance + np.cumsum(ordered["pnl"].to_numpy())
+    peaks = np.maximum.accumulate(np.concatenate([[initial_balance], equity]))[1:]
+    drawdown = peaks - equity
+    wins = trades["pnl"] > 0
+
+    summary = {
+        "trades": int(len(trades)),
+        "hit_rate": float(wins.mean()),
+        "net_profit": float(trades["pnl"].sum()),
+        "average_win": float(trades.loc[wins, "pnl"].mean()) if wins.any() else 0.0,
+        "average_loss": (
+            float(trades.loc[~wins, "pnl"].mean()) if (~wins).any() else 0.0
+        ),
+        "max_drawdown": float(drawdown.max()),
+        "max_drawdown_pct": float((drawdown / peaks).max() * 100),
+        "final_equity": float(equity[-1]),
+        "exits": trades["exit_reason"].value_counts().to_dict(),
+    }
+    return summary, equity
+
+
+# Full pipeline: features, batch predictions, SL/TP resolution and report
+def run_backtest(
+    history,
+    stop_loss_pips,
+    take_profit_pips,
+    point,
+    model_path="price_action_model.pkl",
+    scaler_path="scaler.pkl",
+    max_hold=1,
+    volume=1.0,
+    contract_size=100000.0,
+    spread_points=0.0,
+    initial_balance=10000.0,
+):
+    data = preprocess_data(history.copy()).reset_index(drop=True)
+    predictions = predict_all(data, model_path, scaler_path)
+    trades = simulate_trades(
+        data,
+        predictions,
+        stop_loss_pips,
+        take_profit_pips,
+        point,
+        max_hold=max_hold,
+        volume=volume,
+        contract_size=contract_size,
+        spread_points=spread_points,
+    )
+    summary, equity = summarize(trades, initial_balance)
+    return {"summary": summary, "equity": equity, "trades": trades}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print(
+            "Usage: python backtest.py <history.csv|.npy> <stop_loss_pips> <take_profit_pips> [point] [max_hold] [trades.csv]"
+        )
+        sys.exit(1)
+
+    history = load_history(sys.argv[1])
+    point = float(sys.argv[4]) if len(sys.argv) > 4 else 0.00001
+    max_hold = int(sys.argv[5]) if len(sys.argv) > 5 else 1
+
+    result = run_backtest(
+        history, float(sys.argv[2]), float(sys.argv[3]), point, max_hold=max_hold
+    )
+    if len(sys.argv) > 6:
+        result["trades"].to_csv(sys.argv[6], index=False)
+    print(json.dumps(result["summary"]))
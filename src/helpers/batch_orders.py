@@ -0,0 +1,181 @@
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+
+import MetaTrader5 as mt5
+from execution_log import start_execution
+from order_sender import send_order
+from symbol_cache import get_symbol_info, get_tick, invalidate
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+# Whether each volume is a whole number of lot steps, allowing for float error
+# (0.1 % 0.01 is not 0 in binary floating point)
+def volume_step_ok(volume, step, tolerance=1e-7):
+    steps = np.asarray(volume, dtype=float) / np.asarray(step, dtype=float)
+    return np.abs(steps - np.round(steps)) <= tolerance
+
+
+# Check every intent at once and build the order requests for the valid ones.
+# Intents are dicts with symbol, volume, action ("BUY"/"SELL") and stop_loss /
+# take_profit as price distances from the entry, as in place_trade.
+def prepare_orders(intents, comment="Trade via API"):
+    symbols = sorted({intent["symbol"] for intent in intents})
+    infos, ticks = {}, {}
+    for symbol in symbols:
+        info = get_symbol_info(symbol)
+        if info is not None and not info.visible:
+            invalidate(symbol)
+            info = None
+        infos[symbol] = info
+        ticks[symbol] = get_tick(symbol) if info is not None else None
+
+    n = len(intents)
+    reasons = [None] * n
+    known = np.zeros(n, dtype=bool)
+    fields = (
+        "bid", "ask", "point", "stop_level", "volume_min", "volume_max", "volume_step"
+    )
+    columns = {name: np.zeros(n) for name in fields}
+    for i, intent in enumerate(intents):
+        info, tick = infos[intent["symbol"]], ticks[intent["symbol"]]
+        if info is None:
+            reasons[i] = f"Symbol {intent['symbol']} is not available or not visible."
+        elif tick is None:
+            reasons[i] = f"Failed to get tick info for symbol {intent['symbol']}."
+        else:
+            known[i] = True
+            columns["bid"][i], columns["ask"][i] = tick.bid, tick.ask
+            for name in fields[2:]:
+                columns[name][i] = getattr(info, name)
+
+    actions = np.array([str(intent["action"]).upper() for intent in intents])
+    volume = np.array([intent["volume"] for intent in intents], dtype=float)
+    stop_distance = np.array([intent["stop_loss"] for intent in intents], dtype=float)
+    target_distance = np.array([intent["take_profit"] for intent in intents], dtype=float)
+
+    is_buy = actions == "BUY"
+    price = np.where(is_buy, columns["ask"], columns["bid"])
+    direction = np.where(is_buy, 1.0, -1.0)
+    # Stops closer than the broker's stop level are pushed out to it
+    min_stop = columns["stop_level"] * columns["point"]
+    sl = price - direction * np.maximum(stop_distance, min_stop)
+    tp = price + direction * np.maximum(target_distance, min_stop)
+
+    checks = [
+        (~np.isin(actions, ["BUY", "SELL"]), "Invalid action"),
+        (
+            (volume < columns["volume_min"])
+            | (volume > columns["volume_max"])
+            | ~volume_step_ok(volume, np.where(known, columns["volume_step"], 1.0)),
+            "Invalid volume",
+        ),
+        (price <= 0, "Invalid price"),
+        ((sl <= 0) | (tp <= 0), "Invalid SL or TP values after adjustment"),
+    ]
+    for failed, reason in checks:
+        for i in np.flatnonzero(failed & known):
+            if reasons[i] is None:
+                reasons[i] = reason
+
+    requests = [None] * n
+    for i, intent in enumerate(intents):
+        if reasons[i] is not None:
+            continue
+        requests[i] = {
+            "action": mt5.TRADE_ACTION_DEAL,
+            "symbol": intent["symbol"],
+            "volume": float(volume[i]),
+            "type": mt5.ORDER_TYPE_BUY if is_buy[i] else mt5.ORDER_TYPE_SELL,
+            "price": float(price[i]),
+            "sl": float(sl[i]),
+            "tp": float(tp[i]),
+            "magic": 234000,
+            "comment": comment,
+            "type_time": mt5.ORDER_TIME_GTC,
+        }
+    return requests, reasons
+
+
+def _send(request, execution):
+    result, attempts = send_order(request, execution)
+    if result is None:
+        return None, f"No response from order_send: {mt5.last_error()}", None, attempts
+    return result.retcode, result.comment, result.order, attempts
+
+
+# Validate a batch of trade intents and send the valid ones concurrently;
+# returns one result per intent, in order
+def place_orders(intents, comment="Trade via API", max_workers=64):
+    start = time.perf_counter()
+    execution = start_execution()
+    requests, reasons = prepare_orders(intents, comment)
+    execution.built()
+    results = [
+        {
+            "symbol": intent["symbol"],
+            "action": str(intent["action"]).upper(),
+            "volume": intent["volume"],
+        }
+        for intent in intents
+    ]
+    for result, reason in zip(results, reasons):
+        if reason is not None:
+            result.update(status="rejected", reason=reason)
+            logging.error(f"Rejected {result['action']} {result['symbol']}: {reason}")
+
+    to_send = [i for i, request in enumerate(requests) if request is not None]
+    if to_send:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(to_send))) as pool:
+            sent = pool.map(
+                partial(_send, execution=execution), [requests[i] for i in to_send]
+            )
+            for i, (retcode, result_comment, order, attempts) in zip(to_send, sent):
+                request = requests[i]
+                results[i].update(
+                    price=request["price"],
+                    sl=request["sl"],
+                    tp=request["tp"],
+                    retcode=retcode,
+                    comment=result_comment,
+                    attempts=attempts,
+                )
+                if retcode == mt5.TRADE_RETCODE_DONE:
+                    results[i].update(status="placed", order=order)
+                else:
+                    results[i]["status"] = "failed"
+                    logging.error(
+                        f"Order send failed for {request['symbol']}, "
+                        f"retcode = {retcode}. Comment: {result_comment}"
+                    )
+
+    placed = sum(result["status"] == "placed" for result in results)
+    logging.info(f"Placed {placed} of {len(intents)} orders")
+    return {
+        "results": results,
+        "placed": placed,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python batch_orders.py <intents.json>")
+        sys.exit(1)
+
+    with open(sys.argv[1]) as f:
+        intents = json.load(f)
+    if not mt5.initialize():
+        print(json.dumps({"error": f"initialize() failed: {mt5.last_error()}"}))
+        sys.exit(1)
+    try:
+        print(json.dumps(place_orders(intents)))
+    finally:
+        mt5.shutdown()
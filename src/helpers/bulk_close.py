@@ -0,0 +1,133 @@
+import logging
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import MetaTrader5 as mt5
+from execution_log import new_order, start_execution
+from order_sender import send_order
+from symbol_cache import get_tick
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Retcodes that mean there is nothing left to close
+ALREADY_CLOSED = {getattr(mt5, "TRADE_RETCODE_POSITION_CLOSED", 10036)}
+
+
+def build_close_request(position, tick, comment):
+    is_buy = position.type == mt5.ORDER_TYPE_BUY
+    return {
+        "action": mt5.TRADE_ACTION_DEAL,
+        "symbol": position.symbol,
+        "volume": position.volume,
+        "type": mt5.ORDER_TYPE_SELL if is_buy else mt5.ORDER_TYPE_BUY,
+        "position": position.ticket,
+        "price": tick.bid if is_buy else tick.ask,
+        "magic": 234000,
+        "comment": comment,
+        "type_time": mt5.ORDER_TIME_GTC,
+    }
+
+
+# Send one close; `earlier` is how many sends the position already had
+def _send(request, earlier, order, execution):
+    result, attempts = send_order(
+        request, execution, first_attempt=earlier + 1, order=order
+    )
+    if result is None:
+        comment = f"No response from order_send: {mt5.last_error()}"
+        return request["position"], None, comment, attempts
+    return request["position"], result.retcode, result.comment, attempts
+
+
+# Close positions concurrently: one tick per symbol, a bounded pool of order_send
+# calls, and up to `retries` extra rounds for failures with a fresh tick (logged
+# as further attempts of the same order, priced at the first round's tick)
+def close_positions(positions, comment="Close trade via API", max_workers=8, retries=2):
+    start = time.perf_counter()
+    execution = start_execution()
+    closed, skipped = [], []
+    failed = {}
+    attempts = Counter()  # order_send calls per ticket
+    orders = {}  # ticket -> execution_log.Order, kept across rounds
+    pending = list(positions)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            by_symbol = defaultdict(list)
+            for position in pending:
+                by_symbol[position.symbol].append(position)
+
+            requests = []
+            for symbol, symbol_positions in by_symbol.items():
+                tick = get_tick(symbol, max_age=0)
+                if tick is None:
+                    logging.error(f"Failed to get symbol tick info for {symbol}")
+                    for position in symbol_positions:
+                        failed[position.ticket] = {
+                            "ticket": position.ticket,
+                            "retcode": None,
+                            "comment": f"No tick for {symbol}",
+                        }
+                    continue
+                requests.extend(
+                    build_close_request(position, tick, comment)
+                    for position in symbol_positions
+                )
+
+            execution.built()
+            by_ticket = {position.ticket: position for position in pending}
+            pending = []
+            earlier = [attempts[request["position"]] for request in requests]
+            round_orders = [
+                orders.setdefault(request["position"], new_order(request))
+                for request in requests
+            ]
+            sent = pool.map(
+                partial(_send, execution=execution), requests, earlier, round_orders
+            )
+            for ticket, retcode, result_comment, sends in sent:
+                attempts[ticket] += sends
+                if retcode == mt5.TRADE_RETCODE_DONE:
+                    closed.append(ticket)
+                    failed.pop(ticket, None)
+                    logging.info(f"Successfully closed position {ticket}")
+                elif retcode in ALREADY_CLOSED:
+                    skipped.append({"ticket": ticket, "reason": result_comment})
+                    failed.pop(ticket, None)
+                else:
+                    failed[ticket] = {
+                        "ticket": ticket,
+                        "retcode": retcode,
+                        "comment": result_comment,
+                        "attempts": attempts[ticket],
+                    }
+                    pending.append(by_ticket[ticket])
+            if pending and attempt < retries:
+                logging.warning(f"Retrying {len(pending)} failed close(s)")
+
+    for failure in failed.values():
+        logging.error(
+            f"Failed to close position {failure['ticket']}: {failure['comment']}"
+        )
+    return {
+        "closed": closed,
+        "failed": list(failed.values()),
+        "skipped": skipped,
+        "attempts": dict(attempts),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+# Close every open position matching `predicate` (all positions when None)
+def bulk_close(predicate=None, comment="Close trade via API", **kwargs):
+    positions = mt5.positions_get()
+    if positions is None:
+        logging.error("Failed to retrieve positions.")
+        return {"error": "Failed to retrieve positions."}
+    selected = [p for p in positions if predicate is None or predicate(p)]
+    return close_positions(selected, comment=comment, **kwargs)
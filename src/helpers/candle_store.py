@@ -0,0 +1,268 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import MetaTrader5 as mt5
+import numpy as np
+from file_lock import lock_file, unlock_file
+from resample import BarResampler
+
+# Where the store lives unless told otherwise: MT5_CANDLE_STORE, or a
+# candle_store directory next to this file (not the caller's cwd, so every
+# strategy process shares the same files)
+DEFAULT_ROOT = os.environ.get("MT5_CANDLE_STORE") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "candle_store"
+)
+
+# Layout of the arrays returned by mt5.copy_rates_*
+RATES_DTYPE = np.dtype(
+    [
+        ("time", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("tick_volume", "<u8"),
+        ("spread", "<i4"),
+        ("real_volume", "<u8"),
+    ]
+)
+
+# Seconds per bar for the timeframes the strategies use
+TIMEFRAME_SECONDS = {
+    mt5.TIMEFRAME_M1: 60,
+    mt5.TIMEFRAME_M5: 300,
+    mt5.TIMEFRAME_M15: 900,
+    mt5.TIMEFRAME_M30: 1800,
+    mt5.TIMEFRAME_H1: 3600,
+    mt5.TIMEFRAME_H4: 14400,
+    mt5.TIMEFRAME_D1: 86400,
+}
+
+
+# Timeframes get_rates builds from the stored M1 series instead of asking the terminal
+DERIVED_TIMEFRAMES = (
+    mt5.TIMEFRAME_M5,
+    mt5.TIMEFRAME_M15,
+    mt5.TIMEFRAME_H1,
+    mt5.TIMEFRAME_H4,
+)
+
+
+def _as_rates(rates):
+    if rates is None or len(rates) == 0:
+        return np.empty(0, dtype=RATES_DTYPE)
+    return np.asarray(rates).astype(RATES_DTYPE, copy=False)
+
+
+def _utc(timestamp):
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
+
+
+class CandleStore:
+    """On-disk bar history per (symbol, timeframe).
+
+    Each series is a flat file of RATES_DTYPE records, read through a
+    read-only memory map so windows are zero-copy slices. sync() only asks
+    the terminal for bars newer than the last stored one.
+
+    Several strategy processes share the files, so every read-modify-write
+    holds the series' lock file, and files are only ever overwritten in
+    place and grown (never replaced or truncated, which Windows refuses
+    while another process has them mapped).
+    """
+
+    def __init__(self, root=None, initial_count=1000, probe_count=16):
+        self.root = root or DEFAULT_ROOT
+        self.initial_count = initial_count
+        self.probe_count = probe_count
+        self.maps = {}
+        self.resamplers = {}
+        self.held = {}  # (symbol, timeframe) -> [lock file, depth]
+        self.thread_lock = threading.RLock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, symbol, timeframe):
+        return os.path.join(self.root, f"{symbol}_{timeframe}.bin")
+
+    # Hold the series' lock (re-entrant within the process). The cached map is
+    # dropped on entry so what other processes wrote meanwhile is seen.
+    @contextmanager
+    def lock(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        with self.thread_lock:
+            held = self.held.get(key)
+            if held is None:
+                f = open(self.path(symbol, timeframe) + ".lock", "a+b")
+                try:
+                    lock_file(f)
+                except BaseException:
+                    f.close()
+                    raise
+                held = self.held[key] = [f, 0]
+                self.maps.pop(key, None)
+            held[1] += 1
+            try:
+                yield
+            finally:
+                held[1] -= 1
+                if held[1] == 0:
+                    del self.held[key]
+                    try:
+                        unlock_file(held[0])
+                    finally:
+                        held[0].close()
+
+    # All stored bars as a read-only memory map (empty array if none)
+    def bars(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self.maps:
+            path = self.path(symbol, timeframe)
+            if os.path.exists(path) and os.path.getsize(path) >= RATES_DTYPE.itemsize:
+                self.maps[key] = np.memmap(path, dtype=RATES_DTYPE, mode="r")
+            else:
+                self.maps[key] = np.empty(0, dtype=RATES_DTYPE)
+        return self.maps[key]
+
+    # Last `count` stored bars, without copying
+    def window(self, symbol, timeframe, count):
+        return self.bars(symbol, timeframe)[-count:]
+
+    # Overwrite the file from bar `offset` on (the caller holds the lock)
+    def _write_at(self, symbol, timeframe, offset, rates):
+        self.maps.pop((symbol, timeframe), None)
+        path = self.path(symbol, timeframe)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(offset * RATES_DTYPE.itemsize)
+            f.write(rates.tobytes())
+
+    # Replace every stored bar from new_rates[0]["time"] on with new_rates
+    def _write(self, symbol, timeframe, new_rates):
+        if len(new_rates) == 0:
+            return
+        existing = self.bars(symbol, timeframe)
+        keep = int(np.searchsorted(existing["time"], new_rates["time"][0]))
+        del existing
+        # new_rates always reaches the last stored bar, so the file only grows;
+        # overwriting in place keeps existing read-only maps valid
+        self._write_at(symbol, timeframe, keep, new_rates)
+
+    # Bring the store up to date with the terminal; returns the number of bars fetched
+    def sync(self, symbol, timeframe):
+        with self.lock(symbol, timeframe):
+            return self._sync(symbol, timeframe)
+
+    def _sync(self, symbol, timeframe):
+        existing = self.bars(symbol, timeframe)
+        if len(existing) == 0:
+            rates = _as_rates(
+                mt5.copy_rates_from_pos(symbol, timeframe, 0, self.initial_count)
+            )
+            self._write(symbol, timeframe, rates)
+            return len(rates)
+
+        last_time = int(existing["time"][-1])
+        rates = _as_rates(mt5.copy_rates_from_pos(symbol, timeframe, 0, self.probe_count))
+        if len(rates) == 0:
+            logging.error(
+                f"Failed to retrieve data for {symbol}. Error: {mt5.last_error()}"
+            )
+            return 0
+
+        if rates["time"][0] > last_time:
+            # The probe does not reach back to what we have: fetch the gap
+            missing = _as_rates(
+                mt5.copy_rates_range(
+                    symbol, timeframe, _utc(last_time), _utc(rates["time"][0])
+                )
+            )
+            rates = np.concatenate([missing[missing["time"] < rates["time"][0]], rates])
+
+        # The last stored bar may have still been forming, so it is rewritten too
+        rates = rates[rates["time"] >= last_time]
+        del existing
+        self._write(symbol, timeframe, rates)
+        return len(rates)
+
+    # Stored bars further apart than one period (weekends show up here too)
+    def find_gaps(self, symbol, timeframe):
+        times = self.bars(symbol, timeframe)["time"]
+        period = TIMEFRAME_SECONDS[timeframe]
+        holes = np.nonzero(np.diff(times) > period)[0]
+        return [(int(times[i]), int(times[i + 1])) for i in holes]
+
+    # Ask the terminal for bars inside each hole and merge whatever it has
+    def fill_gaps(self, symbol, timeframe):
+        with self.lock(symbol, timeframe):
+            found = [
+                _as_rates(
+                    mt5.copy_rates_range(
+                        symbol, timeframe, _utc(start + 1), _utc(end - 1)
+                    )
+                )
+                for start, end in self.find_gaps(symbol, timeframe)
+            ]
+            found = [rates for rates in found if len(rates)]
+            if not found:
+                return 0
+            self._rewrite(symbol, timeframe, np.concatenate(found))
+            return sum(len(rates) for rates in found)
+
+    # Extend the stored history further into the past
+    def backfill(self, symbol, timeframe, count):
+        with self.lock(symbol, timeframe):
+            first = self.bars(symbol, timeframe)["time"][:1]
+            if len(first) == 0:
+                return 0
+            first = int(first[0])
+            period = TIMEFRAME_SECONDS[timeframe]
+            older = _as_rates(
+                mt5.copy_rates_from(symbol, timeframe, _utc(first - period), count)
+            )
+            older = older[older["time"] < first]
+            if len(older):
+                self._rewrite(symbol, timeframe, older)
+            return len(older)
+
+    # Merge bars anywhere in the series (rare: full rewrite of the file, in
+    # place since the merged series is never shorter; the caller holds the lock)
+    def _rewrite(self, symbol, timeframe, rates):
+        merged = np.concatenate([np.array(self.bars(symbol, timeframe)), rates])
+        _, unique = np.unique(merged["time"][::-1], return_index=True)
+        merged = merged[::-1][unique]  # sorted by time, newest copy wins
+        self._write_at(symbol, timeframe, 0, merged)
+
+
+# Sync a series and return a copy of its last `count` bars (a copy, since
+# another process may rewrite the file once the lock is released)
+def get_rates(store, symbol, timeframe, count):
+    if timeframe in DERIVED_TIMEFRAMES:
+        return get_resampled_rates(store, symbol, timeframe, count)
+    with store.lock(symbol, timeframe):
+        store.sync(symbol, timeframe)
+        return np.array(store.window(symbol, timeframe, count))
+
+
+# Higher-timeframe bars built from the symbol's M1 series, so every timeframe
+# comes from one terminal stream and agrees with the others
+def get_resampled_rates(store, symbol, timeframe, count):
+    period = TIMEFRAME_SECONDS[timeframe]
+    # One extra bar's worth of minutes in case the oldest bar starts mid-window
+    needed = (count + 1) * period // 60
+    with store.lock(symbol, mt5.TIMEFRAME_M1):
+        store.sync(symbol, mt5.TIMEFRAME_M1)
+        stored = len(store.bars(symbol, mt5.TIMEFRAME_M1))
+        if 0 < stored < needed:
+            store.backfill(symbol, mt5.TIMEFRAME_M1, needed - stored)
+        m1 = store.bars(symbol, mt5.TIMEFRAME_M1)
+
+        key = (symbol, timeframe)
+        resampler = store.resamplers.get(key)
+        if resampler is None or len(resampler.closed) + 1 < count:
+            resampler = store.resamplers[key] = BarResampler(period)
+            resampler.update(m1[-needed:])
+        else:
+            resampler.update(m1[np.searchsorted(m1["time"], resampler.last_time) :])
+        return resampler.bars(count)
@@ -0,0 +1,26 @@
+import time
+
+# Time source for the trading loops. It follows the wall clock unless a
+# replay installs a virtual clock (any object with now() and sleep()).
+_clock = None
+
+
+def set_clock(clock):
+    global _clock
+    _clock = clock
+
+
+def now():
+    return _clock.now() if _clock is not None else time.time()
+
+
+# For measuring intervals: never jumps with wall-clock changes when live
+def monotonic():
+    return _clock.now() if _clock is not None else time.monotonic()
+
+
+def sleep(seconds):
+    if _clock is not None:
+        _clock.sleep(seconds)
+    else:
+        time.sleep(seconds)
@@ -0,0 +1,237 @@
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+
+import MetaTrader5 as mt5
+import clock
+from symbol_cache import get_symbol_info
+
+# Set MT5_EXECUTION_LOG to a file path to record every deal sent through
+# Execution.send, e.g. MT5_EXECUTION_LOG=executions.bin. Decided at import
+# time; when off, send() is a plain order_send plus a few clock reads.
+LOG_PATH = os.environ.get("MT5_EXECUTION_LOG")
+ENABLED = bool(LOG_PATH)
+
+# One fixed-size record per order_send, appended to the log file as is. The
+# sends of one order share its id and original price.
+EXECUTION_DTYPE = np.dtype(
+    [
+        ("time", "<f8"),  # start, epoch seconds (the replay clock in replays)
+        ("order", "<u8"),  # order id, the same on every attempt of the order
+        ("built_us", "<u4"),  # request built, microseconds after the start
+        ("sent_us", "<u4"),  # handed to order_send
+        ("result_us", "<u4"),  # result back
+        ("symbol", "S16"),
+        ("type", "i1"),  # ORDER_TYPE_BUY / ORDER_TYPE_SELL
+        ("attempt", "u1"),  # 1 for the first send of an order, 2 for a retry, ...
+        ("position", "<u8"),  # ticket being closed, 0 when opening
+        ("volume", "<f8"),
+        ("original", "<f8"),  # price the order first asked for
+        ("requested", "<f8"),  # price in this attempt's request (re-priced on retries)
+        ("filled", "<f8"),  # price of the deal (0 when nothing was filled)
+        ("point", "<f8"),
+        ("deviation", "<u4"),
+        ("retcode", "<i4"),  # -1 when order_send returned nothing
+    ]
+)
+
+_lock = threading.Lock()
+_fd = None
+_order_numbers = itertools.count(1)
+
+# One order across all its sends (retries and bulk_close's retry rounds)
+Order = namedtuple("Order", ["id", "price"])
+
+
+# Identify an order before its first send; the pid in the high bits keeps the
+# ids of processes writing to the same log apart
+def new_order(request):
+    return Order((os.getpid() << 32) | next(_order_numbers), request.get("price", 0.0))
+
+
+def _micros(start, end):
+    return min(max(int((end - start) * 1e6), 0), 0xFFFFFFFF)
+
+
+# Append records to the log with one write call (O_APPEND keeps records from
+# several processes whole)
+def append(records):
+    global _fd
+    data = np.asarray(records, dtype=EXECUTION_DTYPE).tobytes()
+    with _lock:
+        if _fd is None:
+            _fd = os.open(LOG_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        os.write(_fd, data)
+
+
+class Execution:
+    """Stage timestamps of one signal's orders, from the signal to each result.
+
+    Create it when the strategy starts analysing the bar, so the analysis
+    and decision count towards the latency, and hand it to place_trade; or
+    when the signal arrives for orders without an analysis (API requests,
+    the position monitor). Call built() once the request(s) are ready and
+    send each request through send(). It holds no per-request state, so a
+    batch can share one across threads.
+    """
+
+    __slots__ = ("time", "start", "built_at")
+
+    def __init__(self):
+        self.time = clock.now()
+        self.start = time.perf_counter()
+        self.built_at = None
+
+    def built(self):
+        self.built_at = time.perf_counter()
+
+    # order: the Order this send belongs to (a new one when not given)
+    def send(self, request, attempt=1, order=None):
+        sent_at = time.perf_counter()
+        result = mt5.order_send(request)
+        if ENABLED:
+            self.record(request, result, sent_at, time.perf_counter(), attempt, order)
+        return result
+
+    def record(self, request, result, sent_at, result_at, attempt=1, order=None):
+        order = order or new_order(request)
+        built_at = self.built_at if self.built_at is not None else sent_at
+        info = get_symbol_info(request["symbol"])
+        record = np.zeros(1, dtype=EXECUTION_DTYPE)
+        record[0] = (
+            self.time,
+            order.id,
+            _micros(self.start, built_at),
+            _micros(self.start, sent_at),
+            _micros(self.start, result_at),
+            request["symbol"].encode()[:16],
+            request.get("type", 0),
+            min(attempt, 255),
+            request.get("position", 0),
+            request.get("volume", 0.0),
+            order.price,
+            request.get("price", 0.0),
+            result.price if result is not None else 0.0,
+            info.point if info is not None else 0.0,
+            request.get("deviation", 0),
+            result.retcode if result is not None else -1,
+        )
+        append(record)
+
+
+# Start timing a signal's execution (see Execution for where)
+def start_execution():
+    return Execution()
+
+
+# All complete records in a log file (a record cut short by a crash is ignored)
+def load(path=None):
+    path = path or LOG_PATH
+    if not path or not os.path.exists(path):
+        return np.empty(0, dtype=EXECUTION_DTYPE)
+    count = os.path.getsize(path) // EXECUTION_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=EXECUTION_DTYPE)
+    return np.memmap(path, dtype=EXECUTION_DTYPE, mode="r", shape=(count,))
+
+
+# Slippage in points against the price the order first asked for, positive
+# when the fill was worse (re-pricing on retries counts as slippage)
+def slippage_points(records):
+    direction = np.where(records["type"] == mt5.ORDER_TYPE_BUY, 1.0, -1.0)
+    point = np.where(records["point"] > 0, records["point"], 1.0)
+    return (records["filled"] - records["original"]) * direction / point
+
+
+# Index of each order's last send (the log is in send order within an order)
+def final_attempts(records):
+    orders = records["order"][::-1]
+    _, last = np.unique(orders, return_index=True)
+    return np.sort(len(records) - 1 - last)
+
+
+def _percentiles(values):
+    if len(values) == 0:
+        return [None, None, None]
+    return [round(float(v), 3) + 0.0 for v in np.percentile(values, [50, 95, 99])]
+
+
+# Per symbol and UTC hour of day: p50/p95/p99 of signal-to-result latency (ms)
+# and slippage (points, filled orders only) over each order's final send, and
+# of the order_send round trip (ms) over every send
+def report(path=None):
+    records = np.asarray(load(path))
+    if len(records) == 0:
+        return []
+    sends = records
+    records = records[final_attempts(records)]
+    send_hours = (sends["time"] // 3600 % 24).astype(int)
+    hours = (records["time"] // 3600 % 24).astype(int)
+    done = records["retcode"] == mt5.TRADE_RETCODE_DONE
+    slippage = slippage_points(records)
+    rows = []
+    for symbol in np.unique(records["symbol"]):
+        for hour in np.unique(hours[records["symbol"] == symbol]):
+            group = (records["symbol"] == symbol) & (hours == hour)
+            send_group = (sends["symbol"] == symbol) & (send_hours == hour)
+            filled = group & done & (records["filled"] > 0)
+            round_trip = (sends["result_us"] - sends["sent_us"].astype(np.int64))[
+                send_group
+            ] / 1000
+            rows.append(
+                {
+                    "symbol": symbol.decode(),
+                    "hour": int(hour),
+                    "orders": int(group.sum()),
+                    "sends": int(send_group.sum()),
+                    "done": int((group & done).sum()),
+                    "retries": int((sends["attempt"][send_group] > 1).sum()),
+                    "latency_ms": _percentiles(records["result_us"][group] / 1000),
+                    "order_send_ms": _percentiles(round_trip),
+                    "slippage_points": _percentiles(slippage[filled]),
+                }
+            )
+    return rows
+
+
+def _format(values):
+    return "/".join("-" if v is None else f"{v:g}" for v in values)
+
+
+def format_report(rows):
+    lines = [
+        f"{'symbol':<12} {'hour':>4} {'orders':>6} {'sends':>6} {'done':>6} "
+        f"{'latency ms p50/95/99':>24} {'send ms p50/95/99':>22} "
+        f"{'slippage pts p50/95/99':>24}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['symbol']:<12} {row['hour']:>4} {row['orders']:>6} "
+            f"{row['sends']:>6} {row['done']:>6} "
+            f"{_format(row['latency_ms']):>24} {_format(row['order_send_ms']):>22} "
+            f"{_format(row['slippage_points']):>24}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "report":
+        print("Usage: python execution_log.py report <executions.bin> [--json]")
+        sys.exit(1)
+
+    rows = report(sys.argv[2])
+    if "--json" in sys.argv[3:]:
+        print(json.dumps(rows))
+    else:
+        first = load(sys.argv[2])
+        if len(first):
+            start = datetime.fromtimestamp(float(first["time"][0]), tz=timezone.utc)
+            print(f"{len(first)} sends since {start:%Y-%m-%d %H:%M} UTC")
+        print(format_report(rows))
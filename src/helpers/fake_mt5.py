@@ -0,0 +1,674 @@
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, namedtuple
+from datetime import datetime
+
+import numpy as np
+
+# In-process stand-in for the MetaTrader5 package. Install it with
+# fake_mt5.install() before importing any of the trading scripts and they
+# will talk to this module instead of a live terminal.
+
+# Constants (same values as the MetaTrader5 package)
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+TRADE_ACTION_DEAL = 1
+TRADE_ACTION_SLTP = 6
+ORDER_TIME_GTC = 0
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+SYMBOL_FILLING_FOK = 1
+SYMBOL_FILLING_IOC = 2
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_PRICE_CHANGED = 10020
+TRADE_RETCODE_PRICE_OFF = 10021
+TRADE_RETCODE_INVALID_FILL = 10030
+TRADE_RETCODE_POSITION_CLOSED = 10036
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+
+RES_S_OK = 1
+RES_E_INTERNAL_FAIL_INIT = -10005
+RES_E_NO_CONNECTION = -10004
+RES_E_AUTH_FAILED = -6
+
+# Seconds per bar for the supported timeframes
+TIMEFRAME_SECONDS = {
+    TIMEFRAME_M1: 60,
+    TIMEFRAME_M5: 300,
+    TIMEFRAME_M15: 900,
+    TIMEFRAME_M30: 1800,
+    TIMEFRAME_H1: 3600,
+    TIMEFRAME_H4: 14400,
+    TIMEFRAME_D1: 86400,
+}
+
+# Layout of the arrays returned by copy_rates_*
+RATES_DTYPE = np.dtype(
+    [
+        ("time", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("tick_volume", "<u8"),
+        ("spread", "<i4"),
+        ("real_volume", "<u8"),
+    ]
+)
+
+Tick = namedtuple("Tick", "time bid ask last volume time_msc flags volume_real")
+SymbolInfo = namedtuple(
+    "SymbolInfo",
+    "name visible point digits spread stop_level volume_min volume_max "
+    "volume_step filling_mode trade_contract_size",
+)
+AccountInfo = namedtuple(
+    "AccountInfo", "login server balance equity profit margin_free trade_allowed"
+)
+TerminalInfo = namedtuple("TerminalInfo", "connected trade_allowed ping_last")
+TradePosition = namedtuple(
+    "TradePosition",
+    "ticket time type magic identifier volume price_open sl tp "
+    "price_current swap profit symbol comment",
+)
+OrderSendResult = namedtuple(
+    "OrderSendResult", "retcode deal order volume price bid ask comment request"
+)
+
+# Number of calls made to each terminal function, for tests and benchmarks
+calls = Counter()
+
+_lock = threading.Lock()
+_state = {}
+
+
+# Reset the fake terminal to an empty, disconnected state
+def reset():
+    with _lock:
+        calls.clear()
+        _state.clear()
+        _state.update(
+            {
+                "initialized": False,
+                "connected": True,
+                "fail_initialize": 0,
+                "last_error": (RES_S_OK, "Success"),
+                "account": {
+                    "login": 1000,
+                    "server": "Fake-Demo",
+                    "balance": 10000.0,
+                    "trade_allowed": True,
+                },
+                "accounts": {},
+                "symbols": {},
+                "time": None,
+                "positions": {},
+                "next_ticket": 1,
+                "order_latency": 0.0,
+                "requote_storm": None,
+                "deals": [],
+            }
+        )
+
+
+# Register this module as MetaTrader5 so `import MetaTrader5` resolves to it
+def install():
+    sys.modules["MetaTrader5"] = sys.modules[__name__]
+    return sys.modules[__name__]
+
+
+# Add a tradable symbol with a fixed bid/ask
+def add_symbol(
+    name,
+    bid=1.10000,
+    spread_points=10,
+    point=0.00001,
+    digits=5,
+    stop_level=0,
+    volume_min=0.01,
+    volume_step=0.01,
+    filling_mode=SYMBOL_FILLING_FOK | SYMBOL_FILLING_IOC,
+    contract_size=100000.0,
+    visible=True,
+):
+    with _lock:
+        _state["symbols"][name] = {
+            "info": SymbolInfo(
+                name=name,
+                visible=visible,
+                point=point,
+                digits=digits,
+                spread=spread_points,
+                stop_level=stop_level,
+                volume_min=volume_min,
+                volume_max=100.0,
+                volume_step=volume_step,
+                filling_mode=filling_mode,
+                trade_contract_size=contract_size,
+            ),
+            "base": bid,
+            "bid": bid,
+            "ask": bid + spread_points * point,
+        }
+
+
+# Move the quote of a symbol and re-mark its open positions
+def set_price(symbol, bid):
+    with _lock:
+        _quote(symbol, _state["symbols"][symbol], bid)
+
+
+def _quote(symbol, entry, bid):
+    entry["ask"] = bid + entry["info"].spread * entry["info"].point
+    entry["bid"] = bid
+    for ticket, pos in _state["positions"].items():
+        if pos.symbol == symbol:
+            _state["positions"][ticket] = _mark(pos, entry)
+
+
+# Open a position directly, bypassing order_send
+def add_position(
+    symbol, type=ORDER_TYPE_BUY, volume=0.1, price_open=None, sl=0.0, tp=0.0,
+    magic=234000, comment="",
+):
+    with _lock:
+        entry = _state["symbols"][symbol]
+        if price_open is None:
+            price_open = entry["ask"] if type == ORDER_TYPE_BUY else entry["bid"]
+        ticket = _state["next_ticket"]
+        _state["next_ticket"] += 1
+        position = TradePosition(
+            ticket=ticket,
+            time=int(_now()),
+            type=type,
+            magic=magic,
+            identifier=ticket,
+            volume=volume,
+            price_open=price_open,
+            sl=sl,
+            tp=tp,
+            price_current=price_open,
+            swap=0.0,
+            profit=0.0,
+            symbol=symbol,
+            comment=comment,
+        )
+        _state["positions"][ticket] = _mark(position, entry)
+        return ticket
+
+
+# Serve recorded bars for a symbol instead of synthetic ones. Higher
+# timeframes are built from them, and bars after the terminal clock are hidden.
+def load_rates(symbol, rates, timeframe=TIMEFRAME_M1):
+    recorded = np.zeros(len(rates), dtype=RATES_DTYPE)
+    for name in RATES_DTYPE.names:
+        if name in rates.dtype.names:
+            recorded[name] = rates[name]
+    recorded = recorded[np.argsort(recorded["time"], kind="stable")]
+    with _lock:
+        _state["symbols"][symbol]["recorded"] = (timeframe, recorded)
+
+
+# Play one closed bar: SL/TP hits inside its range are filled (the stop wins
+# when both are touched), then the quote moves to the bar's close
+def apply_bar(symbol, high, low, close):
+    with _lock:
+        entry = _state["symbols"][symbol]
+        spread = entry["info"].spread * entry["info"].point
+        for position in list(_state["positions"].values()):
+            if position.symbol != symbol:
+                continue
+            if position.type == ORDER_TYPE_BUY:
+                # Longs close on the bid
+                stop_hit = position.sl > 0 and low <= position.sl
+                target_hit = position.tp > 0 and high >= position.tp
+            else:
+                # Shorts close on the ask
+                stop_hit = position.sl > 0 and high + spread >= position.sl
+                target_hit = position.tp > 0 and low + spread <= position.tp
+            if stop_hit:
+                _realize(position, entry, position.sl, "sl")
+            elif target_hit:
+                _realize(position, entry, position.tp, "tp")
+    set_price(symbol, close)
+
+
+# Positions closed so far, with their realized profit
+def deals():
+    with _lock:
+        return list(_state["deals"])
+
+
+# Register valid credentials; once any are registered, login() checks them
+def add_account(login, password, server, balance=10000.0):
+    with _lock:
+        _state["accounts"][(login, server)] = {"password": password, "balance": balance}
+
+
+# Simulate the round trip to the trade server for every order_send
+def set_order_latency(seconds):
+    with _lock:
+        _state["order_latency"] = seconds
+
+
+# Fast market: before each deal, with the given probability the quote jumps by
+# up to jitter_points either way, so orders with a tight deviation get
+# requoted; price_off is the chance of PRICE_OFF instead. probability=0 ends it.
+def set_requote_storm(probability, jitter_points=30, price_off=0.0, seed=0):
+    with _lock:
+        _state["requote_storm"] = (
+            {
+                "probability": probability,
+                "jitter_points": jitter_points,
+                "price_off": price_off,
+                "rng": np.random.default_rng(seed),
+            }
+            if probability or price_off
+            else None
+        )
+
+
+# Pin the terminal clock (seconds since epoch); None follows the wall clock
+def set_time(timestamp):
+    with _lock:
+        _state["time"] = timestamp
+
+
+def advance(seconds):
+    with _lock:
+        _state["time"] = _now() + seconds
+
+
+def _now():
+    return _state["time"] if _state["time"] is not None else time.time()
+
+
+# Deterministic synthetic bars: bar k of a symbol always has the same prices
+def _rates(symbol, timeframe, first, last):
+    if last < first:
+        return np.empty(0, dtype=RATES_DTYPE)
+    period = TIMEFRAME_SECONDS[timeframe]
+    if "recorded" in _state["symbols"][symbol]:
+        return _recorded_rates(symbol, period, first, last)
+    base = _state["symbols"][symbol]["base"]
+    seed = zlib.crc32(symbol.encode()) % 1000
+
+    k = np.arange(first - 1, last + 1, dtype=np.int64)
+    minutes = k * (period / 60.0)
+    noise = ((k * 2654435761 + seed) % 4294967296) / 4294967296.0 - 0.5
+    price = base * (
+        1
+        + 0.002 * np.sin(minutes / 150.0 + seed)
+        + 0.001 * np.sin(minutes / 37.0)
+        + 0.0004 * noise
+    )
+    rates = np.zeros(len(k) - 1, dtype=RATES_DTYPE)
+    rates["time"] = k[1:] * period
+    rates["open"] = price[:-1]
+    rates["close"] = price[1:]
+    wick = np.abs(noise[1:]) * base * 0.0002
+    rates["high"] = np.maximum(price[:-1], price[1:]) + wick
+    rates["low"] = np.minimum(price[:-1], price[1:]) - wick
+    rates["tick_volume"] = 10 + (k[1:] % 90)
+    rates["spread"] = 10
+    return rates
+
+
+def _recorded_rates(symbol, period, first, last):
+    source_timeframe, recorded = _state["symbols"][symbol]["recorded"]
+    source_period = TIMEFRAME_SECONDS[source_timeframe]
+    now = _now()
+    bars = recorded[recorded["time"] <= now].copy()
+    # The bar still forming only shows its open so far
+    if len(bars) and bars["time"][-1] + source_period > now:
+        forming = bars[-1]
+        forming["high"] = forming["low"] = forming["close"] = forming["open"]
+        forming["tick_volume"] = 0
+        bars[-1] = forming
+    if period != source_period and len(bars):
+        bucket = bars["time"] // period
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        grouped = np.zeros(len(starts), dtype=RATES_DTYPE)
+        grouped["time"] = bucket[starts] * period
+        grouped["open"] = bars["open"][starts]
+        grouped["high"] = np.maximum.reduceat(bars["high"], starts)
+        grouped["low"] = np.minimum.reduceat(bars["low"], starts)
+        grouped["close"] = bars["close"][np.r_[starts[1:] - 1, len(bars) - 1]]
+        grouped["tick_volume"] = np.add.reduceat(bars["tick_volume"], starts)
+        grouped["spread"] = bars["spread"][starts]
+        bars = grouped
+    index = bars["time"] // period
+    return bars[(index >= first) & (index <= last)]
+
+
+def _to_timestamp(value):
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+# Simulate the terminal losing its connection (terminal_info() -> None)
+def drop_connection():
+    with _lock:
+        _state["connected"] = False
+
+
+# Make the next `count` initialize() calls fail
+def fail_next_initialize(count=1):
+    with _lock:
+        _state["fail_initialize"] = count
+
+
+def _profit(position, entry, price):
+    direction = 1 if position.type == ORDER_TYPE_BUY else -1
+    profit = (
+        (price - position.price_open)
+        * direction
+        * position.volume
+        * entry["info"].trade_contract_size
+    )
+    return round(profit, 2)
+
+
+def _mark(position, entry):
+    price = entry["bid"] if position.type == ORDER_TYPE_BUY else entry["ask"]
+    return position._replace(price_current=price, profit=_profit(position, entry, price))
+
+
+# Close a position at `price` and book its profit to the balance
+def _realize(position, entry, price, reason):
+    del _state["positions"][position.ticket]
+    profit = _profit(position, entry, price)
+    _state["account"]["balance"] += profit
+    _state["deals"].append(
+        {
+            "ticket": position.ticket,
+            "symbol": position.symbol,
+            "type": position.type,
+            "volume": position.volume,
+            "time_open": position.time,
+            "time_close": int(_now()),
+            "price_open": position.price_open,
+            "price_close": price,
+            "profit": profit,
+            "reason": reason,
+        }
+    )
+
+
+def _ready():
+    return _state["initialized"] and _state["connected"]
+
+
+def _no_connection():
+    _state["last_error"] = (RES_E_NO_CONNECTION, "No IPC connection")
+
+
+# MetaTrader5 API surface
+def initialize(*args, **kwargs):
+    with _lock:
+        calls["initialize"] += 1
+        if _state["fail_initialize"] > 0:
+            _state["fail_initialize"] -= 1
+            _state["last_error"] = (RES_E_INTERNAL_FAIL_INIT, "Terminal not found")
+            return False
+        _state["initialized"] = True
+        _state["connected"] = True
+        _state["last_error"] = (RES_S_OK, "Success")
+        return True
+
+
+def shutdown():
+    with _lock:
+        calls["shutdown"] += 1
+        _state["initialized"] = False
+        return True
+
+
+def login(login, password=None, server=None, timeout=None):
+    with _lock:
+        calls["login"] += 1
+        if not _ready():
+            _no_connection()
+            return False
+        accounts = _state["accounts"]
+        if accounts:
+            account = accounts.get((login, server))
+            if account is None or account["password"] != password:
+                _state["last_error"] = (RES_E_AUTH_FAILED, "Authorization failed")
+                return False
+            _state["account"]["balance"] = account["balance"]
+        _state["account"]["login"] = login
+        _state["account"]["server"] = server
+        return True
+
+
+def last_error():
+    return _state["last_error"]
+
+
+def terminal_info():
+    with _lock:
+        calls["terminal_info"] += 1
+        if not _ready():
+            return None
+        return TerminalInfo(connected=True, trade_allowed=True, ping_last=1000)
+
+
+def account_info():
+    with _lock:
+        calls["account_info"] += 1
+        if not _ready():
+            _no_connection()
+            return None
+        account = _state["account"]
+        profit = sum(p.profit for p in _state["positions"].values())
+        return AccountInfo(
+            login=account["login"],
+            server=account["server"],
+            balance=account["balance"],
+            equity=account["balance"] + profit,
+            profit=profit,
+            margin_free=account["balance"],
+            trade_allowed=account["trade_allowed"],
+        )
+
+
+def symbol_info(symbol):
+    with _lock:
+        calls["symbol_info"] += 1
+        entry = _state["symbols"].get(symbol) if _ready() else None
+        return entry["info"] if entry else None
+
+
+def symbol_info_tick(symbol):
+    with _lock:
+        calls["symbol_info_tick"] += 1
+        entry = _state["symbols"].get(symbol) if _ready() else None
+        if entry is None:
+            return None
+        now = _now()
+        return Tick(
+            time=int(now),
+            bid=entry["bid"],
+            ask=entry["ask"],
+            last=0.0,
+            volume=0,
+            time_msc=int(now * 1000),
+            flags=6,
+            volume_real=0.0,
+        )
+
+
+def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+    with _lock:
+        calls["copy_rates_from_pos"] += 1
+        if not _ready() or symbol not in _state["symbols"]:
+            return None
+        current = int(_now() // TIMEFRAME_SECONDS[timeframe])
+        last = current - start_pos
+        return _rates(symbol, timeframe, last - count + 1, last)
+
+
+def copy_rates_from(symbol, timeframe, date_from, count):
+    with _lock:
+        calls["copy_rates_from"] += 1
+        if not _ready() or symbol not in _state["symbols"]:
+            return None
+        period = TIMEFRAME_SECONDS[timeframe]
+        last = min(_to_timestamp(date_from), int(_now())) // period
+        return _rates(symbol, timeframe, last - count + 1, last)
+
+
+def copy_rates_range(symbol, timeframe, date_from, date_to):
+    with _lock:
+        calls["copy_rates_range"] += 1
+        if not _ready() or symbol not in _state["symbols"]:
+            return None
+        period = TIMEFRAME_SECONDS[timeframe]
+        first = -(-_to_timestamp(date_from) // period)
+        last = min(_to_timestamp(date_to), int(_now())) // period
+        return _rates(symbol, timeframe, first, last)
+
+
+def positions_get(symbol=None, group=None, ticket=None):
+    with _lock:
+        calls["positions_get"] += 1
+        if not _ready():
+            _no_connection()
+            return None
+        positions = _state["positions"].values()
+        if ticket is not None:
+            positions = [p for p in positions if p.ticket == ticket]
+        if symbol is not None:
+            positions = [p for p in positions if p.symbol == symbol]
+        return tuple(positions)
+
+
+def positions_total():
+    with _lock:
+        calls["positions_total"] += 1
+        return len(_state["positions"]) if _ready() else None
+
+
+def order_send(request):
+    with _lock:
+        calls["order_send"] += 1
+        latency = _state["order_latency"]
+    if latency:
+        time.sleep(latency)  # outside the lock, like a real server round trip
+    with _lock:
+        if not _ready():
+            _no_connection()
+            return None
+        return _execute(request)
+
+
+def _result(retcode, request, price=0.0, comment="", deal=0, bid=0.0, ask=0.0):
+    return OrderSendResult(
+        retcode=retcode,
+        deal=deal,
+        order=deal,
+        volume=request.get("volume", 0.0),
+        price=price,
+        bid=bid,
+        ask=ask,
+        comment=comment,
+        request=request,
+    )
+
+
+def _execute(request):
+    entry = _state["symbols"].get(request.get("symbol"))
+    if entry is None:
+        return _result(TRADE_RETCODE_INVALID, request, comment="Invalid request")
+
+    if request["action"] == TRADE_ACTION_SLTP:
+        position = _state["positions"].get(request.get("position"))
+        if position is None:
+            return _result(TRADE_RETCODE_POSITION_CLOSED, request, comment="Position closed")
+        _state["positions"][position.ticket] = position._replace(
+            sl=request.get("sl", position.sl), tp=request.get("tp", position.tp)
+        )
+        return _result(TRADE_RETCODE_DONE, request, comment="Request executed")
+
+    if request["action"] != TRADE_ACTION_DEAL:
+        return _result(TRADE_RETCODE_INVALID, request, comment="Invalid request")
+
+    info = entry["info"]
+    filling = request.get("type_filling", ORDER_FILLING_FOK)
+    if not {
+        ORDER_FILLING_FOK: info.filling_mode & SYMBOL_FILLING_FOK,
+        ORDER_FILLING_IOC: info.filling_mode & SYMBOL_FILLING_IOC,
+        ORDER_FILLING_RETURN: info.filling_mode == 0,
+    }.get(filling):
+        return _result(
+            TRADE_RETCODE_INVALID_FILL, request, comment="Unsupported filling mode"
+        )
+
+    storm = _state["requote_storm"]
+    if storm is not None:
+        rng = storm["rng"]
+        if rng.random() < storm["price_off"]:
+            return _result(TRADE_RETCODE_PRICE_OFF, request, comment="No prices")
+        if rng.random() < storm["probability"]:
+            jump = rng.uniform(-1, 1) * storm["jitter_points"] * info.point
+            _quote(request["symbol"], entry, entry["bid"] + jump)
+
+    price = entry["ask"] if request["type"] == ORDER_TYPE_BUY else entry["bid"]
+    # The server refuses a fill further than `deviation` points from the request
+    if request.get("price") and abs(price - request["price"]) > (
+        request.get("deviation", 0) + 1e-6
+    ) * info.point:
+        return _result(
+            TRADE_RETCODE_REQUOTE,
+            request,
+            comment="Requote",
+            bid=entry["bid"],
+            ask=entry["ask"],
+        )
+    ticket = _state["next_ticket"]
+    _state["next_ticket"] += 1
+
+    if request.get("position"):
+        position = _state["positions"].get(request["position"])
+        if position is None:
+            return _result(TRADE_RETCODE_POSITION_CLOSED, request, comment="Position closed")
+        _realize(position, entry, price, "order")
+        return _result(TRADE_RETCODE_DONE, request, price, "Request executed", ticket)
+
+    position = TradePosition(
+        ticket=ticket,
+        time=int(_now()),
+        type=request["type"],
+        magic=request.get("magic", 0),
+        identifier=ticket,
+        volume=request["volume"],
+        price_open=price,
+        sl=request.get("sl", 0.0),
+        tp=request.get("tp", 0.0),
+        price_current=price,
+        swap=0.0,
+        profit=0.0,
+        symbol=request["symbol"],
+        comment=request.get("comment", ""),
+    )
+    _state["positions"][ticket] = _mark(position, entry)
+    return _result(TRADE_RETCODE_DONE, request, price, "Request executed", ticket)
+
+
+reset()
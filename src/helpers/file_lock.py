@@ -0,0 +1,49 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import msvcrt
+except ImportError:  # not Windows
+    msvcrt = None
+    import fcntl
+
+
+# Exclusive lock on an open file, across processes (blocks until free)
+def lock_file(f):
+    if msvcrt is None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            pass  # LK_LOCK gives up after about 10 seconds; keep waiting
+
+
+def unlock_file(f):
+    if msvcrt is None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# Hold an exclusive lock on lock_path (created if missing) for the block
+@contextmanager
+def locked(lock_path):
+    with open(lock_path, "a+b") as f:
+        lock_file(f)
+        try:
+            yield
+        finally:
+            unlock_file(f)
+
+
+# Replace path's content in one step, through a temporary file
+def write_atomic(path, text):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
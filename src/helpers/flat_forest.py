@@ -0,0 +1,121 @@
+import os
+import sys
+
+import numpy as np
+
+# Default location of the exported forest, next to price_action_model.pkl
+FLAT_MODEL_PATH = "price_action_model.npz"
+
+
+# Where a model's flat export lives: beside it, with an .npz extension
+def flat_path_for(model_path):
+    return os.path.splitext(model_path)[0] + ".npz"
+
+
+# Flatten a fitted RandomForestClassifier and StandardScaler into plain arrays
+def export_forest(model, scaler):
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        node_ids = np.arange(tree.node_count)
+        # Leaves point at themselves so extra traversal steps are no-ops
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        value = tree.value[:, 0, :]
+        values.append(value / value.sum(axis=1, keepdims=True))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return {
+        "feature": np.concatenate(features).astype(np.intp),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "left": np.concatenate(lefts).astype(np.intp),
+        "right": np.concatenate(rights).astype(np.intp),
+        "value": np.concatenate(values).astype(np.float64),
+        "roots": np.array(roots, dtype=np.intp),
+        "max_depth": np.array(max_depth),
+        "classes": np.asarray(model.classes_),
+        "mean": np.asarray(scaler.mean_, dtype=np.float64),
+        "scale": np.asarray(scaler.scale_, dtype=np.float64),
+    }
+
+
+# Written through a temporary file so readers never see a partial export
+def save_flat_forest(arrays, path=FLAT_MODEL_PATH):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+class FlatForest:
+    """Vectorized RandomForest evaluation over the arrays from export_forest.
+
+    Rows are given unscaled: the StandardScaler step is applied here, then
+    every (row, tree) pair is walked at once, one depth level per step.
+    """
+
+    def __init__(self, arrays):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.classes = arrays["classes"]
+        self.mean = arrays["mean"]
+        self.scale = arrays["scale"]
+        self.is_leaf = self.left == np.arange(len(self.left))
+
+    @classmethod
+    def load(cls, path=FLAT_MODEL_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def predict_proba(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        # Same float32 cast sklearn's trees apply to their input
+        scaled = ((X - self.mean) / self.scale).astype(np.float32)
+        n_trees = len(self.roots)
+        # One entry per (row, tree); only entries still at an inner node are advanced
+        nodes = np.tile(self.roots, len(scaled))
+        rows = np.repeat(np.arange(len(scaled)), n_trees)
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        while len(active):
+            current = nodes[active]
+            go_left = scaled[rows[active], self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = current
+            active = active[~self.is_leaf[current]]
+
+        # Accumulate tree by tree, in the same order as sklearn, so votes tie identically
+        leaves = nodes.reshape(len(scaled), n_trees)
+        proba = np.zeros((len(scaled), self.value.shape[1]))
+        for tree in range(n_trees):
+            proba += self.value[leaves[:, tree]]
+        return proba / n_trees
+
+    def predict(self, X):
+        return self.classes[self.predict_proba(X).argmax(axis=1)]
+
+
+if __name__ == "__main__":
+    import joblib
+
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "price_action_model.pkl"
+    scaler_path = sys.argv[2] if len(sys.argv) > 2 else "scaler.pkl"
+    output_path = sys.argv[3] if len(sys.argv) > 3 else flat_path_for(model_path)
+
+    arrays = export_forest(joblib.load(model_path), joblib.load(scaler_path))
+    save_flat_forest(arrays, output_path)
+    print(
+        f"Exported {len(arrays['roots'])} trees, {len(arrays['feature'])} nodes "
+        f"to {output_path}"
+    )
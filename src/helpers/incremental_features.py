@@ -0,0 +1,141 @@
+import math
+from collections import deque
+
+# Columns produced for each bar, in the same order as preprocess_data adds them
+FEATURE_NAMES = ["returns", "volatility", "momentum", "sma_10", "sma_50", "rsi"]
+
+
+# Fixed-size window with running sum and sum of squares
+class RollingWindow:
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, value):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+    def full(self):
+        return len(self.values) == self.size
+
+    def mean(self):
+        return self.total / self.size
+
+    def std(self):
+        # Sample standard deviation (ddof=1), same as pandas rolling().std()
+        n = self.size
+        variance = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+    # Recompute the running sums from the window to shed accumulated rounding error
+    def resync(self):
+        self.total = math.fsum(self.values)
+        self.total_sq = math.fsum(v * v for v in self.values)
+
+
+class IncrementalFeatureEngine:
+    """Stateful version of preprocess_data that costs O(1) per new bar.
+
+    Seed it once from history, then call update() with each closed bar.
+    """
+
+    def __init__(
+        self,
+        volatility_window=5,
+        momentum_period=4,
+        sma_short=10,
+        sma_long=50,
+        rsi_period=14,
+        resync_every=1000,
+    ):
+        self.volatility_window = volatility_window
+        self.momentum_period = momentum_period
+        self.sma_short = sma_short
+        self.sma_long = sma_long
+        self.rsi_period = rsi_period
+        self.resync_every = resync_every
+        self.reset()
+
+    def reset(self):
+        self.closes = deque(maxlen=self.momentum_period + 1)
+        self.returns = RollingWindow(self.volatility_window)
+        self.short = RollingWindow(self.sma_short)
+        self.long = RollingWindow(self.sma_long)
+        self.gains = RollingWindow(self.rsi_period)
+        self.losses = RollingWindow(self.rsi_period)
+        self.updates = 0
+        self.latest = None
+
+    # Feed every row of a candle DataFrame; returns the last feature row
+    def seed(self, df):
+        self.reset()
+        columns = [c for c in ("time", "open", "high", "low", "close") if c in df]
+        for values in zip(*(df[c].to_numpy() for c in columns)):
+            self.update(dict(zip(columns, values)))
+        return self.latest
+
+    # Add one closed bar; returns its feature row, or None while warming up
+    def update(self, bar):
+        close = float(bar["close"])
+        prev_close = self.closes[-1] if self.closes else None
+        self.closes.append(close)
+
+        if prev_close is None:
+            # pandas turns the first NaN diff into 0 for the RSI gain/loss
+            delta = 0.0
+            ret = math.nan
+        else:
+            delta = close - prev_close
+            ret = close / prev_close - 1.0 if prev_close != 0 else math.nan
+            self.returns.push(ret)
+
+        self.short.push(close)
+        self.long.push(close)
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+
+        self.updates += 1
+        if self.updates % self.resync_every == 0:
+            for window in (self.returns, self.short, self.long, self.gains, self.losses):
+                window.resync()
+
+        features = {
+            "returns": ret,
+            "volatility": self.returns.std() if self.returns.full() else math.nan,
+            "momentum": (
+                close - self.closes[0]
+                if len(self.closes) == self.closes.maxlen
+                else math.nan
+            ),
+            "sma_10": self.short.mean() if self.short.full() else math.nan,
+            "sma_50": self.long.mean() if self.long.full() else math.nan,
+            "rsi": self._rsi() if self.gains.full() else math.nan,
+        }
+        if any(math.isnan(value) for value in features.values()):
+            return None
+
+        row = {key: bar[key] for key in ("time", "open", "high", "low") if key in bar}
+        row["close"] = close
+        row.update(features)
+        self.latest = row
+        return row
+
+    def _rsi(self):
+        gain = max(self.gains.mean(), 0.0)
+        loss = max(self.losses.mean(), 0.0)
+        if loss == 0:
+            return 100.0 if gain > 0 else math.nan
+        return 100 - (100 / (1 + gain / loss))
+
+    # Latest feature row as a one-row DataFrame, ready for predict_action
+    def latest_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame([self.latest]) if self.latest else pd.DataFrame()
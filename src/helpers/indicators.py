@@ -0,0 +1,119 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import kernels
+
+
+# Indicator definitions shared by swing_trading and price_action_script,
+# computed by the NumPy kernels. Each takes the close prices as an array.
+INDICATORS = {
+    "sma": kernels.sma,
+    "rsi": kernels.rsi,
+    "macd": kernels.macd,
+    "volatility": kernels.volatility,
+    "momentum": kernels.momentum,
+}
+
+
+class IndicatorCache:
+    """Indicator series computed once per (indicator, params, symbol, timeframe) and bar.
+
+    An entry is reused while the input window is unchanged: same length,
+    first and last bar time and last close (the close of a bar still forming
+    moves). Concurrent requests for the same series wait for the first one
+    instead of computing it again. Returned arrays are read-only.
+
+    The cache lives in one process. The strategies run as separate processes
+    on different timeframes (price action on M1, swing on M15), so in
+    production it only saves repeat computations within a bar in the same
+    process, e.g. a scanner or the replay calling a strategy again.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.key_locks = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.merged = 0
+
+    def get(self, name, params, symbol, timeframe, times, close):
+        key = (name, tuple(params), symbol, timeframe)
+        stamp = None
+        if len(close):
+            stamp = (len(close), _seconds(times[0]), _seconds(times[-1]), close[-1])
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self.lock:
+                entry = self.entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                # Computed by a concurrent request while we waited
+                with self.lock:
+                    self.merged += 1
+                return entry[1]
+            values = INDICATORS[name](close, *params)
+            values.flags.writeable = False
+            with self.lock:
+                self.misses += 1
+                self.entries[key] = (stamp, values)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    evicted, _ = self.entries.popitem(last=False)
+                    self.key_locks.pop(evicted, None)
+            return values
+
+    # Forget every series (counters are kept)
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.key_locks.clear()
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "merged": self.merged,
+        }
+
+
+# Cache for every strategy running in this process
+indicator_cache = IndicatorCache()
+
+
+# Bar time in epoch seconds, from rates (integers) or a DataFrame (datetime64)
+def _seconds(value):
+    if isinstance(value, np.datetime64):
+        return int(value.astype("datetime64[s]").astype(np.int64))
+    return int(value)
+
+
+# Bar times and closes of a rates array from mt5.copy_rates_* (used as is,
+# without building a DataFrame) or of a DataFrame, whose bar times come from
+# the "time" column or from the index when it holds them
+def _columns(data):
+    if isinstance(data, np.ndarray):
+        return data["time"], data["close"]
+    times = data["time"].to_numpy() if "time" in data else data.index.to_numpy()
+    return times, data["close"].to_numpy()
+
+
+# An indicator over the data's closes; cached when the symbol and timeframe are
+# known. With last_only only the trailing value is returned (one per output),
+# which uncached callers get without computing the rest of the series.
+def compute(data, name, *params, symbol=None, timeframe=None, last_only=False):
+    times, close = _columns(data)
+    if symbol is None:
+        return INDICATORS[name](close, *params, last_only=last_only)
+    values = indicator_cache.get(name, params, symbol, timeframe, times, close)
+    return values[..., -1] if last_only else values
@@ -0,0 +1,126 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Indicator kernels on plain float arrays, such as the "close" field of the
+# structured array mt5.copy_rates_* returns (a strided view works as is).
+# Each matches the pandas expression noted above it, NaN warm-up included.
+# With last_only=True only the trailing value is computed, from the trailing
+# window where the indicator allows it; it equals the full series' last value.
+
+
+# close.rolling(window, min_periods).mean()
+def sma(values, window, min_periods=None, last_only=False):
+    values = np.asarray(values, dtype=float)
+    min_periods = window if min_periods is None else min_periods
+    n = len(values)
+    if last_only:
+        tail = values[-window:]
+        return tail.mean() if n >= min_periods and n else np.nan
+    out = np.full(n, np.nan)
+    if n >= window:
+        out[window - 1 :] = sliding_window_view(values, window).mean(axis=1)
+    head = min(window - 1, n)
+    if head > min_periods - 1:
+        # Windows still filling up average what they have
+        counts = np.arange(1, head + 1)
+        means = np.cumsum(values[:head]) / counts
+        out[min_periods - 1 : head] = means[min_periods - 1 :]
+    return out
+
+
+# values.rolling(window).std() (sample standard deviation, ddof=1)
+def rolling_std(values, window, last_only=False):
+    values = np.asarray(values, dtype=float)
+    if last_only:
+        return values[-window:].std(ddof=1) if len(values) >= window else np.nan
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1 :] = sliding_window_view(values, window).std(axis=1, ddof=1)
+    return out
+
+
+# close.pct_change().rolling(window).std()
+def volatility(close, window=5, last_only=False):
+    close = np.asarray(close, dtype=float)
+    if last_only:
+        close = close[-(window + 1) :]
+    returns = close[1:] / close[:-1] - 1.0
+    if last_only:
+        return rolling_std(returns, window, last_only=True)
+    out = np.full(len(close), np.nan)
+    out[1:] = rolling_std(returns, window)
+    return out
+
+
+# close.diff(period)
+def momentum(close, period=4, last_only=False):
+    close = np.asarray(close, dtype=float)
+    if last_only:
+        return close[-1] - close[-1 - period] if len(close) > period else np.nan
+    out = np.full(len(close), np.nan)
+    out[period:] = close[period:] - close[:-period]
+    return out
+
+
+# Average gain over average loss, with pandas' where() turning the first
+# (undefined) difference into a zero gain and loss
+def rsi(close, period=14, last_only=False):
+    close = np.asarray(close, dtype=float)
+    if last_only:
+        if len(close) < period:
+            return np.nan
+        delta = np.diff(close[-(period + 1) :])
+        if len(delta) < period:
+            delta = np.concatenate([[0.0], delta])
+        gain = np.clip(delta, 0, None).mean()
+        loss = -np.clip(delta, None, 0).mean()
+    else:
+        delta = np.diff(close, prepend=close[:1])
+        gain = sma(np.clip(delta, 0, None), period)
+        loss = sma(-np.clip(delta, None, 0), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + gain / loss)
+
+
+# close.ewm(span=span, adjust=False).mean(). The recursion reaches back to the
+# first value, so last_only still walks the whole array but allocates nothing.
+def ema(values, span, last_only=False):
+    alpha = 2.0 / (span + 1)
+    keep = 1.0 - alpha
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return np.nan if last_only else np.empty(0)
+    items = values.tolist()
+    current = items[0]
+    if last_only:
+        for value in items[1:]:
+            current = keep * current + alpha * value
+        return current
+    out = [current]
+    for value in items[1:]:
+        current = keep * current + alpha * value
+        out.append(current)
+    return np.array(out)
+
+
+# MACD line, signal line and histogram, stacked like indicators.macd; with
+# last_only the three trailing values come from a single pass over the closes
+def macd(close, short_period=12, long_period=26, signal_period=9, last_only=False):
+    if not last_only:
+        line = ema(close, short_period) - ema(close, long_period)
+        signal = ema(line, signal_period)
+        return np.stack([line, signal, line - signal])
+    items = np.asarray(close, dtype=float).tolist()
+    if not items:
+        return np.nan, np.nan, np.nan
+    a_short = 2.0 / (short_period + 1)
+    a_long = 2.0 / (long_period + 1)
+    a_signal = 2.0 / (signal_period + 1)
+    short = long = items[0]
+    signal = 0.0
+    for value in items[1:]:
+        short += a_short * (value - short)
+        long += a_long * (value - long)
+        signal += a_signal * (short - long - signal)
+    line = short - long
+    return line, signal, line - signal
@@ -0,0 +1,220 @@
+import logging
+import sys
+import time
+
+import numpy as np
+
+import clock
+import fake_mt5
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+class MarketReplay:
+    """Recorded bars played through fake_mt5 on a virtual clock.
+
+    Once installed, `import MetaTrader5` resolves to the fake terminal and
+    clock.now()/clock.sleep() follow the replay, so the strategy scripts run
+    unchanged. Every bar that closes while the clock advances is applied to
+    the terminal (SL/TP fills, then the close price); inside a bar the quote
+    sits at its open. With speed > 0, sleeps take seconds / speed of real
+    time; with speed 0 the replay runs as fast as it can.
+    """
+
+    def __init__(self, speed=0.0):
+        self.speed = speed
+        self.time = None
+        self.end = None
+        self.series = {}  # symbol -> (period, recorded bars, next bar to apply)
+
+    def load(self, symbol, rates, timeframe=fake_mt5.TIMEFRAME_M1, **symbol_kwargs):
+        rates = np.sort(np.asarray(rates), order="time")
+        period = fake_mt5.TIMEFRAME_SECONDS[timeframe]
+        fake_mt5.add_symbol(symbol, bid=float(rates["open"][0]), **symbol_kwargs)
+        fake_mt5.load_rates(symbol, rates, timeframe)
+        self.series[symbol] = [period, rates, 0]
+        start = int(rates["time"][0])
+        end = int(rates["time"][-1]) + period
+        self.time = start if self.time is None else min(self.time, start)
+        self.end = end if self.end is None else max(self.end, end)
+        fake_mt5.set_time(self.time)
+
+    # Point MetaTrader5 and the trading loops' clock at this replay
+    def install(self):
+        fake_mt5.install()
+        clock.set_clock(self)
+        return fake_mt5
+
+    def uninstall(self):
+        clock.set_clock(None)
+
+    @property
+    def finished(self):
+        return self.time >= self.end
+
+    def now(self):
+        return self.time
+
+    def sleep(self, seconds):
+        if self.speed:
+            time.sleep(seconds / self.speed)
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        target = self.time + seconds
+        for symbol, series in self.series.items():
+            period, rates, cursor = series
+            closed = np.searchsorted(rates["time"], target - period, side="right")
+            for bar in rates[cursor:closed]:
+                fake_mt5.apply_bar(symbol, bar["high"], bar["low"], bar["close"])
+            series[2] = max(cursor, closed)
+            # Inside a bar the quote is its open
+            forming = series[2]
+            if forming < len(rates) and rates["time"][forming] <= target:
+                fake_mt5.set_price(symbol, float(rates["open"][forming]))
+        self.time = target
+        fake_mt5.set_time(target)
+
+
+# Load a history file (csv/npy/npz, as in backtest.py) into a rates array
+def load_rates_file(path):
+    from backtest import load_history
+
+    df = load_history(path)
+    rates = np.zeros(len(df), dtype=fake_mt5.RATES_DTYPE)
+    rates["time"] = df["time"].to_numpy(dtype="datetime64[s]").astype("int64")
+    for name in fake_mt5.RATES_DTYPE.names[1:]:
+        if name in df:
+            rates[name] = df[name].to_numpy()
+    return rates
+
+
+# Timeframe of recorded bars, from the most common spacing of their times
+def infer_timeframe(rates):
+    gaps = np.diff(np.unique(np.asarray(rates)["time"]))
+    if len(gaps) == 0:
+        return fake_mt5.TIMEFRAME_M1
+    values, counts = np.unique(gaps, return_counts=True)
+    spacing = int(values[counts.argmax()])
+    for timeframe, seconds in fake_mt5.TIMEFRAME_SECONDS.items():
+        if seconds == spacing:
+            return timeframe
+    raise ValueError(f"No timeframe has {spacing}-second bars")
+
+
+# One decision of price_action_script's main flow at the current bar
+def price_action_step(symbol, volume, stop_loss_pips, take_profit_pips):
+    import MetaTrader5 as mt5
+    import price_action_script as pa
+    from execution_log import start_execution
+
+    execution = start_execution()
+    processed = pa.preprocess_data(pa.get_candlestick_data(symbol, mt5.TIMEFRAME_M1, 100))
+    if processed.empty or not pa.close_all_positions(symbol):
+        return None
+    try:
+        action = pa.predict_action(processed)
+    except FileNotFoundError:
+        logging.error("No trained model found; price_action replay makes no trades.")
+        return None
+    point = pa.get_symbol_info(symbol).point
+    stop_loss, take_profit = pa.calculate_sltp(
+        action, processed.iloc[-1]["close"], stop_loss_pips, take_profit_pips, point
+    )
+    if stop_loss and take_profit:
+        pa.place_trade(symbol, volume, action, stop_loss, take_profit, execution)
+    return action
+
+
+# One decision of swing_trading's main flow at the current bar
+def swing_step(symbol, volume, stop_loss_points, take_profit_points):
+    import swing_trading
+    from execution_log import start_execution
+
+    execution = start_execution()
+    action = swing_trading.analyze_market(symbol)
+    if action != "hold":
+        swing_trading.place_trade(
+            symbol, volume, action, take_profit_points, stop_loss_points, execution
+        )
+    return action
+
+
+# Strategy step functions and how often (seconds) they make a decision
+STRATEGIES = {
+    "price_action": (price_action_step, 60),
+    "swing": (swing_step, 900),
+}
+
+
+# Replay a recorded history through a strategy, with the position monitor
+# managing open trades between decisions. The rates' timeframe is inferred
+# from their spacing unless given; warmup_bars are bars of that timeframe.
+def run_replay(
+    rates,
+    symbol,
+    strategy="swing",
+    speed=0.0,
+    volume=0.01,
+    stop_loss=100,
+    take_profit=200,
+    poll_interval=10.0,
+    warmup_bars=100,
+    timeframe=None,
+):
+    if timeframe is None:
+        timeframe = infer_timeframe(rates)
+    replay = MarketReplay(speed=speed)
+    replay.load(symbol, rates, timeframe)
+    mt5 = replay.install()
+    from position_monitor import PositionMonitor
+
+    step, every = STRATEGIES[strategy]
+    mt5.initialize()
+    monitor = PositionMonitor(symbols=[symbol], poll_interval=poll_interval)
+    decisions = {}
+    started = time.perf_counter()
+    replay.advance(warmup_bars * fake_mt5.TIMEFRAME_SECONDS[timeframe])
+    next_decision = replay.now()
+    try:
+        while not replay.finished:
+            if replay.now() >= next_decision:
+                action = step(symbol, volume, stop_loss, take_profit)
+                decisions[action] = decisions.get(action, 0) + 1
+                next_decision += every
+            monitor.run_cycle()
+            clock.sleep(poll_interval)
+        open_positions = len(mt5.positions_get() or ())
+    finally:
+        mt5.shutdown()
+        replay.uninstall()
+
+    deals = mt5.deals()
+    return {
+        "strategy": strategy,
+        "decisions": {str(action): n for action, n in decisions.items()},
+        "deals": len(deals),
+        "profit": round(sum(deal["profit"] for deal in deals), 2),
+        "open_positions": open_positions,
+        "virtual_hours": round((replay.now() - int(rates["time"].min())) / 3600, 2),
+        "wall_seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print(
+            "Usage: python market_replay.py <history.csv|.npy|.npz> <symbol> "
+            "<price_action|swing> [<speed>]"
+        )
+        sys.exit(1)
+
+    fake_mt5.install()
+    summary = run_replay(
+        load_rates_file(sys.argv[1]),
+        sys.argv[2],
+        sys.argv[3],
+        speed=float(sys.argv[4]) if len(sys.argv) > 4 else 0.0,
+    )
+    print(summary)
@@ -0,0 +1,247 @@
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+from file_lock import locked, write_atomic
+
+# Set MT5_METRICS to an output path to turn instrumentation on, e.g.
+#   MT5_METRICS=metrics.jsonl  (JSON lines)   MT5_METRICS=metrics.prom  (Prometheus text)
+# It is decided once at import time: when off, timed() returns functions
+# untouched and stage() hands back a shared no-op context.
+OUTPUT_PATH = os.environ.get("MT5_METRICS")
+ENABLED = bool(OUTPUT_PATH)
+
+# Label on this process's series: the script it runs (price_action_script,
+# swing_trading, mt5_trade_manager, ...)
+ROLE = os.path.splitext(os.path.basename(sys.argv[0] or ""))[0] or "python"
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"),
+)
+
+# Terminal functions whose calls and latencies are recorded
+TERMINAL_FUNCTIONS = (
+    "initialize",
+    "login",
+    "copy_rates_from_pos",
+    "copy_rates_range",
+    "copy_rates_from",
+    "symbol_info",
+    "symbol_info_tick",
+    "positions_get",
+    "account_info",
+    "terminal_info",
+    "order_send",
+)
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_null_stage = contextlib.nullcontext()
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+
+def observe(name, seconds):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+def count(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            count(self.name + ".errors")
+        return False
+
+
+# Time a block:  with stage("price_action.predict"): ...
+def stage(name):
+    return _Stage(name) if ENABLED else _null_stage
+
+
+# Time every call of a function; a no-op decorator when metrics are off
+def timed(name):
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# Wrap the MetaTrader5 module's functions to count calls, failures and latency
+def instrument_terminal(mt5):
+    if not ENABLED or getattr(mt5, "_metrics_instrumented", False):
+        return
+    done = getattr(mt5, "TRADE_RETCODE_DONE", 10009)
+    for function_name in TERMINAL_FUNCTIONS:
+        func = getattr(mt5, function_name, None)
+        if func is None:
+            continue
+
+        def wrapper(*args, _func=func, _name="terminal." + function_name, **kwargs):
+            start = time.perf_counter()
+            result = _func(*args, **kwargs)
+            observe(_name, time.perf_counter() - start)
+            if result is None or result is False or (
+                _name == "terminal.order_send" and result.retcode != done
+            ):
+                count(_name + ".errors")
+            return result
+
+        setattr(mt5, function_name, wrapper)
+    mt5._metrics_instrumented = True
+
+
+def snapshot():
+    with _lock:
+        return {
+            "histograms": {
+                name: {
+                    "count": h.count,
+                    "sum": h.total,
+                    "buckets": dict(zip(map(str, BUCKETS), h.counts)),
+                }
+                for name, h in _histograms.items()
+            },
+            "counters": dict(_counters),
+        }
+
+
+# Sum of two snapshots (either may be None)
+def merge(first, second):
+    merged = {"histograms": {}, "counters": {}}
+    for data in (first, second):
+        if not data:
+            continue
+        for name, values in data["histograms"].items():
+            total = merged["histograms"].setdefault(
+                name, {"count": 0, "sum": 0.0, "buckets": {}}
+            )
+            total["count"] += values["count"]
+            total["sum"] += values["sum"]
+            for bound, bucket_count in values["buckets"].items():
+                total["buckets"][bound] = total["buckets"].get(bound, 0) + bucket_count
+        for name, value in data["counters"].items():
+            merged["counters"][name] = merged["counters"].get(name, 0) + value
+    return merged
+
+
+def to_json_lines(data=None):
+    data = data or snapshot()
+    header = {"ts": time.time(), "role": ROLE, "pid": os.getpid()}
+    lines = [
+        json.dumps({**header, "type": "histogram", "name": name, **values})
+        for name, values in data["histograms"].items()
+    ]
+    lines += [
+        json.dumps({**header, "type": "counter", "name": name, "value": value})
+        for name, value in data["counters"].items()
+    ]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _prometheus_name(name):
+    return "mt5_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+# Prometheus text for {role: snapshot}, every series labelled with its role
+# (this process's snapshot by default)
+def to_prometheus(roles=None):
+    roles = roles or {ROLE: snapshot()}
+    metrics = {}  # metric -> (type, lines), so each gets one TYPE line
+    for role, data in sorted(roles.items()):
+        for name, values in data["histograms"].items():
+            metric = _prometheus_name(name) + "_seconds"
+            lines = metrics.setdefault(metric, ("histogram", []))[1]
+            cumulative = 0
+            for bound, bucket_count in values["buckets"].items():
+                cumulative += bucket_count
+                label = "+Inf" if bound == "inf" else bound
+                lines.append(
+                    f'{metric}_bucket{{role="{role}",le="{label}"}} {cumulative}'
+                )
+            lines.append(f'{metric}_sum{{role="{role}"}} {values["sum"]}')
+            lines.append(f'{metric}_count{{role="{role}"}} {values["count"]}')
+        for name, value in data["counters"].items():
+            metric = _prometheus_name(name) + "_total"
+            metrics.setdefault(metric, ("counter", []))[1].append(
+                f'{metric}{{role="{role}"}} {value}'
+            )
+    lines = []
+    for metric, (kind, series) in metrics.items():
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(series)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+# Write this process's metrics to the output file. The strategy scripts and
+# the worker all export to the same path, so this runs under a lock file:
+# JSON lines are appended (tagged with role and pid); for Prometheus, each
+# role's totals accumulate in <path>.state.json and the whole file is
+# rebuilt from it, so no process overwrites another's series.
+def export(path=None):
+    path = path or OUTPUT_PATH
+    if not path:
+        return
+    data = snapshot()
+    with locked(path + ".lock"):
+        if not path.endswith(".prom"):
+            with open(path, "a") as f:
+                f.write(to_json_lines(data))
+            return
+        state_path = path + ".state.json"
+        try:
+            with open(state_path) as f:
+                roles = json.load(f)
+        except (OSError, ValueError):
+            roles = {}
+        roles[ROLE] = merge(roles.get(ROLE), data)
+        write_atomic(state_path, json.dumps(roles))
+        write_atomic(path, to_prometheus(roles))
+
+
+if ENABLED:
+    atexit.register(export)
@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# File identity used to detect a rewritten model without re-reading it every time
+def _stat_key(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# True when the model and scaler were saved together (save_model_and_scaler
+# stamps both with the same artifact_version_; older files have none)
+def versions_match(model, scaler):
+    return getattr(model, "artifact_version_", None) == getattr(
+        scaler, "artifact_version_", None
+    )
+
+
+# Load a model and its scaler. A mismatch means a writer is between its two
+# replaces, so try again shortly; raises RuntimeError if it persists.
+def load_matching(model_path, scaler_path, retries=20, delay=0.05):
+    import joblib
+
+    for _ in range(retries):
+        model = joblib.load(model_path)
+        scaler = joblib.load(scaler_path)
+        if versions_match(model, scaler):
+            return model, scaler
+        time.sleep(delay)
+    raise RuntimeError(f"{model_path} and {scaler_path} come from different trainings")
+
+
+class ModelCache:
+    """Process-wide cache of (model, scaler) pairs with LRU eviction.
+
+    An entry is reused while the files' mtime/size are unchanged. When they
+    change, the content hash decides whether the files are actually reloaded.
+    A model and scaler from different trainings are never paired: the
+    previous entry is kept until the files match again.
+    """
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    def get(self, model_path, scaler_path):
+        key = (os.path.abspath(model_path), os.path.abspath(scaler_path))
+        # Raises FileNotFoundError when a file is missing, like joblib.load
+        stats = (_stat_key(key[0]), _stat_key(key[1]))
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry["stats"] == stats:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry["model"], entry["scaler"]
+
+            hashes = (_file_hash(key[0]), _file_hash(key[1]))
+            if entry is not None and entry["hashes"] == hashes:
+                # Touched but not rewritten
+                entry["stats"] = stats
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry["model"], entry["scaler"]
+
+            if entry is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+                logging.info(f"Model files changed, reloading {model_path}")
+
+            try:
+                model, scaler = load_matching(key[0], key[1])
+            except RuntimeError:
+                if entry is None:
+                    raise
+                logging.warning(
+                    f"{model_path} and its scaler differ, keeping the loaded pair"
+                )
+                return entry["model"], entry["scaler"]
+            self.entries[key] = {
+                "model": model,
+                "scaler": scaler,
+                "stats": stats,
+                "hashes": hashes,
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            return model, scaler
+
+    def invalidate(self, model_path=None, scaler_path=None):
+        with self.lock:
+            if model_path is None:
+                self.entries.clear()
+                return
+            key = (os.path.abspath(model_path), os.path.abspath(scaler_path))
+            self.entries.pop(key, None)
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "evictions": self.evictions,
+        }
+
+
+# Shared cache used by predict_action
+model_cache = ModelCache()
+
+
+def load_model_and_scaler(model_path, scaler_path):
+    return model_cache.get(model_path, scaler_path)
+
+
+_flat_models = {}
+
+
+# FlatForest export of the model (NumPy only), reused while the file is unchanged
+def load_flat_model(path):
+    from flat_forest import FlatForest
+
+    key = os.path.abspath(path)
+    stats = _stat_key(key)
+    entry = _flat_models.get(key)
+    if entry is None or entry[0] != stats:
+        entry = _flat_models[key] = (stats, FlatForest.load(key))
+    return entry[1]
@@ -0,0 +1,189 @@
+import json
+import logging
+import os
+import time
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import ParameterSampler, TimeSeriesSplit, cross_val_score
+
+# Candidate values for the RandomForest hyperparameters
+# (n_estimators is the resource successive halving grows for the surviving candidates)
+SEARCH_SPACE = {
+    "max_depth": [None, 5, 10, 20, 30],
+    "min_samples_split": [2, 5, 10, 20],
+    "min_samples_leaf": [1, 2, 4, 8],
+}
+
+# Where the results of the last search are kept for warm-starting the next one
+HISTORY_PATH = "model_search.json"
+
+
+def load_search_history(path=HISTORY_PATH):
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except ValueError:
+        logging.warning(f"Ignoring unreadable search history {path}")
+        return None
+
+
+def save_search_history(history, path=HISTORY_PATH):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# Narrow each parameter to the previous best value and its neighbours
+def warm_start_space(history, space=SEARCH_SPACE):
+    if not history or not history.get("best_params"):
+        return space
+    narrowed = {}
+    for name, values in space.items():
+        best = history["best_params"].get(name, values[0])
+        if best not in values:
+            narrowed[name] = values
+            continue
+        i = values.index(best)
+        narrowed[name] = values[max(0, i - 1) : i + 2]
+    return narrowed
+
+
+# One successive-halving pass: every sampled candidate is scored on time-ordered
+# folds with min_estimators trees, the best third goes on with three times as
+# many, and so on up to max_estimators. Returns the candidates scored at the
+# last rung that was completed before the deadline (None if none was).
+def halving_round(
+    X,
+    y,
+    space,
+    deadline,
+    n_candidates,
+    min_estimators,
+    max_estimators,
+    n_splits,
+    random_state,
+    sample_seed,
+    factor=3,
+):
+    candidates = list(
+        ParameterSampler(space, n_iter=n_candidates, random_state=sample_seed)
+    )
+    rungs = 1
+    while (
+        min_estimators * factor**rungs <= max_estimators
+        and factor**rungs <= len(candidates)
+    ):
+        rungs += 1
+
+    cv = TimeSeriesSplit(n_splits=n_splits)
+    finalists = None
+    n_estimators = min_estimators
+    fit_seconds = 0.0  # how long the last candidate took, to skip one that won't fit
+    for rung in range(rungs):
+        scored = []
+        for params in candidates:
+            fit_start = time.perf_counter()
+            if fit_start + fit_seconds > deadline:
+                # Part-way through a rung: the scores so far only count when
+                # there is no complete rung to fall back on
+                return finalists or scored or None
+            params = {**params, "n_estimators": n_estimators}
+            model = RandomForestClassifier(
+                random_state=random_state, n_jobs=-1, **params
+            )
+            score = cross_val_score(model, X, y, cv=cv, scoring="accuracy").mean()
+            scored.append({"params": params, "score": float(score)})
+            fit_seconds = time.perf_counter() - fit_start
+        finalists = scored
+        # The best third carries on; n_estimators is overridden at the next rung
+        scored = sorted(scored, key=lambda r: r["score"], reverse=True)
+        candidates = [r["params"] for r in scored[: -(-len(scored) // factor)]]
+        n_estimators *= factor
+        fit_seconds *= factor
+    return finalists
+
+
+def search_model(
+    X,
+    y,
+    time_budget=10.0,
+    n_candidates=12,
+    max_estimators=100,
+    n_splits=3,
+    history_path=HISTORY_PATH,
+    random_state=42,
+    max_rounds=4,
+):
+    """Successive-halving random search over time-ordered folds.
+
+    Every fit is checked against one deadline of time_budget seconds from
+    the call: a candidate is only scored when it should finish in time, so
+    the search stops part-way through a round rather than overrunning it,
+    and does not start at all with no budget left. When
+    nothing was scored in time the previous best parameters (or the
+    RandomForest defaults) are returned. The budget covers the search only:
+    refitting the chosen parameters on the full training set, as train_model
+    does, comes on top of it.
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+    history = load_search_history(history_path)
+    space = warm_start_space(history)
+    if space is not SEARCH_SPACE:
+        logging.info(f"Warm-starting search from {history['best_params']}")
+
+    results = []
+    for round_number in range(max_rounds):
+        if time.perf_counter() >= deadline:
+            break
+        space_size = 1
+        for values in space.values():
+            space_size *= len(values)
+        finalists = halving_round(
+            X,
+            y,
+            space,
+            deadline,
+            n_candidates=min(n_candidates, space_size),
+            min_estimators=10,
+            max_estimators=max_estimators,
+            n_splits=n_splits,
+            random_state=random_state,
+            sample_seed=random_state + round_number,
+        )
+        if not finalists:
+            break
+        results.extend(finalists)
+        # Later rounds sample around the best candidate found so far
+        space = warm_start_space(
+            {"best_params": max(results, key=lambda r: r["score"])["params"]}
+        )
+
+    elapsed = time.perf_counter() - start
+    if not results:
+        params = dict(history["best_params"]) if history else {}
+        logging.warning(
+            f"No candidate scored within the {time_budget}s budget, using {params or 'defaults'}"
+        )
+        return params, results
+
+    results.sort(key=lambda r: r["score"], reverse=True)
+    best = results[0]
+    logging.info(
+        f"Search finished in {elapsed:.1f}s over {len(results)} finalists, "
+        f"best score {best['score']:.3f} with {best['params']}"
+    )
+    if history_path:
+        save_search_history(
+            {
+                "best_params": best["params"],
+                "best_score": best["score"],
+                "elapsed": elapsed,
+                "top": results[:10],
+            },
+            history_path,
+        )
+    return best["params"], results
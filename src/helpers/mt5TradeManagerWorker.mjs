@@ -0,0 +1,120 @@
+import { spawn } from 'child_process';
+import readline from 'readline';
+import path from 'path';
+import { fileURLToPath } from 'url';
+
+// Get current directory path
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const pythonScriptPath = path.join(__dirname, 'mt5_trade_manager.py');
+const REQUEST_TIMEOUT_MS = 30000;
+
+let worker = null;
+let nextRequestId = 1;
+const pendingRequests = new Map();
+
+// Reject the requests sent to this child and forget it so the next call respawns
+// the worker (requests already sent to a replacement worker are left alone)
+const failWorker = (child, error) => {
+    if (worker === child) {
+        worker = null;
+    }
+    for (const [id, pending] of pendingRequests) {
+        if (pending.child !== child) {
+            continue;
+        }
+        clearTimeout(pending.timer);
+        pending.reject(error);
+        pendingRequests.delete(id);
+    }
+};
+
+// Start the long-lived Python worker (connects to MT5 once)
+const startWorker = () => {
+    const child = spawn('python', [pythonScriptPath, 'serve']);
+    worker = child;
+
+    const lines = readline.createInterface({ input: child.stdout });
+    lines.on('line', (line) => {
+        let response;
+        try {
+            response = JSON.parse(line);
+        } catch (parseError) {
+            console.error('Worker parsing error:', parseError);
+            return;
+        }
+        const pending = pendingRequests.get(response.id);
+        if (!pending) {
+            return;
+        }
+        // Streamed records arrive one per line ahead of the final result
+        if ('item' in response) {
+            pending.onItem(response.item);
+            return;
+        }
+        pendingRequests.delete(response.id);
+        clearTimeout(pending.timer);
+        if (response.error) {
+            pending.reject(new Error(response.error));
+        } else {
+            pending.resolve(response.result);
+        }
+    });
+
+    // The worker logs to stderr; forward it without treating it as a failure
+    child.stderr.on('data', (data) => {
+        console.log(`mt5_trade_manager: ${data.toString().trim()}`);
+    });
+
+    // Python missing or not startable: 'exit' may never fire, so fail here
+    child.on('error', (error) => {
+        console.error('Failed to start mt5_trade_manager worker:', error);
+        failWorker(child, new Error(`MT5 worker failed: ${error.message}`));
+    });
+
+    // Writes to a worker that died or never started
+    child.stdin.on('error', (error) => {
+        console.error('mt5_trade_manager worker stdin error:', error);
+        failWorker(child, new Error(`MT5 worker failed: ${error.message}`));
+    });
+
+    child.on('exit', (code) => {
+        console.error(`mt5_trade_manager worker exited with code ${code}`);
+        failWorker(child, new Error('MT5 worker exited'));
+    });
+};
+
+// Send a command to the worker, restarting it if it is not running.
+// With a session ({ login, server }) the command runs against that logged-in account.
+// With onItem the result is streamed: onItem gets each record as it arrives and the
+// promise resolves to { streamed: count } once all have been delivered.
+export const runTradeManagerCommand = (command, args = [], session = null, onItem = null) => {
+    if (!worker) {
+        startWorker();
+    }
+
+    const child = worker;
+    return new Promise((resolve, reject) => {
+        const id = nextRequestId++;
+        // A worker that stops answering is killed, so later calls get a fresh one
+        const timer = setTimeout(() => {
+            pendingRequests.delete(id);
+            reject(new Error(`MT5 worker timed out on ${command}`));
+            failWorker(child, new Error(`MT5 worker restarted after timing out on ${command}`));
+            child.kill();
+        }, REQUEST_TIMEOUT_MS);
+
+        pendingRequests.set(id, { resolve, reject, timer, onItem, child });
+        const stream = Boolean(onItem);
+        child.stdin.write(`${JSON.stringify({ id, command, args, session, stream })}\n`);
+    });
+};
+
+// Stop the worker (e.g. on server shutdown)
+export const stopTradeManagerWorker = () => {
+    if (worker) {
+        worker.stdin.end();
+        worker = null;
+    }
+};
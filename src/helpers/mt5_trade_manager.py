@@ -2,10 +2,22 @@ import MetaTrader5 as mt5
 import sys
 import json
 import logging
+import time
+from bulk_close import bulk_close
+from batch_orders import place_orders
+from open_trades import ndjson_records, open_trades
+from execution_log import report as execution_report
+from metrics import instrument_terminal, snapshot, timed
+import order_sender
+from session_manager import session_manager
+from symbol_cache import invalidate
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+# Time terminal calls when MT5_METRICS is set
+instrument_terminal(mt5)
+
 
 # Function to connect to MetaTrader 5
 def connect_mt5():
@@ -15,189 +27,77 @@ def connect_mt5():
     return True
 
 
-# Function to get all open trades
-def get_open_trades():
-    positions = mt5.positions_get()
-    if positions is None:
-        logging.error("Failed to retrieve positions.")
-        return []
-    return [pos._asdict() for pos in positions]
+# Function to make sure the terminal is still reachable, reconnecting if needed.
+# The terminal may come back on another account, so the session manager and
+# the symbol and filling-mode caches start over.
+def ensure_connected(retries=3, backoff=0.5):
+    if mt5.terminal_info() is not None:
+        return True
+    logging.warning("Lost connection to MT5, reconnecting...")
+    session_manager.reset()
+    invalidate()
+    order_sender.reset()
+    mt5.shutdown()
+    for attempt in range(retries):
+        if connect_mt5():
+            logging.info("Reconnected to MT5.")
+            return True
+        time.sleep(backoff * (attempt + 1))
+    return False
 
 
-# Function to close all open trades
-def close_all_trades():
-    positions = mt5.positions_get()
-    if positions is None:
-        logging.error("Failed to retrieve positions.")
-        return {"error": "Failed to retrieve positions."}
-
-    for position in positions:
-        ticket = position.ticket
-        action = mt5.TRADE_ACTION_DEAL
-        volume = position.volume
-        position_type = position.type
-        price = (
-            mt5.symbol_info_tick(position.symbol).bid
-            if position_type == mt5.ORDER_TYPE_BUY
-            else mt5.symbol_info_tick(position.symbol).ask
-        )
+# Function to get all open trades; optionally a projection filtered by
+# symbol/magic, as a delta when `since` is given
+@timed("trade_manager.get_open_trades")
+def get_open_trades(fields=None, symbol=None, magic=None, since=None):
+    return open_trades(fields, symbol, magic, since)
 
-        close_request = {
-            "action": action,
-            "symbol": position.symbol,
-            "volume": volume,
-            "type": (
-                mt5.ORDER_TYPE_SELL
-                if position_type == mt5.ORDER_TYPE_BUY
-                else mt5.ORDER_TYPE_BUY
-            ),
-            "position": ticket,
-            "price": price,
-            "deviation": 10,
-            "magic": 234000,
-            "comment": "Close trade via API",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
-
-        result = mt5.order_send(close_request)
-        if result is None:
-            logging.error(
-                f"Failed to close position {ticket}: No response from order_send"
-            )
-            return {
-                "error": f"Failed to close position {ticket}: No response from order_send"
-            }
-        if result.retcode != mt5.TRADE_RETCODE_DONE:
-            logging.error(f"Failed to close position {ticket}: {result.comment}")
-            return {"error": f"Failed to close position {ticket}: {result.comment}"}
-        else:
-            logging.info(f"Successfully closed position {ticket}")
 
-    return {"status": "All trades closed successfully"}
+# Attach the overall status the API has always returned to a bulk close summary
+def _with_status(summary, success_message, failure_message):
+    if "error" in summary:
+        return summary
+    if summary["failed"]:
+        summary["error"] = f"{failure_message}: {len(summary['failed'])} failed"
+    else:
+        summary["status"] = success_message
+    return summary
+
+
+# Function to close all open trades
+@timed("trade_manager.close_all_trades")
+def close_all_trades():
+    return _with_status(
+        bulk_close(comment="Close trade via API"),
+        "All trades closed successfully",
+        "Failed to close all trades",
+    )
 
 
 # Function to close trades in profit
+@timed("trade_manager.close_trades_in_profit")
 def close_trades_in_profit():
-    positions = mt5.positions_get()
-    if positions is None:
-        logging.error("Failed to retrieve positions.")
-        return {"error": "Failed to retrieve positions."}
-
-    for position in positions:
-        ticket = position.ticket
-        profit = position.profit
-
-        if profit > 0:
-            action = mt5.TRADE_ACTION_DEAL
-            volume = position.volume
-            position_type = position.type
-            symbol = position.symbol
-            tick = mt5.symbol_info_tick(symbol)
-            if tick is None:
-                logging.error(f"Failed to get symbol tick info for {symbol}")
-                continue
-
-            price = tick.bid if position_type == mt5.ORDER_TYPE_BUY else tick.ask
-
-            close_request = {
-                "action": action,
-                "symbol": symbol,
-                "volume": volume,
-                "type": (
-                    mt5.ORDER_TYPE_SELL
-                    if position_type == mt5.ORDER_TYPE_BUY
-                    else mt5.ORDER_TYPE_BUY
-                ),
-                "position": ticket,
-                "price": price,
-                "deviation": 10,
-                "magic": 234000,
-                "comment": "Close profit trade",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
-            }
-
-            logging.info(f"Attempting to send close request: {close_request}")
-
-            result = mt5.order_send(close_request)
-            if result is None:
-                error_message = mt5.last_error()
-                logging.error(
-                    f"Failed to close profitable position {ticket}: No response from order_send. Error: {error_message}"
-                )
-                continue  # Skip to the next position
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                logging.error(
-                    f"Failed to close profitable position {ticket}: {result.comment}"
-                )
-                continue  # Skip to the next position
-            logging.info(f"Successfully closed profitable position {ticket}")
-
-    return {"status": "All profitable trades closed successfully"}
+    return _with_status(
+        bulk_close(lambda position: position.profit > 0, comment="Close profit trade"),
+        "All profitable trades closed successfully",
+        "Failed to close profitable trades",
+    )
 
 
 # Function to close trades in loss
+@timed("trade_manager.close_trades_in_loss")
 def close_trades_in_loss():
-    positions = mt5.positions_get()
-    if positions is None:
-        logging.error("Failed to retrieve positions.")
-        return {"error": "Failed to retrieve positions."}
-
-    for position in positions:
-        ticket = position.ticket
-        profit = position.profit
-
-        if profit < 0:
-            action = mt5.TRADE_ACTION_DEAL
-            volume = position.volume
-            position_type = position.type
-            price = (
-                mt5.symbol_info_tick(position.symbol).bid
-                if position_type == mt5.ORDER_TYPE_BUY
-                else mt5.symbol_info_tick(position.symbol).ask
-            )
-
-            close_request = {
-                "action": action,
-                "symbol": position.symbol,
-                "volume": volume,
-                "type": (
-                    mt5.ORDER_TYPE_SELL
-                    if position_type == mt5.ORDER_TYPE_BUY
-                    else mt5.ORDER_TYPE_BUY
-                ),
-                "position": ticket,
-                "price": price,
-                "deviation": 10,
-                "magic": 234000,
-                "comment": "Close losing trade via API",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
-            }
-
-            result = mt5.order_send(close_request)
-            if result is None:
-                logging.error(
-                    f"Failed to close losing position {ticket}: No response from order_send"
-                )
-                return {
-                    "error": f"Failed to close losing position {ticket}: No response from order_send"
-                }
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                logging.error(
-                    f"Failed to close losing position {ticket}: {result.comment}"
-                )
-                return {
-                    "error": f"Failed to close losing position {ticket}: {result.comment}"
-                }
-            else:
-                logging.info(f"Successfully closed losing position {ticket}")
-
-    return {"status": "All losing trades closed successfully"}
+    return _with_status(
+        bulk_close(
+            lambda position: position.profit < 0, comment="Close losing trade via API"
+        ),
+        "All losing trades closed successfully",
+        "Failed to close losing trades",
+    )
 
 
 # Function to check if autotrade is active
+@timed("trade_manager.is_autotrade_active")
 def is_autotrade_active():
     account_info = mt5.account_info()
     if account_info is None:
@@ -208,6 +108,7 @@ def is_autotrade_active():
 
 
 # Function to enable or disable autotrade
+@timed("trade_manager.set_autotrade")
 def set_autotrade(status):
     # Simulating enabling/disabling autotrade
     if status:
@@ -217,50 +118,129 @@ def set_autotrade(status):
     return {"status": f"Autotrade {'enabled' if status else 'disabled'}"}
 
 
+# Commands available to the worker, keyed by the same names as the CLI
+COMMANDS = {
+    "get_open_trades": get_open_trades,
+    "close_all_trades": close_all_trades,
+    "close_trades_in_profit": close_trades_in_profit,
+    "close_trades_in_loss": close_trades_in_loss,
+    "is_autotrade_active": is_autotrade_active,
+    "set_autotrade": set_autotrade,
+    "place_orders": timed("trade_manager.place_orders")(place_orders),
+    "metrics": snapshot,
+    "execution_report": execution_report,
+    "login": session_manager.open,
+    "logout": session_manager.close,
+    "sessions": session_manager.stats,
+}
+
+
+# Function to run one worker request and build its response; a request with a
+# "session": {"login", "server"} runs against that logged-in account
+def handle_request(request):
+    request_id = request.get("id")
+    command = COMMANDS.get(request.get("command"))
+    if command is None:
+        return {"id": request_id, "error": f"Unknown command: {request.get('command')}"}
+    if not ensure_connected():
+        return {"id": request_id, "error": "Failed to connect to MT5"}
+    session = request.get("session")
+    try:
+        if session:
+            result = session_manager.run(
+                session["login"], session["server"], command, *request.get("args", [])
+            )
+        else:
+            result = command(*request.get("args", []))
+        return {"id": request_id, "result": result}
+    except Exception as e:
+        logging.error(f"Command {request.get('command')} failed: {e}")
+        return {"id": request_id, "error": str(e)}
+
+
+# Lines for a response; with "stream" set, a get_open_trades result goes out
+# one {"id", "item"} line per NDJSON record before the closing result line
+def response_lines(request, response):
+    if not request.get("stream") or "result" not in response:
+        yield json.dumps(response, default=str)
+        return
+    request_id = response["id"]
+    count = 0
+    for record in ndjson_records(response["result"]):
+        yield json.dumps({"id": request_id, "item": record}, default=str)
+        count += 1
+    yield json.dumps({"id": request_id, "result": {"streamed": count}})
+
+
+# Long-lived worker: connect once, then answer one JSON request per stdin line
+def serve(stdin=sys.stdin, stdout=sys.stdout):
+    if not connect_mt5():
+        logging.warning("MT5 not available yet, will retry on first request.")
+    try:
+        for line in stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = {}
+                response = {"id": None, "error": "Invalid JSON request"}
+            else:
+                response = handle_request(request)
+            for response_line in response_lines(request, response):
+                stdout.write(response_line + "\n")
+            stdout.flush()
+    finally:
+        mt5.shutdown()
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python mt5_trade_manager.py <command> [<status>]")
+        print(
+            "Usage: python mt5_trade_manager.py <command|serve> [<status>] "
+            "[fields=<a,b>] [symbol=<symbol>] [magic=<magic>] [--ndjson]"
+        )
         sys.exit(1)
 
     command = sys.argv[1]
 
-    if command == "get_open_trades":
+    if command == "serve":
+        serve()
+    elif command == "get_open_trades":
+        # Optional fields=a,b symbol=X magic=N, and --ndjson for one position per line
+        options = dict(arg.split("=", 1) for arg in sys.argv[2:] if "=" in arg)
         if connect_mt5():
-            trades = get_open_trades()
+            trades = get_open_trades(
+                options.get("fields"), options.get("symbol"), options.get("magic")
+            )
             mt5.shutdown()
-            print(json.dumps(trades))
+            if "--ndjson" in sys.argv[2:]:
+                for record in ndjson_records(trades):
+                    sys.stdout.write(json.dumps(record) + "\n")
+            else:
+                print(json.dumps(trades))
         else:
             print(json.dumps({"error": "Failed to connect to MT5"}))
     elif command == "close_all_trades":
         if connect_mt5():
-            success = close_all_trades()
+            result = close_all_trades()
             mt5.shutdown()
-            if success:
-                print(json.dumps({"status": "All trades closed successfully"}))
-            else:
-                print(json.dumps({"error": "Failed to close all trades"}))
+            print(json.dumps(result))
         else:
             print(json.dumps({"error": "Failed to connect to MT5"}))
     elif command == "close_trades_in_profit":
         if connect_mt5():
-            success = close_trades_in_profit()
+            result = close_trades_in_profit()
             mt5.shutdown()
-            if success:
-                print(
-                    json.dumps({"status": "All profitable trades closed successfully"})
-                )
-            else:
-                print(json.dumps({"error": "Failed to close profitable trades"}))
+            print(json.dumps(result))
         else:
             print(json.dumps({"error": "Failed to connect to MT5"}))
     elif command == "close_trades_in_loss":
         if connect_mt5():
-            success = close_trades_in_loss()
+            result = close_trades_in_loss()
             mt5.shutdown()
-            if success:
-                print(json.dumps({"status": "All losing trades closed successfully"}))
-            else:
-                print(json.dumps({"error": "Failed to close losing trades"}))
+            print(json.dumps(result))
         else:
             print(json.dumps({"error": "Failed to connect to MT5"}))
     elif command == "is_autotrade_active":
@@ -0,0 +1,205 @@
+import logging
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from flat_forest import export_forest, flat_path_for, save_flat_forest
+from model_cache import load_matching
+from price_action_script import FEATURE_COLUMNS, save_model_and_scaler
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+class OnlineModelUpdater:
+    """Keeps the saved RandomForest current as new candles close.
+
+    Each closed bar labels the previous one (target as in train_model: next
+    close above this close). Every `update_every` new samples, a few trees
+    are grown on the sliding window with warm_start and the oldest trees are
+    dropped past `max_trees`. The scaler stays as trained for the model's
+    lifetime: the kept trees' split thresholds are in its units, so new
+    trees must be fitted in the same ones. The update is kept only if
+    accuracy on the most recent `validation_size` samples does not drop by
+    more than `tolerance`. Appended trees are capped at `max_leaves` leaves so
+    the model stays small, and the model and its flat export are saved every
+    `save_every` accepted updates (and by save()), so most updates skip the
+    pickling; other processes pick up the saved model at that pace.
+    """
+
+    def __init__(
+        self,
+        model_path="price_action_model.pkl",
+        scaler_path="scaler.pkl",
+        flat_path=None,
+        window=2000,
+        trees_per_update=5,
+        max_trees=200,
+        validation_size=200,
+        tolerance=0.02,
+        update_every=1,
+        max_leaves=256,
+        save_every=10,
+    ):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.flat_path = flat_path or flat_path_for(model_path)
+        self.model, self.scaler = load_matching(model_path, scaler_path)
+        self.trees_per_update = trees_per_update
+        self.max_trees = max_trees
+        self.validation_size = validation_size
+        self.tolerance = tolerance
+        self.update_every = update_every
+        self.max_leaves = max_leaves
+        self.save_every = save_every
+        self.features = deque(maxlen=window)
+        self.targets = deque(maxlen=window)
+        self.new_samples = 0  # labeled since the last update
+        self.pending = None
+        self.updates = 0
+        self.rollbacks = 0
+        self.unsaved = 0  # accepted updates not yet written to disk
+
+    # Fill the window from preprocessed history
+    def seed(self, data):
+        rows = data[FEATURE_COLUMNS].to_numpy(dtype=float)
+        closes = data["close"].to_numpy(dtype=float)
+        for i in range(len(rows) - 1):
+            self.features.append(rows[i])
+            self.targets.append(int(closes[i + 1] > closes[i]))
+        self.pending = rows[-1] if len(rows) else None
+
+    # Add a newly closed bar's feature row; runs an update when one is due
+    def add_bar(self, row):
+        values = np.array([row[column] for column in FEATURE_COLUMNS], dtype=float)
+        if self.pending is not None:
+            close_index = FEATURE_COLUMNS.index("close")
+            self.features.append(self.pending)
+            self.targets.append(int(values[close_index] > self.pending[close_index]))
+            self.new_samples += 1
+        self.pending = values
+        if self.new_samples >= self.update_every:
+            return self.update()
+        return None
+
+    def _accuracy(self, X, y):
+        return float((self.model.predict(self.scaler.transform(X)) == y).mean())
+
+    def update(self):
+        start = time.perf_counter()
+        X = pd.DataFrame(np.array(self.features), columns=FEATURE_COLUMNS)
+        y = np.array(self.targets)
+        if len(y) <= self.validation_size or len(np.unique(y)) < 2:
+            return None
+        X_train, y_train = X.iloc[: -self.validation_size], y[: -self.validation_size]
+        X_val, y_val = X.iloc[-self.validation_size :], y[-self.validation_size :]
+        if len(np.unique(y_train)) < 2:
+            return None
+
+        before = self._accuracy(X_val, y_val)
+        saved_trees = list(self.model.estimators_)
+        self.new_samples = 0
+        # A fresh seed per update so new trees never repeat a dropped tree's seed;
+        # the leaf cap only applies to the trees grown from here on
+        self.model.set_params(
+            warm_start=True,
+            n_estimators=len(saved_trees) + self.trees_per_update,
+            random_state=self.updates + self.rollbacks + 1,
+            max_leaf_nodes=self.max_leaves,
+        )
+        self.model.fit(self.scaler.transform(X_train), y_train)
+        if len(self.model.estimators_) > self.max_trees:
+            self.model.estimators_ = self.model.estimators_[-self.max_trees :]
+            self.model.set_params(n_estimators=self.max_trees)
+
+        after = self._accuracy(X_val, y_val)
+        if after < before - self.tolerance:
+            self.model.estimators_ = saved_trees
+            self.model.set_params(n_estimators=len(saved_trees))
+            self.rollbacks += 1
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logging.warning(
+                f"Online update rolled back: accuracy {before:.3f} -> {after:.3f}"
+            )
+            return {
+                "accepted": False,
+                "before": before,
+                "after": after,
+                "saved": False,
+                "ms": elapsed_ms,
+            }
+
+        self.updates += 1
+        self.unsaved += 1
+        saved = self.unsaved >= self.save_every
+        if saved:
+            self.save()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logging.info(
+            f"Online update {self.updates}: accuracy {before:.3f} -> {after:.3f} "
+            f"in {elapsed_ms:.1f} ms{' (saved)' if saved else ''}"
+        )
+        return {
+            "accepted": True,
+            "before": before,
+            "after": after,
+            "saved": saved,
+            "ms": elapsed_ms,
+        }
+
+    # Write the model, scaler and flat export (predict_action serves the flat
+    # export when it is current)
+    def save(self):
+        save_model_and_scaler(self.model, self.scaler, self.model_path, self.scaler_path)
+        save_flat_forest(export_forest(self.model, self.scaler), self.flat_path)
+        self.unsaved = 0
+
+
+# Follow a symbol's M1 bars and update the model after each closed candle
+def run(symbol, poll_interval=5.0, history=2000):
+    import MetaTrader5 as mt5
+
+    from candle_store import CandleStore
+    from incremental_features import IncrementalFeatureEngine
+    from price_action_script import connect, disconnect, get_candlestick_data
+
+    connect()
+    try:
+        store = CandleStore()
+        candles = get_candlestick_data(symbol, mt5.TIMEFRAME_M1, history, store=store)
+        closed = candles.iloc[:-1]  # the last bar is still forming
+        engine = IncrementalFeatureEngine()
+        rows = [engine.update(bar) for bar in closed.to_dict("records")]
+        updater = OnlineModelUpdater()
+        updater.seed(pd.DataFrame([row for row in rows if row is not None]))
+        last_time = closed["time"].iloc[-1]
+
+        try:
+            while True:
+                time.sleep(poll_interval)
+                candles = get_candlestick_data(
+                    symbol, mt5.TIMEFRAME_M1, 10, store=store
+                )
+                for bar in candles.iloc[:-1].to_dict("records"):
+                    if bar["time"] <= last_time:
+                        continue
+                    last_time = bar["time"]
+                    row = engine.update(bar)
+                    if row is not None:
+                        updater.add_bar(row)
+        finally:
+            # Keep the accepted updates made since the last save
+            if updater.unsaved:
+                updater.save()
+    finally:
+        disconnect()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python online_learning.py <symbol> [<poll_interval>]")
+        sys.exit(1)
+    run(sys.argv[1], float(sys.argv[2]) if len(sys.argv) > 2 else 5.0)
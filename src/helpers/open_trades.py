@@ -0,0 +1,137 @@
+import itertools
+import logging
+import os
+import threading
+from collections import OrderedDict
+from operator import attrgetter
+
+import MetaTrader5 as mt5
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# A position whose values here move between snapshots is reported as changed
+# (volume too, since a partial close keeps the ticket)
+WATCHED_FIELDS = ("price_current", "profit", "sl", "tp", "volume")
+_watched = attrgetter(*WATCHED_FIELDS)
+
+
+class SnapshotStore:
+    """Recent position snapshots, keyed by the token handed out with each one.
+
+    A snapshot only holds the watched values per ticket. Tokens carry a
+    per-process prefix, so a token from before a worker restart is unknown
+    and the caller gets a full snapshot again. The oldest snapshots are
+    dropped beyond max_snapshots.
+    """
+
+    def __init__(self, max_snapshots=16):
+        self.max_snapshots = max_snapshots
+        self.snapshots = OrderedDict()
+        self.prefix = os.urandom(4).hex()
+        self.counter = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def save(self, scope, state):
+        with self.lock:
+            token = f"{self.prefix}-{next(self.counter)}"
+            self.snapshots[token] = (scope, state)
+            while len(self.snapshots) > self.max_snapshots:
+                self.snapshots.popitem(last=False)
+            return token
+
+    # The state saved under token, or None if unknown or taken with other filters
+    def load(self, token, scope):
+        with self.lock:
+            entry = self.snapshots.get(token)
+        if entry is None or entry[0] != scope:
+            return None
+        return entry[1]
+
+
+# Shared store for the trade manager worker
+snapshots = SnapshotStore()
+
+
+# Function turning a position into a dict of the requested fields (ticket always
+# included, since deltas are keyed by it); all fields when none are given.
+# Names are checked against `available`, the fields the positions have.
+def projector(fields=None, available=None):
+    if not fields:
+        return lambda position: position._asdict()
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    names = ["ticket"] + [name for name in fields if name != "ticket"]
+    unknown = set(names) - set(available or names)
+    if unknown:
+        raise ValueError(f"Unknown position fields: {', '.join(sorted(unknown))}")
+    if len(names) == 1:
+        return lambda position: {"ticket": position.ticket}
+    getter = attrgetter(*names)
+    return lambda position: dict(zip(names, getter(position)))
+
+
+# Open positions, optionally filtered by symbol and magic number. Without
+# `since` this is the list of projected positions. With a token (or "" for a
+# first call) it is a delta against that snapshot: added and changed positions,
+# removed tickets, and a new token; an unknown token gives everything as added
+# with "reset" set.
+def open_trades(fields=None, symbol=None, magic=None, since=None):
+    positions = mt5.positions_get(symbol=symbol) if symbol else mt5.positions_get()
+    if positions is None:
+        logging.error("Failed to retrieve positions.")
+        if since is None:
+            return []
+        return {"error": "Failed to retrieve positions."}
+    project = projector(fields, positions[0]._fields if positions else None)
+    if magic is not None:
+        magic = int(magic)
+        positions = [position for position in positions if position.magic == magic]
+    if since is None:
+        return [project(position) for position in positions]
+
+    scope = (symbol, magic)
+    state = {position.ticket: _watched(position) for position in positions}
+    previous = snapshots.load(since, scope) if since else None
+    token = snapshots.save(scope, state)
+    if previous is None:
+        return {
+            "token": token,
+            "reset": True,
+            "added": [project(position) for position in positions],
+            "changed": [],
+            "removed": [],
+        }
+
+    added, changed = [], []
+    for position in positions:
+        before = previous.get(position.ticket)
+        if before is None:
+            added.append(project(position))
+        elif before != state[position.ticket]:
+            changed.append(project(position))
+    return {
+        "token": token,
+        "reset": False,
+        "added": added,
+        "changed": changed,
+        "removed": [ticket for ticket in previous if ticket not in state],
+    }
+
+
+# The records of an open_trades result, one per NDJSON line: positions as is
+# for a list; for a delta a header with the token, then positions tagged with
+# "op" ("added" or "changed") and {"op": "removed", "ticket": ...} records
+def ndjson_records(result):
+    if isinstance(result, list):
+        yield from result
+        return
+    if "error" in result:
+        yield result
+        return
+    yield {"token": result["token"], "reset": result["reset"]}
+    for op in ("added", "changed"):
+        for record in result[op]:
+            yield {"op": op, **record}
+    for ticket in result["removed"]:
+        yield {"op": "removed", "ticket": ticket}
@@ -0,0 +1,170 @@
+import logging
+import math
+import threading
+import time
+
+import MetaTrader5 as mt5
+from execution_log import new_order, start_execution
+from symbol_cache import get_symbol_info, get_tick
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Deviation (points) a symbol starts with, and the most a retry may widen it to
+DEFAULT_DEVIATION = 10
+MAX_DEVIATION = 50
+# No retry that would end more than this many seconds after the first send
+LATENCY_BUDGET = 1.5
+MAX_ATTEMPTS = 5
+
+# The price moved under the order: worth sending again at a fresh price
+RETRY_RETCODES = {
+    mt5.TRADE_RETCODE_REQUOTE,
+    mt5.TRADE_RETCODE_PRICE_CHANGED,
+    mt5.TRADE_RETCODE_PRICE_OFF,
+}
+
+_lock = threading.Lock()
+_filling = {}  # symbol -> filling modes still believed to work, preferred first
+_deviation = {}  # symbol -> deviation the next order starts with
+
+
+# Filling modes the symbol allows, IOC first (what the scripts always used),
+# with RETURN as the last resort
+def _supported_filling(symbol):
+    info = get_symbol_info(symbol)
+    flags = info.filling_mode if info is not None else 0
+    modes = []
+    if flags & mt5.SYMBOL_FILLING_IOC:
+        modes.append(mt5.ORDER_FILLING_IOC)
+    if flags & mt5.SYMBOL_FILLING_FOK:
+        modes.append(mt5.ORDER_FILLING_FOK)
+    modes.append(mt5.ORDER_FILLING_RETURN)
+    return modes
+
+
+# Filling mode to use for the symbol, detected once and cached
+def filling_mode(symbol):
+    with _lock:
+        modes = _filling.get(symbol)
+    if modes is None:
+        modes = _supported_filling(symbol)
+        with _lock:
+            modes = _filling.setdefault(symbol, modes)
+    return modes[0]
+
+
+# The broker refused `mode`: move on to the next one (None when none are left)
+def _drop_filling(symbol, mode):
+    with _lock:
+        modes = [m for m in _filling.get(symbol, []) if m != mode]
+        if modes:
+            _filling[symbol] = modes
+            return modes[0]
+        _filling.pop(symbol, None)  # detect again next time
+        return None
+
+
+def _remember_deviation(symbol, deviation, attempts):
+    with _lock:
+        if attempts > 1:
+            _deviation[symbol] = deviation
+        else:
+            # Filled first time: drift back towards the default
+            current = _deviation.get(symbol, DEFAULT_DEVIATION)
+            _deviation[symbol] = max(DEFAULT_DEVIATION, int(current * 0.8))
+
+
+# Drop cached filling modes and deviations (all symbols when None)
+def reset(symbol=None):
+    with _lock:
+        if symbol is None:
+            _filling.clear()
+            _deviation.clear()
+        else:
+            _filling.pop(symbol, None)
+            _deviation.pop(symbol, None)
+
+
+# Current quote for the side of the request: from a requote's bid/ask when
+# the server sent them, otherwise a fresh tick
+def _fresh_price(request, result):
+    is_buy = request["type"] == mt5.ORDER_TYPE_BUY
+    if result is not None and result.bid > 0 and result.ask > 0:
+        return result.ask if is_buy else result.bid
+    tick = get_tick(request["symbol"], max_age=0)
+    if tick is None:
+        return None
+    return tick.ask if is_buy else tick.bid
+
+
+# Send one order. Deals get the symbol's filling mode and deviation unless the
+# request sets them, and are sent again on a requote or price change at the
+# new price, with the deviation widened to cover the move (up to
+# max_deviation), while the latency budget allows. Returns (result, attempts).
+# first_attempt numbers the sends in the execution log and order is the
+# execution_log.Order they belong to, when an order was already sent by
+# earlier calls (bulk_close's retry rounds).
+def send_order(
+    request,
+    execution=None,
+    first_attempt=1,
+    order=None,
+    latency_budget=LATENCY_BUDGET,
+    max_attempts=MAX_ATTEMPTS,
+    max_deviation=MAX_DEVIATION,
+):
+    if request.get("action") != mt5.TRADE_ACTION_DEAL:
+        return mt5.order_send(request), 1
+    execution = execution or start_execution()
+    order = order or new_order(request)
+
+    symbol = request["symbol"]
+    request = dict(request)
+    request.setdefault("type_filling", filling_mode(symbol))
+    with _lock:
+        request.setdefault("deviation", _deviation.get(symbol, DEFAULT_DEVIATION))
+    info = get_symbol_info(symbol)
+    point = info.point if info is not None else 0.0
+
+    first_sent = time.perf_counter()
+    attempts = 0
+    while True:
+        attempts += 1
+        sent = time.perf_counter()
+        result = execution.send(request, first_attempt - 1 + attempts, order)
+        now = time.perf_counter()
+        retcode = result.retcode if result is not None else None
+        # Assume another attempt would take as long as this one did
+        over_budget = (now - first_sent) + (now - sent) > latency_budget
+        if attempts >= max_attempts or over_budget:
+            break
+
+        if retcode == mt5.TRADE_RETCODE_INVALID_FILL:
+            mode = _drop_filling(symbol, request["type_filling"])
+            if mode is None:
+                break
+            logging.warning(f"{symbol}: filling mode refused, trying mode {mode}")
+            request["type_filling"] = mode
+            continue
+        if retcode not in RETRY_RETCODES:
+            break
+
+        price = _fresh_price(request, result)
+        if price is None:
+            break
+        moved = abs(price - request["price"]) / point if point else 0.0
+        request["deviation"] = min(
+            max_deviation, max(request["deviation"] * 2, math.ceil(moved))
+        )
+        request["price"] = price
+        logging.info(
+            f"{symbol}: {result.comment} (retcode {retcode}), retrying at {price} "
+            f"with deviation {request['deviation']}"
+        )
+
+    if retcode == mt5.TRADE_RETCODE_DONE:
+        _remember_deviation(symbol, request["deviation"], attempts)
+    if attempts > 1:
+        logging.info(f"{symbol}: retcode {retcode} after {attempts} attempts")
+    return result, attempts
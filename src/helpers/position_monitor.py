@@ -0,0 +1,201 @@
+import logging
+import sys
+import time
+from collections import defaultdict, deque
+
+import MetaTrader5 as mt5
+import clock
+from execution_log import start_execution
+from order_sender import send_order
+from symbol_cache import get_symbol_info, get_tick
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+class PositionMonitor:
+    """Trailing stops and profit targets for every open position.
+
+    Each cycle makes one bulk positions_get() call and reads one tick per
+    symbol, then only sends an SLTP change when the stop moves by at least
+    min_step_points.
+    """
+
+    def __init__(
+        self,
+        trailing_stop_threshold=0.50,
+        target_profit_usd=1.0,
+        poll_interval=1.0,
+        min_step_points=5,
+        symbols=None,
+        cycle_budget=0.25,
+    ):
+        self.trailing_stop_threshold = trailing_stop_threshold
+        self.target_profit_usd = target_profit_usd
+        self.poll_interval = poll_interval
+        self.min_step_points = min_step_points
+        self.symbols = set(symbols) if symbols else None
+        self.cycle_budget = cycle_budget
+        self.cycle_times = deque(maxlen=1000)
+        self.cycles = 0
+        self.over_budget = 0
+        self.modifications = 0
+        self.closes = 0
+
+    # One pass over all positions; returns how many positions were checked
+    def run_cycle(self):
+        start = time.perf_counter()
+        positions = mt5.positions_get()
+        if positions is None:
+            logging.error(f"Failed to retrieve positions. Error: {mt5.last_error()}")
+            return 0
+
+        by_symbol = defaultdict(list)
+        for position in positions:
+            if self.symbols is None or position.symbol in self.symbols:
+                by_symbol[position.symbol].append(position)
+
+        checked = 0
+        for symbol, symbol_positions in by_symbol.items():
+            tick = get_tick(symbol, max_age=0)
+            info = get_symbol_info(symbol)
+            if tick is None or info is None:
+                logging.error(f"Failed to get tick or symbol info for {symbol}")
+                continue
+            for position in symbol_positions:
+                self._manage(position, tick, info.point)
+                checked += 1
+
+        elapsed = time.perf_counter() - start
+        self.cycle_times.append(elapsed)
+        self.cycles += 1
+        if elapsed > self.cycle_budget:
+            self.over_budget += 1
+            logging.warning(
+                f"Monitor cycle took {elapsed * 1000:.1f} ms for {checked} positions "
+                f"(budget {self.cycle_budget * 1000:.0f} ms)"
+            )
+        return checked
+
+    def _manage(self, position, tick, point):
+        is_buy = position.type == mt5.ORDER_TYPE_BUY
+        price = tick.bid if is_buy else tick.ask
+
+        if position.profit >= self.target_profit_usd:
+            logging.info(
+                f"Target profit reached for position {position.ticket}, closing the position."
+            )
+            self._close(position, price)
+            return
+
+        if position.profit < self.trailing_stop_threshold:
+            return
+
+        new_stop_loss = (
+            price - self.trailing_stop_threshold
+            if is_buy
+            else price + self.trailing_stop_threshold
+        )
+        if position.sl == 0:
+            improvement = float("inf")
+        else:
+            improvement = (
+                new_stop_loss - position.sl if is_buy else position.sl - new_stop_loss
+            )
+        if improvement < self.min_step_points * point:
+            return
+
+        request = {
+            "action": mt5.TRADE_ACTION_SLTP,
+            "symbol": position.symbol,
+            "position": position.ticket,
+            "sl": new_stop_loss,
+            "tp": position.tp,
+            "magic": 234000,
+            "comment": "Trailing stop loss adjustment",
+            "type_time": mt5.ORDER_TIME_GTC,
+        }
+        result, _ = send_order(request)
+        if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+            logging.error(
+                f"Failed to update stop loss for position {position.ticket}: "
+                f"{result.comment if result else mt5.last_error()}"
+            )
+        else:
+            self.modifications += 1
+            logging.info(
+                f"Updated stop loss for position {position.ticket} to {new_stop_loss:.5f}"
+            )
+
+    def _close(self, position, price):
+        execution = start_execution()
+        request = {
+            "action": mt5.TRADE_ACTION_DEAL,
+            "symbol": position.symbol,
+            "volume": position.volume,
+            "type": (
+                mt5.ORDER_TYPE_SELL
+                if position.type == mt5.ORDER_TYPE_BUY
+                else mt5.ORDER_TYPE_BUY
+            ),
+            "position": position.ticket,
+            "price": price,
+            "magic": 234000,
+            "comment": "Close trade via API",
+            "type_time": mt5.ORDER_TIME_GTC,
+        }
+        execution.built()
+        result, attempts = send_order(request, execution)
+        if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+            logging.error(
+                f"Position close failed for {position.ticket} after {attempts} "
+                f"attempt(s): {result.comment if result else mt5.last_error()}"
+            )
+        else:
+            self.closes += 1
+            logging.info(f"Position {position.ticket} closed successfully")
+
+    # Poll until stopped; with stop_when_flat, return once nothing is left to manage
+    def run(self, max_cycles=None, stop_when_flat=False):
+        while max_cycles is None or self.cycles < max_cycles:
+            checked = self.run_cycle()
+            if stop_when_flat and checked == 0:
+                logging.info("No open positions left to monitor.")
+                return
+            clock.sleep(self.poll_interval)
+
+    def stats(self):
+        times = sorted(self.cycle_times)
+        if not times:
+            return {"cycles": 0}
+        return {
+            "cycles": self.cycles,
+            "last_ms": self.cycle_times[-1] * 1000,
+            "p50_ms": times[len(times) // 2] * 1000,
+            "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))] * 1000,
+            "max_ms": times[-1] * 1000,
+            "over_budget": self.over_budget,
+            "modifications": self.modifications,
+            "closes": self.closes,
+        }
+
+
+if __name__ == "__main__":
+    poll_interval = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    trailing_stop_threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.50
+    target_profit_usd = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+
+    if not mt5.initialize():
+        logging.error(f"initialize() failed, error code = {mt5.last_error()}")
+        sys.exit(1)
+    monitor = PositionMonitor(
+        trailing_stop_threshold=trailing_stop_threshold,
+        target_profit_usd=target_profit_usd,
+        poll_interval=poll_interval,
+    )
+    try:
+        monitor.run()
+    except KeyboardInterrupt:
+        logging.info(f"Monitor stopped: {monitor.stats()}")
+    finally:
+        mt5.shutdown()
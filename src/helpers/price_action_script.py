@@ -1,18 +1,45 @@
 import MetaTrader5 as mt5
+import os
+import subprocess
 import sys
 import pandas as pd
 import numpy as np
 import time
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score
-import joblib
 import logging
+import clock
+from model_cache import load_flat_model, load_model_and_scaler
+from candle_store import CandleStore, get_rates
+from position_monitor import PositionMonitor
+from symbol_cache import get_symbol_info, get_tick, invalidate
+from batch_orders import volume_step_ok
+from execution_log import start_execution
+from order_sender import send_order
+from indicators import compute
+from metrics import instrument_terminal, stage, timed
+
+# scikit-learn and joblib are only imported by the training path (and by
+# predict_action when there is no up-to-date flat export of the model), so
+# the prediction and order paths start without them
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+# Time terminal calls when MT5_METRICS is set
+instrument_terminal(mt5)
+
+# Model inputs, in the order the scaler and model were fitted on
+FEATURE_COLUMNS = [
+    "open",
+    "high",
+    "low",
+    "close",
+    "volatility",
+    "momentum",
+    "sma_10",
+    "sma_50",
+    "rsi",
+]
+
 
 # MetaTrader 5 connection and disconnection
 def connect():
@@ -30,9 +57,14 @@ def disconnect():
     logging.info("Disconnected from MetaTrader 5.")
 
 
-# Retrieve candlestick data
-def get_candlestick_data(symbol, timeframe, count=100):
-    rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+# Retrieve candlestick data (through the local candle store when one is given,
+# which builds M5, M15, H1 and H4 from its M1 series)
+@timed("price_action.get_candlestick_data")
+def get_candlestick_data(symbol, timeframe, count=100, store=None):
+    if store is not None:
+        rates = get_rates(store, symbol, timeframe, count)
+    else:
+        rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
     if rates is None or len(rates) == 0:
         logging.error(
             f"Failed to retrieve data for {symbol}. Error: {mt5.last_error()}"
@@ -43,98 +75,271 @@ def get_candlestick_data(symbol, timeframe, count=100):
     return df
 
 
-# Preprocess data
-def preprocess_data(df):
+# Preprocess data (indicators are shared with other strategies when the
+# symbol and timeframe are given)
+@timed("price_action.preprocess_data")
+def preprocess_data(df, symbol=None, timeframe=None):
+    shared = {"symbol": symbol, "timeframe": timeframe}
     df["returns"] = df["close"].pct_change()
-    df["volatility"] = df["returns"].rolling(window=5).std()
-    df["momentum"] = df["close"].diff(4)
-    df["sma_10"] = df["close"].rolling(window=10).mean()
-    df["sma_50"] = df["close"].rolling(window=50).mean()
-    df["rsi"] = 100 - (
-        100
-        / (
-            1
-            + df["close"].diff().where(lambda x: x > 0, 0).rolling(window=14).mean()
-            / df["close"]
-            .diff()
-            .where(lambda x: x < 0, 0)
-            .abs()
-            .rolling(window=14)
-            .mean()
-        )
-    )
+    df["volatility"] = compute(df, "volatility", 5, **shared)
+    df["momentum"] = compute(df, "momentum", 4, **shared)
+    df["sma_10"] = compute(df, "sma", 10, **shared)
+    df["sma_50"] = compute(df, "sma", 50, **shared)
+    df["rsi"] = compute(df, "rsi", 14, **shared)
     return df.dropna()
 
 
-# Train model
-def train_model(data):
+# Save with joblib through a temporary file so readers never see a partial model
+def dump_atomic(obj, path):
+    import joblib
+
+    tmp_path = path + ".tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+# Save a model and the scaler it was fitted with. Both get the same
+# artifact_version_, so a reader that loads them between the two replaces
+# sees a mismatch (load_model_and_scaler) instead of a new model paired with
+# the old scaler.
+def save_model_and_scaler(model, scaler, model_path, scaler_path):
+    version = f"{time.time_ns()}-{os.getpid()}"
+    model.artifact_version_ = version
+    scaler.artifact_version_ = version
+    dump_atomic(model, model_path)
+    dump_atomic(scaler, scaler_path)
+
+
+# Train model ("halving": budgeted time-series search, "grid": the full grid search)
+def train_model(
+    data,
+    search="halving",
+    time_budget=10.0,
+    model_path="price_action_model.pkl",
+    scaler_path="scaler.pkl",
+    flat_path=None,
+):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import GridSearchCV, TimeSeriesSplit, train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    from flat_forest import export_forest, flat_path_for, save_flat_forest
+    from model_search import search_model
+
     data["target"] = (data["close"].shift(-1) > data["close"]).astype(int)
-    features = data[
-        [
-            "open",
-            "high",
-            "low",
-            "close",
-            "volatility",
-            "momentum",
-            "sma_10",
-            "sma_50",
-            "rsi",
-        ]
-    ]
+    # The last bar has no next close to label it
+    data = data.iloc[:-1]
+    features = data[FEATURE_COLUMNS]
     target = data["target"].values
 
     scaler = StandardScaler()
     features_scaled = scaler.fit_transform(features)
 
+    # Hold out the most recent 20% rather than a shuffled sample
     X_train, X_test, y_train, y_test = train_test_split(
-        features_scaled, target, test_size=0.2, random_state=42
+        features_scaled, target, test_size=0.2, shuffle=False
     )
 
-    param_grid = {
-        "n_estimators": [50, 100, 150],
-        "max_depth": [None, 10, 20, 30],
-        "min_samples_split": [2, 5, 10],
-    }
-    grid_search = GridSearchCV(
-        RandomForestClassifier(random_state=42), param_grid, cv=5, scoring="accuracy"
-    )
-    grid_search.fit(X_train, y_train)
+    if search == "grid":
+        param_grid = {
+            "n_estimators": [50, 100, 150],
+            "max_depth": [None, 10, 20, 30],
+            "min_samples_split": [2, 5, 10],
+        }
+        grid_search = GridSearchCV(
+            RandomForestClassifier(random_state=42),
+            param_grid,
+            cv=TimeSeriesSplit(n_splits=5),
+            scoring="accuracy",
+            n_jobs=-1,
+        )
+        grid_search.fit(X_train, y_train)
+        best_model = grid_search.best_estimator_
+    else:
+        best_params, _ = search_model(X_train, y_train, time_budget=time_budget)
+        best_model = RandomForestClassifier(random_state=42, n_jobs=-1, **best_params)
+        best_model.fit(X_train, y_train)
 
-    best_model = grid_search.best_estimator_
     accuracy = accuracy_score(y_test, best_model.predict(X_test))
     logging.info(f"Model trained with accuracy: {accuracy:.2f}")
 
-    joblib.dump(best_model, "price_action_model.pkl")
-    joblib.dump(scaler, "scaler.pkl")
+    save_model_and_scaler(best_model, scaler, model_path, scaler_path)
+    save_flat_forest(
+        export_forest(best_model, scaler), flat_path or flat_path_for(model_path)
+    )
 
     return best_model
 
 
+# Create the training lock atomically, holding our pid; False while another
+# training holds it (a lock older than stale_after is taken over)
+def acquire_training_lock(lock_path="training.lock", stale_after=1800):
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                age = time.time() - os.path.getmtime(lock_path)
+            except OSError:
+                continue  # released meanwhile
+            if age < stale_after:
+                return False
+            logging.warning(f"Removing stale training lock {lock_path}.")
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+# Fetch history for a symbol and train, meant to run in its own process. With
+# lock_owned the caller already created the lock and hands it over; either
+# way it is removed when training ends.
+def run_training(symbol, bars=5000, lock_path="training.lock", lock_owned=False):
+    if lock_owned:
+        with open(lock_path, "w") as f:
+            f.write(str(os.getpid()))
+    elif not acquire_training_lock(lock_path):
+        logging.info("Model training already in progress.")
+        return
+    try:
+        connect()
+        store = CandleStore()
+        store.sync(symbol, mt5.TIMEFRAME_M1)
+        stored = len(store.bars(symbol, mt5.TIMEFRAME_M1))
+        if stored < bars:
+            store.backfill(symbol, mt5.TIMEFRAME_M1, bars - stored)
+        data = preprocess_data(
+            get_candlestick_data(symbol, mt5.TIMEFRAME_M1, count=bars, store=store)
+        )
+        train_model(data)
+    finally:
+        disconnect()
+        os.remove(lock_path)
+
+
+# Start training in a separate process so the order path never waits on it.
+# The lock is taken here, before spawning, so two scripts starting together
+# cannot both start a training; the child takes it over.
+def start_background_training(symbol, lock_path="training.lock", stale_after=1800):
+    if not acquire_training_lock(lock_path, stale_after):
+        logging.info("Model training already in progress.")
+        return False
+    creationflags = getattr(subprocess, "DETACHED_PROCESS", 0)
+    try:
+        subprocess.Popen(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "train",
+                symbol,
+                "--lock-owned",
+                f"--lock={os.path.abspath(lock_path)}",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            creationflags=creationflags,
+        )
+    except OSError:
+        os.remove(lock_path)
+        raise
+    logging.info(f"Started background model training for {symbol}.")
+    return True
+
+
+# True when the flat export was written after the pickled model and scaler
+# (the export always sits beside its model, see flat_path_for, so an .npz
+# from another model is never taken for this one)
+def flat_model_current(flat_path, model_path, scaler_path):
+    try:
+        flat_mtime = os.path.getmtime(flat_path)
+    except OSError:
+        return False
+    return flat_mtime >= os.path.getmtime(model_path) and flat_mtime >= os.path.getmtime(
+        scaler_path
+    )
+
+
 # Predict action
-def predict_action(df, model_path="price_action_model.pkl", scaler_path="scaler.pkl"):
-    features = df[
-        [
-            "open",
-            "high",
-            "low",
-            "close",
-            "volatility",
-            "momentum",
-            "sma_10",
-            "sma_50",
-            "rsi",
-        ]
-    ].tail(1)
-    scaler = joblib.load(scaler_path)
-    features_scaled = scaler.transform(features)
-
-    model = joblib.load(model_path)
-    prediction = model.predict(features_scaled)
+def predict_action(
+    df,
+    model_path="price_action_model.pkl",
+    scaler_path="scaler.pkl",
+    flat_path=None,
+):
+    from flat_forest import flat_path_for
+
+    flat_path = flat_path or flat_path_for(model_path)
+    features = df[FEATURE_COLUMNS].tail(1)
+    if flat_model_current(flat_path, model_path, scaler_path):
+        with stage("price_action.model_load"):
+            forest = load_flat_model(flat_path)
+        with stage("price_action.predict"):
+            prediction = forest.predict(features.to_numpy(dtype=float))
+    else:
+        with stage("price_action.model_load"):
+            model, scaler = load_model_and_scaler(model_path, scaler_path)
+        with stage("price_action.predict"):
+            features_scaled = scaler.transform(features)
+            prediction = model.predict(features_scaled)
 
     return "BUY" if prediction == 1 else "SELL" if prediction == 0 else None
 
 
+# Predict actions for many symbols with one predict_proba (on the flat export
+# when it is current, like predict_action)
+@timed("price_action.predict_batch")
+def predict_actions_batch(
+    frames,
+    model_path="price_action_model.pkl",
+    scaler_path="scaler.pkl",
+    flat_path=None,
+):
+    from flat_forest import flat_path_for
+
+    symbols = [symbol for symbol, df in frames.items() if not df.empty]
+    if not symbols:
+        return {}
+
+    features = np.vstack(
+        [frames[symbol][FEATURE_COLUMNS].to_numpy(dtype=float)[-1] for symbol in symbols]
+    )
+    flat_path = flat_path or flat_path_for(model_path)
+    if flat_model_current(flat_path, model_path, scaler_path):
+        forest = load_flat_model(flat_path)
+        probabilities = forest.predict_proba(features)
+        classes = forest.classes.tolist()
+    else:
+        model, scaler = load_model_and_scaler(model_path, scaler_path)
+        features_scaled = scaler.transform(
+            pd.DataFrame(features, columns=FEATURE_COLUMNS)
+        )
+        probabilities = model.predict_proba(features_scaled)
+        classes = list(model.classes_)
+
+    buy_column = classes.index(1) if 1 in classes else None
+    best = probabilities.argmax(axis=1)
+    results = {}
+    for i, symbol in enumerate(symbols):
+        prediction = classes[best[i]]
+        buy_probability = (
+            float(probabilities[i, buy_column]) if buy_column is not None else 0.0
+        )
+        results[symbol] = {
+            "action": "BUY" if prediction == 1 else "SELL" if prediction == 0 else None,
+            "probability": float(probabilities[i, best[i]]),
+            "buy_probability": buy_probability,
+            "sell_probability": 1.0 - buy_probability,
+        }
+    return results
+
+
 # Calculate stop loss and take profit
 def calculate_sltp(action, entry_price, stop_loss_pips, take_profit_pips, point):
     min_stop_loss = 10 * point
@@ -155,7 +360,7 @@ def calculate_sltp(action, entry_price, stop_loss_pips, take_profit_pips, point)
 
 # Validate trade parameters
 def validate_trade_parameters(symbol, volume, price, sl, tp):
-    symbol_info = mt5.symbol_info(symbol)
+    symbol_info = get_symbol_info(symbol)
     if not symbol_info:
         logging.error(f"Failed to retrieve symbol info for {symbol}.")
         return False
@@ -164,7 +369,7 @@ def validate_trade_parameters(symbol, volume, price, sl, tp):
     lot_step = symbol_info.volume_step
     point = symbol_info.point
 
-    if volume < min_volume or (volume % lot_step != 0):
+    if volume < min_volume or not volume_step_ok(volume, lot_step):
         logging.error(
             f"Invalid volume: {volume}. Must be a multiple of {lot_step} and at least {min_volume}."
         )
@@ -178,11 +383,14 @@ def validate_trade_parameters(symbol, volume, price, sl, tp):
     return True
 
 
-# Place trade
-def place_trade(symbol, volume, action, stop_loss, take_profit):
+# Place trade (execution: the Execution started before the bar was analysed,
+# so the prediction is part of the recorded latency; started here if not given)
+@timed("price_action.place_trade")
+def place_trade(symbol, volume, action, stop_loss, take_profit, execution=None):
+    execution = execution or start_execution()
     action = action.upper()
     order_type = mt5.ORDER_TYPE_BUY if action == "BUY" else mt5.ORDER_TYPE_SELL
-    tick = mt5.symbol_info_tick(symbol)
+    tick = get_tick(symbol)
     if not tick:
         logging.error(
             f"Failed to get tick info for symbol {symbol}. Error: {mt5.last_error()}"
@@ -190,9 +398,10 @@ def place_trade(symbol, volume, action, stop_loss, take_profit):
         return
 
     price = tick.ask if order_type == mt5.ORDER_TYPE_BUY else tick.bid
-    symbol_info = mt5.symbol_info(symbol)
+    symbol_info = get_symbol_info(symbol)
     if not symbol_info or not symbol_info.visible:
         logging.error(f"Symbol {symbol} is not available or not visible.")
+        invalidate(symbol)
         return
 
     point = symbol_info.point
@@ -223,30 +432,36 @@ def place_trade(symbol, volume, action, stop_loss, take_profit):
         "price": price,
         "sl": sl,
         "tp": tp,
-        "deviation": 10,
         "magic": 234000,
         "comment": "Trade via API",
         "type_time": mt5.ORDER_TIME_GTC,
-        "type_filling": mt5.ORDER_FILLING_IOC,
     }
+    execution.built()
 
     logging.info(f"Sending order with parameters: {request}")
-    result = mt5.order_send(request)
-    if result.retcode != mt5.TRADE_RETCODE_DONE:
+    result, attempts = send_order(request, execution)
+    if result is None:
+        logging.error(f"Order send failed, no result. Error: {mt5.last_error()}")
+    elif result.retcode != mt5.TRADE_RETCODE_DONE:
         logging.error(
-            f"Order send failed, retcode = {result.retcode}. Comment: {result.comment}"
+            f"Order send failed after {attempts} attempt(s), retcode = "
+            f"{result.retcode}. Comment: {result.comment}"
         )
     else:
-        logging.info(f"Order placed successfully, result: {result}")
+        logging.info(f"Order placed in {attempts} attempt(s), result: {result}")
 
 
 # Close position
+@timed("price_action.close_position")
 def close_position(ticket, symbol, position_type, volume):
-    price = (
-        mt5.symbol_info_tick(symbol).bid
-        if position_type == mt5.ORDER_TYPE_BUY
-        else mt5.symbol_info_tick(symbol).ask
-    )
+    execution = start_execution()
+    tick = get_tick(symbol)
+    if not tick:
+        logging.error(
+            f"Failed to get tick info for symbol {symbol}. Error: {mt5.last_error()}"
+        )
+        return
+    price = tick.bid if position_type == mt5.ORDER_TYPE_BUY else tick.ask
     request = {
         "action": mt5.TRADE_ACTION_DEAL,
         "symbol": symbol,
@@ -256,21 +471,24 @@ def close_position(ticket, symbol, position_type, volume):
             if position_type == mt5.ORDER_TYPE_BUY
             else mt5.ORDER_TYPE_BUY
         ),
+        "position": ticket,
         "price": price,
-        "deviation": 10,
         "magic": 234000,
         "comment": "Close trade via API",
         "type_time": mt5.ORDER_TIME_GTC,
-        "type_filling": mt5.ORDER_FILLING_IOC,
     }
+    execution.built()
     logging.info(f"Closing position with request: {request}")
-    result = mt5.order_send(request)
-    if result.retcode != mt5.TRADE_RETCODE_DONE:
+    result, attempts = send_order(request, execution)
+    if result is None:
+        logging.error(f"Position close failed, no result. Error: {mt5.last_error()}")
+    elif result.retcode != mt5.TRADE_RETCODE_DONE:
         logging.error(
-            f"Position close failed, retcode = {result.retcode}. Comment: {result.comment}"
+            f"Position close failed after {attempts} attempt(s), retcode = "
+            f"{result.retcode}. Comment: {result.comment}"
         )
     else:
-        logging.info(f"Position closed successfully, result: {result}")
+        logging.info(f"Position closed in {attempts} attempt(s), result: {result}")
 
 
 # Close all open positions
@@ -296,76 +514,44 @@ def close_all_positions(symbol):
 # Check if a new candle has started
 def is_new_candle(df):
     latest_time = df["time"].iloc[-1]
-    current_time = pd.to_datetime("now")
+    current_time = pd.to_datetime(clock.now(), unit="s")
     time_diff = current_time - latest_time
     return time_diff.total_seconds() >= 60
 
 
-# Manage trade with trailing stop loss
-def close_trade_with_trailing_stop(symbol, trailing_stop_threshold=0.50):
-    while True:
-        positions = mt5.positions_get(symbol=symbol)
-        if positions is None or len(positions) == 0:
-            logging.info(f"No open positions for {symbol}.")
-            return
-
-        for position in positions:
-            ticket = position.ticket
-            profit_usd = position.profit
-            logging.info(f"Current profit for position {ticket}: ${profit_usd:.2f} USD")
-
-            if profit_usd >= trailing_stop_threshold:
-                tick = mt5.symbol_info_tick(symbol)
-                price = tick.bid if position.type == mt5.ORDER_TYPE_BUY else tick.ask
-                point = mt5.symbol_info(symbol).point
-                new_stop_loss = (
-                    price - trailing_stop_threshold
-                    if position.type == mt5.ORDER_TYPE_BUY
-                    else price + trailing_stop_threshold
-                )
-
-                if (
-                    position.type == mt5.ORDER_TYPE_BUY and new_stop_loss > position.sl
-                ) or (
-                    position.type == mt5.ORDER_TYPE_SELL and new_stop_loss < position.sl
-                ):
-                    request = {
-                        "action": mt5.TRADE_ACTION_SLTP,
-                        "symbol": symbol,
-                        "position": ticket,
-                        "sl": new_stop_loss,
-                        "tp": position.tp,
-                        "deviation": 10,
-                        "magic": 234000,
-                        "comment": "Trailing stop loss adjustment",
-                        "type_time": mt5.ORDER_TIME_GTC,
-                        "type_filling": mt5.ORDER_FILLING_IOC,
-                    }
-                    result = mt5.order_send(request)
-                    if result.retcode != mt5.TRADE_RETCODE_DONE:
-                        logging.error(
-                            f"Failed to update stop loss for position {ticket}: {result.comment}"
-                        )
-                    else:
-                        logging.info(
-                            f"Updated stop loss for position {ticket} to {new_stop_loss:.2f}"
-                        )
-
-            if profit_usd >= target_profit_usd:
-                logging.info(
-                    f"Target profit reached for position {ticket}, closing the position."
-                )
-                close_position(ticket, symbol, position.type, position.volume)
-                return
-
-        time.sleep(10)  # Wait before rechecking to avoid rapid-fire execution
+# Manage trade with trailing stop loss until the symbol has no open positions
+def close_trade_with_trailing_stop(
+    symbol, trailing_stop_threshold=0.50, target_profit_usd=1.0, poll_interval=1.0
+):
+    monitor = PositionMonitor(
+        trailing_stop_threshold=trailing_stop_threshold,
+        target_profit_usd=target_profit_usd,
+        poll_interval=poll_interval,
+        symbols=[symbol],
+    )
+    monitor.run(stop_when_flat=True)
+    logging.info(f"Position monitor stats for {symbol}: {monitor.stats()}")
 
 
 # Execute trading logic
 if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "train":
+        args = [arg for arg in sys.argv[3:] if not arg.startswith("--")]
+        options = dict(
+            arg[2:].split("=", 1) for arg in sys.argv[3:] if arg.startswith("--lock=")
+        )
+        run_training(
+            sys.argv[2],
+            int(args[0]) if args else 5000,
+            lock_path=options.get("lock", "training.lock"),
+            lock_owned="--lock-owned" in sys.argv[3:],
+        )
+        sys.exit(0)
+
     if len(sys.argv) < 5:
         print(
-            "Usage: python trading_bot.py <symbol> <volume> <stop_loss_pips> <take_profit_pips>"
+            "Usage: python price_action_script.py <symbol> <volume> <stop_loss_pips> <take_profit_pips>\n"
+            "       python price_action_script.py train <symbol> [<bars>]"
         )
         quit()
 
@@ -379,13 +565,16 @@ if __name__ == "__main__":
     connect()
 
     try:
-        candlestick_data = get_candlestick_data(symbol, mt5.TIMEFRAME_M1, count=100)
+        execution = start_execution()
+        candlestick_data = get_candlestick_data(
+            symbol, mt5.TIMEFRAME_M1, count=100, store=CandleStore()
+        )
         if candlestick_data.empty:
             logging.error("Failed to retrieve sufficient candlestick data.")
             disconnect()
             quit()
 
-        processed_data = preprocess_data(candlestick_data)
+        processed_data = preprocess_data(candlestick_data, symbol, mt5.TIMEFRAME_M1)
 
         if processed_data.empty:
             logging.error("No data after preprocessing.")
@@ -397,14 +586,13 @@ if __name__ == "__main__":
                 try:
                     action = predict_action(processed_data)
                 except FileNotFoundError:
-                    logging.info("Model not found. Training a new model...")
-                    train_model(processed_data)
-                    action = predict_action(processed_data)
+                    logging.info("Model not found. Training a new model in the background...")
+                    start_background_training(symbol)
+                    action = None
 
                 if action:
                     logging.info(f"Action determined by the model: {action}")
-                    symbol_info = mt5.symbol_info(symbol)
-                    point = symbol_info.point
+                    point = get_symbol_info(symbol).point
                     stop_loss, take_profit = calculate_sltp(
                         action,
                         processed_data.iloc[-1]["close"],
@@ -413,8 +601,12 @@ if __name__ == "__main__":
                         point,
                     )
                     if stop_loss and take_profit:
-                        place_trade(symbol, volume, action, stop_loss, take_profit)
-                        close_trade_with_trailing_stop(symbol, trailing_stop_threshold)
+                        place_trade(
+                            symbol, volume, action, stop_loss, take_profit, execution
+                        )
+                        close_trade_with_trailing_stop(
+                            symbol, trailing_stop_threshold, target_profit_usd
+                        )
 
     except Exception as e:
         logging.error(f"Exception occurred: {e}")
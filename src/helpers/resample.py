@@ -0,0 +1,70 @@
+import numpy as np
+
+# Build higher-timeframe bars from M1 bars. A bar covers [t, t + period)
+# with t a multiple of the period, which matches the terminal's M5..H4 bars
+# (every period divides a day, so H4 bars start at 00:00, 04:00, ...).
+
+
+# Aggregate time-sorted M1 rates into bars of `period` seconds
+def resample_rates(m1, period):
+    if len(m1) == 0:
+        return m1[:0].copy()
+    bucket = m1["time"] // period
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(m1)] - 1
+    bars = np.zeros(len(starts), dtype=m1.dtype)
+    bars["time"] = bucket[starts] * period
+    bars["open"] = m1["open"][starts]
+    bars["high"] = np.maximum.reduceat(m1["high"], starts)
+    bars["low"] = np.minimum.reduceat(m1["low"], starts)
+    bars["close"] = m1["close"][ends]
+    bars["tick_volume"] = np.add.reduceat(m1["tick_volume"], starts)
+    bars["spread"] = m1["spread"][starts]
+    bars["real_volume"] = np.add.reduceat(m1["real_volume"], starts)
+    return bars
+
+
+class BarResampler:
+    """One higher timeframe kept in step with a growing M1 series.
+
+    Closed bars are aggregated once and kept; only the M1 bars of the bar
+    still forming are held back, so each update re-aggregates at most one
+    bar. An M1 bar sent again with the same time (the M1 bar still forming)
+    replaces the earlier copy.
+    """
+
+    def __init__(self, period, max_bars=10000):
+        self.period = period
+        self.max_bars = max_bars
+        self.closed = None
+        self.pending = None  # M1 bars of the current bar
+
+    @property
+    def last_time(self):
+        return int(self.pending["time"][-1]) if self.pending is not None else None
+
+    def update(self, m1):
+        m1 = np.asarray(m1)
+        if self.pending is None:
+            self.closed = m1[:0].copy()
+            self.pending = m1[:0].copy()
+        else:
+            m1 = m1[m1["time"] >= self.last_time]
+        if len(m1) == 0:
+            return
+        pending = self.pending
+        if len(pending) and m1["time"][0] == pending["time"][-1]:
+            pending = pending[:-1]
+        combined = np.concatenate([pending, m1])
+        bucket = combined["time"] // self.period
+        current = bucket >= bucket[-1]
+        if not current.all():
+            self.closed = np.concatenate(
+                [self.closed, resample_rates(combined[~current], self.period)]
+            )[-self.max_bars :]
+        self.pending = combined[current]
+
+    # Last `count` bars, the one still forming included
+    def bars(self, count):
+        bars = np.concatenate([self.closed, resample_rates(self.pending, self.period)])
+        return bars[-count:]
@@ -0,0 +1,185 @@
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import MetaTrader5 as mt5
+import clock
+import order_sender
+from symbol_cache import invalidate
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+class SessionManager:
+    """Authenticated MT5 sessions keyed by (login, server).
+
+    The terminal holds one logged-in account at a time, so a session is the
+    stored credentials plus the knowledge of which account is active. Calls
+    made through session() reuse the active account without logging in
+    again and only switch (mt5.login on the open terminal, no re-initialize)
+    when another account is requested. Switching and the calls themselves
+    are serialized by one lock. Sessions idle for longer than idle_timeout
+    are dropped, the least recently used one is evicted past max_sessions,
+    and the active account is health-checked at most every health_interval
+    seconds. Symbol data and filling modes are cached per account, so they
+    are dropped whenever a different account is logged in.
+    """
+
+    def __init__(self, max_sessions=8, idle_timeout=900.0, health_interval=30.0):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.sessions = OrderedDict()  # (login, server) -> {"password", "last_used"}
+        self.active = None
+        self.account = None  # last account logged in, whether or not still active
+        self.last_health_check = None
+        self.lock = threading.RLock()
+        self.reuses = 0
+        self.switches = 0
+        self.logins = 0
+        self.reconnects = 0
+        self.evictions = 0
+        self.expired = 0
+
+    # Log in once and keep the credentials for later switches
+    def open(self, login, password, server):
+        key = (int(login), server)
+        with self.lock:
+            if not self._ensure_terminal():
+                error = f"Initialization failed: {mt5.last_error()}"
+                return {"success": False, "error": error}
+            if not self._login(key, password):
+                error = (
+                    f"Failed to connect to account #{login}, "
+                    f"error code: {mt5.last_error()}"
+                )
+                logging.error(error)
+                return {"success": False, "error": error}
+            self.sessions[key] = {"password": password, "last_used": clock.monotonic()}
+            self.sessions.move_to_end(key)
+            self._evict()
+            return {"success": True}
+
+    # Forget which account is active (the terminal was restarted behind our
+    # back), so the next session call logs in again
+    def reset(self):
+        with self.lock:
+            self.active = None
+            self.account = None
+            self.last_health_check = None
+
+    def close(self, login, server):
+        key = (int(login), server)
+        with self.lock:
+            self.sessions.pop(key, None)
+            if self.active == key:
+                self.active = None
+        return {"status": f"Session {login}@{server} closed"}
+
+    # Run the body with the (login, server) account active
+    @contextmanager
+    def session(self, login, server):
+        key = (int(login), server)
+        with self.lock:
+            self._expire_idle()
+            entry = self.sessions.get(key)
+            if entry is None:
+                raise LookupError(f"No open session for {login}@{server}")
+            if self.active == key and self._healthy():
+                self.reuses += 1
+            else:
+                if self.active is not None and self.active != key:
+                    self.switches += 1
+                if not (self._ensure_terminal() and self._login(key, entry["password"])):
+                    raise ConnectionError(
+                        f"Could not activate session {login}@{server}: "
+                        f"{mt5.last_error()}"
+                    )
+            self.sessions.move_to_end(key)
+            try:
+                yield
+            finally:
+                entry["last_used"] = clock.monotonic()
+
+    def run(self, login, server, func, *args, **kwargs):
+        with self.session(login, server):
+            return func(*args, **kwargs)
+
+    def _login(self, key, password):
+        self.logins += 1
+        if mt5.login(key[0], password=password, server=key[1]):
+            if key != self.account:
+                # Symbols and their filling modes can differ between accounts
+                invalidate()
+                order_sender.reset()
+                self.account = key
+            self.active = key
+            self.last_health_check = clock.monotonic()
+            return True
+        self.active = None
+        self.account = None
+        return False
+
+    # Initialize the terminal if it is not reachable (which logs everyone out)
+    def _ensure_terminal(self):
+        if mt5.terminal_info() is not None:
+            return True
+        self.reconnects += 1
+        self.reset()
+        mt5.shutdown()
+        return mt5.initialize()
+
+    # The terminal is up and still on the active account
+    def _healthy(self):
+        now = clock.monotonic()
+        last = self.last_health_check
+        if last is not None and now - last < self.health_interval:
+            return True
+        account = mt5.account_info()
+        healthy = (
+            account is not None and (account.login, account.server) == self.active
+        )
+        if healthy:
+            self.last_health_check = now
+        else:
+            logging.warning(f"Session {self.active} failed its health check")
+            self.active = None
+        return healthy
+
+    def _expire_idle(self):
+        now = clock.monotonic()
+        idle = [
+            key
+            for key, entry in self.sessions.items()
+            if now - entry["last_used"] > self.idle_timeout
+        ]
+        for key in idle:
+            del self.sessions[key]
+            self.expired += 1
+            if self.active == key:
+                self.active = None
+
+    def _evict(self):
+        while len(self.sessions) > self.max_sessions:
+            key, _ = self.sessions.popitem(last=False)
+            self.evictions += 1
+            if self.active == key:
+                self.active = None
+
+    def stats(self):
+        return {
+            "sessions": [f"{login}@{server}" for login, server in self.sessions],
+            "active": f"{self.active[0]}@{self.active[1]}" if self.active else None,
+            "reuses": self.reuses,
+            "switches": self.switches,
+            "logins": self.logins,
+            "reconnects": self.reconnects,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
+
+
+# Shared manager used by the trade manager worker
+session_manager = SessionManager()
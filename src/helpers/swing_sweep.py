@@ -0,0 +1,276 @@
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import kernels
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Default grid over the analyze_market parameters
+DEFAULT_GRID = {
+    "short_window": [3, 5, 8, 10, 13],
+    "long_window": [20, 30, 50, 100],
+    "rsi_period": [7, 14, 21],
+    "macd_short_period": [8, 12],
+    "macd_long_period": [21, 26],
+    "macd_signal_period": [5, 9],
+}
+PARAM_NAMES = list(DEFAULT_GRID)
+# Bump when evaluate() changes how a combination is scored, so checkpointed
+# scores from the old scoring are not reused
+SCORING_VERSION = 1
+
+# Per-process state filled by _init_worker
+_closes = {}
+_series = {}
+
+
+# Every valid combination of the grid, in a fixed order
+def expand_grid(grid):
+    combos = []
+    for values in itertools.product(*(sorted(grid[name]) for name in PARAM_NAMES)):
+        params = dict(zip(PARAM_NAMES, values))
+        if params["short_window"] >= params["long_window"]:
+            continue
+        if params["macd_short_period"] >= params["macd_long_period"]:
+            continue
+        combos.append(params)
+    return combos
+
+
+def combo_key(symbol, params):
+    return symbol + ":" + ",".join(str(params[name]) for name in PARAM_NAMES)
+
+
+# Identifies the close series a score was computed on (and how it was scored):
+# a different range, bar count, timeframe or scoring gives a different value
+def data_fingerprint(close, timeframe=None):
+    close = np.ascontiguousarray(close, dtype=float)
+    digest = hashlib.sha1(close.tobytes()).hexdigest()[:16]
+    return f"v{SCORING_VERSION}:{timeframe}:{len(close)}:{digest}"
+
+
+# Indicator series are shared between combinations, so compute each once per symbol
+def _cached(symbol, name, param, compute):
+    key = (symbol, name, param)
+    series = _series.get(key)
+    if series is None:
+        series = _series[key] = compute()
+    return series
+
+
+def _sma(symbol, window):
+    close = _closes[symbol]
+    return _cached(symbol, "sma", window, lambda: kernels.sma(close, window, 1))
+
+
+def _ema(symbol, span):
+    close = _closes[symbol]
+    return _cached(symbol, "ema", span, lambda: kernels.ema(close, span))
+
+
+def _rsi(symbol, period):
+    close = _closes[symbol]
+    return _cached(symbol, "rsi", period, lambda: kernels.rsi(close, period))
+
+
+def _macd(symbol, short_period, long_period, signal_period):
+    def compute():
+        macd = _ema(symbol, short_period) - _ema(symbol, long_period)
+        return macd, kernels.ema(macd, signal_period)
+
+    return _cached(symbol, "macd", (short_period, long_period, signal_period), compute)
+
+
+# analyze_market's decision for every bar: 1 buy, -1 sell, 0 hold
+def swing_signals(symbol, params):
+    sma_short = _sma(symbol, params["short_window"])
+    sma_long = _sma(symbol, params["long_window"])
+    rsi = _rsi(symbol, params["rsi_period"])
+    macd, signal_line = _macd(
+        symbol,
+        params["macd_short_period"],
+        params["macd_long_period"],
+        params["macd_signal_period"],
+    )
+
+    above = sma_short > sma_long
+    prev_below_or_equal = np.concatenate([[False], sma_short[:-1] <= sma_long[:-1]])
+    below = sma_short < sma_long
+    prev_above_or_equal = np.concatenate([[False], sma_short[:-1] >= sma_long[:-1]])
+    with np.errstate(invalid="ignore"):
+        cross_up = above & prev_below_or_equal & (rsi < 30)
+        cross_down = below & prev_above_or_equal & (rsi > 70)
+
+    return np.select(
+        [cross_up, cross_down, macd > signal_line, macd < signal_line],
+        [1, -1, 1, -1],
+        default=0,
+    )
+
+
+# Score a combination by trading each bar's signal over the next bar
+def evaluate(symbol, params):
+    close = _closes[symbol]
+    signals = swing_signals(symbol, params)[:-1]
+    returns = close[1:] / close[:-1] - 1.0
+    trade_returns = signals * returns
+    active = signals != 0
+    trades = int(active.sum())
+    std = trade_returns[active].std() if trades > 1 else 0.0
+    result = {"symbol": symbol, **params}
+    result.update(
+        {
+            "trades": trades,
+            "total_return": float(trade_returns.sum()),
+            "hit_rate": float((trade_returns[active] > 0).mean()) if trades else 0.0,
+            "sharpe": (
+                float(trade_returns[active].mean() / std * np.sqrt(trades))
+                if std > 0
+                else 0.0
+            ),
+            "signal_changes": int(np.count_nonzero(np.diff(signals))),
+        }
+    )
+    return result
+
+
+def _init_worker(histories):
+    _closes.clear()
+    _series.clear()
+    for symbol, close in histories.items():
+        _closes[symbol] = np.asarray(close, dtype=float)
+
+
+def _evaluate_chunk(chunk):
+    return [evaluate(symbol, params) for symbol, params in chunk]
+
+
+# Results already written by an interrupted run on the same data: rows whose
+# fingerprint differs from fingerprints[symbol] are dropped from the file
+def load_checkpoint(path, fingerprints):
+    done = {}
+    stale = 0
+    if path and os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue  # partially written last line
+                fingerprint = result.pop("fingerprint", None)
+                if fingerprint != fingerprints.get(result["symbol"]):
+                    stale += 1
+                    continue
+                done[combo_key(result["symbol"], result)] = result
+    if stale:
+        logging.info(f"Sweep: discarding {stale} checkpointed results from other data")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.writelines(
+                json.dumps({**r, "fingerprint": fingerprints[r["symbol"]]}) + "\n"
+                for r in done.values()
+            )
+        os.replace(tmp_path, path)
+    return done
+
+
+# Evaluate the grid for every symbol over a process pool; returns a ranked table
+def run_sweep(
+    histories,
+    grid=None,
+    checkpoint_path=None,
+    max_workers=None,
+    chunk_size=200,
+    rank_by="sharpe",
+    timeframe=None,
+):
+    combos = expand_grid(grid or DEFAULT_GRID)
+    fingerprints = {
+        symbol: data_fingerprint(close, timeframe) for symbol, close in histories.items()
+    }
+    done = load_checkpoint(checkpoint_path, fingerprints)
+    # Checkpointed rows outside the current grid are not part of this sweep
+    wanted = [(symbol, params) for symbol in sorted(histories) for params in combos]
+    done = {
+        key: done[key]
+        for key in (combo_key(symbol, params) for symbol, params in wanted)
+        if key in done
+    }
+    pending = [
+        (symbol, params)
+        for symbol, params in wanted
+        if combo_key(symbol, params) not in done
+    ]
+    logging.info(
+        f"Sweep: {len(combos)} combinations x {len(histories)} symbols, "
+        f"{len(done)} already done, {len(pending)} to run"
+    )
+
+    results = list(done.values())
+    chunks = [pending[i : i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    closes = {symbol: np.asarray(close, dtype=float) for symbol, close in histories.items()}
+    checkpoint = open(checkpoint_path, "a") if checkpoint_path else None
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=(closes,)
+        ) as pool:
+            for chunk_results in pool.map(_evaluate_chunk, chunks):
+                results.extend(chunk_results)
+                if checkpoint:
+                    checkpoint.writelines(
+                        json.dumps({**r, "fingerprint": fingerprints[r["symbol"]]}) + "\n"
+                        for r in chunk_results
+                    )
+                    checkpoint.flush()
+    finally:
+        if checkpoint:
+            checkpoint.close()
+
+    table = pd.DataFrame(results)
+    if table.empty:
+        return table
+    # Ties broken by symbol and parameters so the ranking is deterministic
+    table = table.sort_values(
+        [rank_by, "symbol"] + PARAM_NAMES,
+        ascending=[False, True] + [True] * len(PARAM_NAMES),
+        kind="mergesort",
+    )
+    return table.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print(
+            "Usage: python swing_sweep.py <results.csv> <bars> <symbol> [<symbol> ...]"
+        )
+        sys.exit(1)
+
+    import MetaTrader5 as mt5
+    from swing_trading import connect, get_rates_array
+
+    output_path = sys.argv[1]
+    bars = int(sys.argv[2])
+    symbols = sys.argv[3:]
+
+    connect()
+    histories = {}
+    for symbol in symbols:
+        rates = get_rates_array(symbol, mt5.TIMEFRAME_M15, bars)
+        if rates is not None:
+            histories[symbol] = rates["close"].copy()
+    mt5.shutdown()
+
+    table = run_sweep(
+        histories, checkpoint_path=output_path + ".partial.jsonl", timeframe="M15"
+    )
+    table.to_csv(output_path, index=False)
+    print(table.head(20).to_string(index=False))
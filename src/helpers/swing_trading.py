@@ -1,7 +1,14 @@
 import MetaTrader5 as mt5
 import sys
-import pandas as pd
-import numpy as np
+from candle_store import CandleStore, get_rates
+from symbol_cache import get_symbol_info, get_tick, invalidate
+from metrics import instrument_terminal, timed
+from indicators import compute
+from execution_log import start_execution
+from order_sender import send_order
+
+# Time terminal calls when MT5_METRICS is set
+instrument_terminal(mt5)
 
 
 def connect():
@@ -10,10 +17,26 @@ def connect():
         quit()
 
 
-def get_data(symbol, timeframe, n=100):
-    rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, n)
-    if not rates:
+# Bars as the structured array mt5.copy_rates_* returns (None on failure).
+# With a candle store, M5, M15, H1 and H4 bars are built from its M1 series.
+def get_rates_array(symbol, timeframe, n=100, store=None):
+    if store is not None:
+        rates = get_rates(store, symbol, timeframe, n)
+    else:
+        rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, n)
+    if rates is None or len(rates) == 0:
         print(f"Failed to retrieve data for {symbol}.")
+        return None
+    return rates
+
+
+@timed("swing.get_data")
+def get_data(symbol, timeframe, n=100, store=None):
+    # Only this DataFrame view needs pandas; the analysis works on the rates
+    import pandas as pd
+
+    rates = get_rates_array(symbol, timeframe, n, store)
+    if rates is None:
         return pd.DataFrame()  # Return an empty DataFrame in case of failure
 
     df = pd.DataFrame(rates)
@@ -23,30 +46,32 @@ def get_data(symbol, timeframe, n=100):
     return df
 
 
-def calculate_moving_averages(df, short_window=5, long_window=20):
-    df["SMA_short"] = df["close"].rolling(window=short_window, min_periods=1).mean()
-    df["SMA_long"] = df["close"].rolling(window=long_window, min_periods=1).mean()
+# The indicator helpers take a DataFrame or the rates array itself
+@timed("swing.calculate_moving_averages")
+def calculate_moving_averages(data, short_window=5, long_window=20, **shared):
+    sma_short = compute(data, "sma", short_window, 1, **shared)
+    sma_long = compute(data, "sma", long_window, 1, **shared)
+    return sma_short, sma_long
 
 
-def calculate_rsi(df, period=14):
-    delta = df["close"].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi.iloc[-1]
+@timed("swing.calculate_rsi")
+def calculate_rsi(data, period=14, **shared):
+    return compute(data, "rsi", period, last_only=True, **shared)
 
 
-def calculate_macd(df, short_period=12, long_period=26, signal_period=9):
-    short_ema = df["close"].ewm(span=short_period, adjust=False).mean()
-    long_ema = df["close"].ewm(span=long_period, adjust=False).mean()
-    macd = short_ema - long_ema
-    signal_line = macd.ewm(span=signal_period, adjust=False).mean()
-    histogram = macd - signal_line
-    return macd.iloc[-1], signal_line.iloc[-1], histogram.iloc[-1]
+@timed("swing.calculate_macd")
+def calculate_macd(data, short_period=12, long_period=26, signal_period=9, **shared):
+    macd, signal_line, histogram = compute(
+        data, "macd", short_period, long_period, signal_period, last_only=True, **shared
+    )
+    return macd, signal_line, histogram
 
 
-def place_trade(symbol, volume, action, take_profit, stop_loss):
+# execution: the Execution started before analyze_market, so the decision
+# is part of the recorded latency (one is started here when not given)
+@timed("swing.place_trade")
+def place_trade(symbol, volume, action, take_profit, stop_loss, execution=None):
+    execution = execution or start_execution()
     # Convert action to MT5 order type
     if action.lower() == "buy":
         order_type = mt5.ORDER_TYPE_BUY
@@ -57,16 +82,17 @@ def place_trade(symbol, volume, action, take_profit, stop_loss):
         return
 
     # Get current price and check if symbol is available
-    tick = mt5.symbol_info_tick(symbol)
+    tick = get_tick(symbol)
     if not tick:
         print(f"Failed to get tick info for symbol {symbol}.")
         return
 
     price = tick.ask if order_type == mt5.ORDER_TYPE_BUY else tick.bid
 
-    symbol_info = mt5.symbol_info(symbol)
+    symbol_info = get_symbol_info(symbol)
     if not symbol_info or not symbol_info.visible:
         print(f"Symbol {symbol} is not available or not visible.")
+        invalidate(symbol)
         return
 
     point = symbol_info.point
@@ -95,26 +121,26 @@ def place_trade(symbol, volume, action, take_profit, stop_loss):
         "price": price,
         "sl": sl,
         "tp": tp,
-        "deviation": 10,
         "magic": 234000,
         "comment": "Trade via API",
         "type_time": mt5.ORDER_TIME_GTC,
-        "type_filling": mt5.ORDER_FILLING_IOC,
     }
 
+    execution.built()
     print(f"Sending order with parameters: {request}")
-    result = mt5.order_send(request)
+    result, attempts = send_order(request, execution)
     if result is None:
         print("Order send failed, no result returned")
         return
 
     if result.retcode != mt5.TRADE_RETCODE_DONE:
-        print(f"Order send failed, retcode = {result.retcode}")
+        print(f"Order send failed after {attempts} attempt(s), retcode = {result.retcode}")
         print(f"Result: {result}")
     else:
-        print(f"Trade successful, result: {result}")
+        print(f"Trade successful in {attempts} attempt(s), result: {result}")
 
 
+@timed("swing.analyze_market")
 def analyze_market(
     symbol,
     short_window=5,
@@ -123,28 +149,24 @@ def analyze_market(
     macd_short_period=12,
     macd_long_period=26,
     macd_signal_period=9,
+    store=None,
 ):
-    df = get_data(symbol, mt5.TIMEFRAME_M15)
-    calculate_moving_averages(df, short_window, long_window)
-    rsi = calculate_rsi(df, rsi_period)
+    timeframe = mt5.TIMEFRAME_M15
+    shared = {"symbol": symbol, "timeframe": timeframe}
+    rates = get_rates_array(symbol, timeframe, store=store)
+    if rates is None or len(rates) < 2:
+        return "hold"
+    sma_short, sma_long = calculate_moving_averages(
+        rates, short_window, long_window, **shared
+    )
+    rsi = calculate_rsi(rates, rsi_period, **shared)
     macd, signal_line, histogram = calculate_macd(
-        df, macd_short_period, macd_long_period, macd_signal_period
+        rates, macd_short_period, macd_long_period, macd_signal_period, **shared
     )
 
-    last_row = df.iloc[-1]
-    prev_row = df.iloc[-2]
-
-    if (
-        last_row["SMA_short"] > last_row["SMA_long"]
-        and prev_row["SMA_short"] <= prev_row["SMA_long"]
-        and rsi < 30
-    ):
+    if sma_short[-1] > sma_long[-1] and sma_short[-2] <= sma_long[-2] and rsi < 30:
         return "buy"
-    elif (
-        last_row["SMA_short"] < last_row["SMA_long"]
-        and prev_row["SMA_short"] >= prev_row["SMA_long"]
-        and rsi > 70
-    ):
+    elif sma_short[-1] < sma_long[-1] and sma_short[-2] >= sma_long[-2] and rsi > 70:
         return "sell"
     elif macd > signal_line:
         return "buy"
@@ -173,6 +195,7 @@ if __name__ == "__main__":
 
     connect()
 
+    execution = start_execution()
     action = analyze_market(
         symbol,
         short_window,
@@ -181,10 +204,11 @@ if __name__ == "__main__":
         macd_short_period,
         macd_long_period,
         macd_signal_period,
+        store=CandleStore(),
     )
     if action != "hold":
         print(f"Action determined: {action}")
-        place_trade(symbol, volume, action)
+        place_trade(symbol, volume, action, execution=execution)
     else:
         print("No action taken based on market analysis.")
 
@@ -0,0 +1,49 @@
+import threading
+
+import MetaTrader5 as mt5
+import clock
+
+# Ticks older than this (seconds) are fetched again
+TICK_TTL = 0.25
+
+_lock = threading.Lock()
+_symbol_info = {}
+_ticks = {}
+
+
+# Static symbol properties (point, stop_level, volume_min, volume_step, visible...),
+# cached for the session until invalidate() is called
+def get_symbol_info(symbol):
+    with _lock:
+        info = _symbol_info.get(symbol)
+    if info is None:
+        info = mt5.symbol_info(symbol)
+        if info is not None:
+            with _lock:
+                _symbol_info[symbol] = info
+    return info
+
+
+# Latest tick, reused while it is younger than max_age seconds
+def get_tick(symbol, max_age=TICK_TTL):
+    now = clock.monotonic()
+    with _lock:
+        entry = _ticks.get(symbol)
+    if entry is not None and now - entry[0] <= max_age:
+        return entry[1]
+    tick = mt5.symbol_info_tick(symbol)
+    if tick is not None:
+        with _lock:
+            _ticks[symbol] = (now, tick)
+    return tick
+
+
+# Drop cached data for one symbol, or for all symbols
+def invalidate(symbol=None):
+    with _lock:
+        if symbol is None:
+            _symbol_info.clear()
+            _ticks.clear()
+        else:
+            _symbol_info.pop(symbol, None)
+            _ticks.pop(symbol, None)
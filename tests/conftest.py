@@ -0,0 +1,52 @@
+import os
+import sys
+
+# Make the helper scripts importable and point MetaTrader5 at the fake terminal
+HELPERS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "helpers")
+sys.path.insert(0, os.path.abspath(HELPERS_DIR))
+
+import fake_mt5  # noqa: E402
+
+fake_mt5.install()
+
+import pytest  # noqa: E402
+
+import clock  # noqa: E402
+import order_sender  # noqa: E402
+from session_manager import session_manager  # noqa: E402
+from symbol_cache import invalidate  # noqa: E402
+
+
+# A connected fake terminal with EURUSD and empty per-process caches
+@pytest.fixture
+def terminal():
+    fake_mt5.reset()
+    fake_mt5.add_symbol("EURUSD")
+    fake_mt5.initialize()
+    session_manager.reset()
+    session_manager.sessions.clear()
+    invalidate()
+    order_sender.reset()
+    fake_mt5.calls.clear()
+    yield fake_mt5
+    fake_mt5.reset()
+
+
+class VirtualClock:
+    def __init__(self):
+        self.time = 1_700_000_000.0
+
+    def now(self):
+        return self.time
+
+    def sleep(self, seconds):
+        self.time += seconds
+
+
+# Drive clock.now()/monotonic() by hand
+@pytest.fixture
+def virtual_clock():
+    virtual = VirtualClock()
+    clock.set_clock(virtual)
+    yield virtual
+    clock.set_clock(None)
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from backtest import simulate_trades
+
+
+def flat_bars(n):
+    close = np.full(n, 1.1)
+    return pd.DataFrame(
+        {
+            "time": np.arange(n),
+            "open": close,
+            "high": close + 1e-5,
+            "low": close - 1e-5,
+            "close": close,
+        }
+    )
+
+
+def test_one_trade_open_at_a_time():
+    # Nothing is hit, so every trade runs for max_hold bars
+    trades = simulate_trades(flat_bars(20), np.ones(20), 50, 50, 0.00001, max_hold=3)
+    assert list(trades["entry_time"]) == [0, 3, 6, 9, 12, 15]
+    assert list(trades["exit_index"]) == [3, 6, 9, 12, 15, 18]
+    assert (trades["exit_reason"] == "time").all()
+
+
+def test_stopped_trade_frees_the_next_signal():
+    data = flat_bars(12)
+    data.loc[2, "low"] = 1.09  # stops out the buy opened at bar 0 during bar 2
+    trades = simulate_trades(data, np.ones(12), 50, 50, 0.00001, max_hold=5)
+    assert list(trades["entry_time"]) == [0, 2]
+    assert list(trades["exit_reason"]) == ["sl", "time"]
+
+
+def test_single_bar_hold_takes_every_signal():
+    trades = simulate_trades(flat_bars(10), np.ones(10), 50, 50, 0.00001)
+    assert list(trades["entry_time"]) == list(range(9))
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import execution_log
+from execution_log import EXECUTION_DTYPE, final_attempts, report
+from order_sender import send_order
+
+
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "executions.bin")
+    monkeypatch.setattr(execution_log, "ENABLED", True)
+    monkeypatch.setattr(execution_log, "LOG_PATH", path)
+    monkeypatch.setattr(execution_log, "_fd", None)
+    yield path
+    if execution_log._fd is not None:
+        execution_log.os.close(execution_log._fd)
+
+
+def buy_request(price):
+    return {
+        "action": execution_log.mt5.TRADE_ACTION_DEAL,
+        "symbol": "EURUSD",
+        "volume": 0.1,
+        "type": execution_log.mt5.ORDER_TYPE_BUY,
+        "price": price,
+        "deviation": 1,
+    }
+
+
+def test_retries_share_the_order_and_its_price(terminal, log_path):
+    # Every fill moves the quote, so most orders are requoted at least once
+    terminal.set_requote_storm(1.0, jitter_points=30, seed=3)
+    for _ in range(10):
+        send_order(buy_request(terminal.symbol_info_tick("EURUSD").ask))
+
+    records = np.asarray(execution_log.load(log_path))
+    assert len(np.unique(records["order"])) == 10
+    assert len(records) > 10
+    for order in np.unique(records["order"]):
+        sends = records[records["order"] == order]
+        assert list(sends["attempt"]) == list(range(1, len(sends) + 1))
+        assert (sends["original"] == sends["requested"][0]).all()
+    retried = records[records["attempt"] > 1]
+    assert (retried["requested"] != retried["original"]).any()
+
+
+def test_report_uses_each_orders_final_send(log_path):
+    records = np.zeros(3, dtype=EXECUTION_DTYPE)
+    records["time"] = 3600 * 10
+    records["symbol"] = b"EURUSD"
+    records["type"] = execution_log.mt5.ORDER_TYPE_BUY
+    records["point"] = 0.00001
+    records["original"] = 1.10000
+    # Order 1 is requoted at 1.10020, then filled there on its second send;
+    # order 2 is filled at once, one point better than asked
+    records["order"] = [1, 1, 2]
+    records["attempt"] = [1, 2, 1]
+    records["requested"] = [1.10000, 1.10020, 1.10000]
+    records["filled"] = [0.0, 1.10020, 1.09999]
+    records["sent_us"] = [100, 2_100, 100]
+    records["result_us"] = [2_000, 5_000, 1_000]
+    records["retcode"] = [
+        execution_log.mt5.TRADE_RETCODE_REQUOTE,
+        execution_log.mt5.TRADE_RETCODE_DONE,
+        execution_log.mt5.TRADE_RETCODE_DONE,
+    ]
+    execution_log.append(records)
+
+    assert list(final_attempts(records)) == [1, 2]
+    [row] = report(log_path)
+    assert (row["orders"], row["sends"], row["done"], row["retries"]) == (2, 3, 2, 1)
+    # Latency of order 1 runs to its final result, not its requote
+    assert row["latency_ms"][0] == pytest.approx(3.0)
+    # Slippage is against the original 1.10000, so the re-pricing counts
+    assert sorted(execution_log.slippage_points(records[[1, 2]])) == pytest.approx(
+        [-1.0, 20.0]
+    )
+    assert row["slippage_points"][0] == pytest.approx(9.5)
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from flat_forest import FlatForest, export_forest, save_flat_forest
+from price_action_script import (
+    FEATURE_COLUMNS,
+    predict_actions_batch,
+    preprocess_data,
+    save_model_and_scaler,
+)
+
+
+# Random-walk M1 candles
+def make_candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 1e-4, n))
+    open_ = np.concatenate([[1.1], close[:-1]])
+    spread = np.abs(rng.normal(0, 5e-5, n))
+    return pd.DataFrame(
+        {
+            "time": 1_700_000_000 + 60 * np.arange(n),
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+        }
+    )
+
+
+@pytest.fixture(scope="module")
+def trained():
+    data = preprocess_data(make_candles(2000)).reset_index(drop=True)
+    target = (data["close"].shift(-1) > data["close"]).astype(int).values
+    train, held_out = data.iloc[:1500], data.iloc[1500:]
+    scaler = StandardScaler()
+    model = RandomForestClassifier(n_estimators=30, max_depth=12, random_state=0)
+    model.fit(scaler.fit_transform(train[FEATURE_COLUMNS]), target[:1500])
+    return model, scaler, held_out
+
+
+def test_matches_sklearn_on_held_out_rows(trained, tmp_path):
+    model, scaler, held_out = trained
+    path = str(tmp_path / "model.npz")
+    save_flat_forest(export_forest(model, scaler), path)
+    forest = FlatForest.load(path)
+
+    X = held_out[FEATURE_COLUMNS].to_numpy(dtype=float)
+    expected = model.predict_proba(scaler.transform(held_out[FEATURE_COLUMNS]))
+    np.testing.assert_allclose(forest.predict_proba(X), expected, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(
+        forest.predict(X), model.predict(scaler.transform(held_out[FEATURE_COLUMNS]))
+    )
+    # A single row gives the same answer as in a batch
+    np.testing.assert_allclose(forest.predict_proba(X[7]), expected[7:8], atol=1e-12)
+
+
+def test_batch_prediction_matches_sklearn_path(trained, tmp_path):
+    model, scaler, held_out = trained
+    model_path = str(tmp_path / "price_action_model.pkl")
+    scaler_path = str(tmp_path / "scaler.pkl")
+    flat_path = str(tmp_path / "price_action_model.npz")
+    save_model_and_scaler(model, scaler, model_path, scaler_path)
+    save_flat_forest(export_forest(model, scaler), flat_path)
+
+    # One frame per "symbol", each ending at a different held-out bar
+    frames = {f"S{i}": held_out.iloc[: 10 + 13 * i] for i in range(30)}
+    flat = predict_actions_batch(frames, model_path, scaler_path, flat_path)
+    missing = str(tmp_path / "missing.npz")
+    reference = predict_actions_batch(frames, model_path, scaler_path, missing)
+
+    assert not os.path.exists(missing)
+    assert list(flat) == list(reference)
+    for symbol in frames:
+        assert flat[symbol]["action"] == reference[symbol]["action"]
+        assert flat[symbol]["probability"] == pytest.approx(
+            reference[symbol]["probability"], abs=1e-12
+        )
+        assert flat[symbol]["buy_probability"] == pytest.approx(
+            reference[symbol]["buy_probability"], abs=1e-12
+        )
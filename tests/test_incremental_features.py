@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from incremental_features import FEATURE_NAMES, IncrementalFeatureEngine
+from price_action_script import preprocess_data
+
+
+# Random-walk M1 candles
+def make_candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 1e-4, n))
+    open_ = np.concatenate([[1.1], close[:-1]])
+    spread = np.abs(rng.normal(0, 5e-5, n))
+    return pd.DataFrame(
+        {
+            "time": 1_700_000_000 + 60 * np.arange(n),
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+        }
+    )
+
+
+# Feature rows the engine produces bar by bar, keyed by bar position
+def engine_rows(df, **options):
+    engine = IncrementalFeatureEngine(**options)
+    rows = {}
+    for i, bar in enumerate(df.to_dict("records")):
+        row = engine.update(bar)
+        if row is not None:
+            rows[i] = row
+    return rows
+
+
+def assert_parity(df, **options):
+    expected = preprocess_data(df.copy())
+    rows = engine_rows(df, **options)
+    # Same bars survive the warm-up, starting at the first full 50-bar SMA
+    assert list(rows) == list(expected.index)
+    actual = np.array([[rows[i][name] for name in FEATURE_NAMES] for i in rows])
+    np.testing.assert_allclose(
+        actual, expected[FEATURE_NAMES].to_numpy(), rtol=0, atol=1e-9
+    )
+
+
+def test_matches_preprocess_data():
+    assert_parity(make_candles(500))
+
+
+def test_warm_up_edge():
+    # One bar short of the longest window gives nothing; the next gives one row
+    assert engine_rows(make_candles(49)) == {}
+    assert preprocess_data(make_candles(49)).empty
+    assert_parity(make_candles(50))
+    assert_parity(make_candles(51))
+
+
+def test_matches_across_resyncs():
+    assert_parity(make_candles(3000, seed=1), resync_every=100)
+
+
+def test_seed_returns_last_row():
+    df = make_candles(200)
+    latest = IncrementalFeatureEngine().seed(df)
+    expected = preprocess_data(df.copy()).iloc[-1]
+    for name in FEATURE_NAMES:
+        assert abs(latest[name] - expected[name]) < 1e-9
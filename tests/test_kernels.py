@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import kernels
+
+
+# The pandas definitions the kernels replace, as indicators.py had them
+def pandas_sma(close, window, min_periods=None):
+    return close.rolling(window=window, min_periods=min_periods).mean().to_numpy()
+
+
+def pandas_rsi(close, period=14):
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+    loss = delta.where(delta < 0, 0).abs().rolling(window=period).mean()
+    return (100 - 100 / (1 + gain / loss)).to_numpy()
+
+
+def pandas_macd(close, short_period=12, long_period=26, signal_period=9):
+    short_ema = close.ewm(span=short_period, adjust=False).mean()
+    long_ema = close.ewm(span=long_period, adjust=False).mean()
+    line = short_ema - long_ema
+    signal = line.ewm(span=signal_period, adjust=False).mean()
+    return np.stack([line.to_numpy(), signal.to_numpy(), (line - signal).to_numpy()])
+
+
+def pandas_volatility(close, window=5):
+    return close.pct_change().rolling(window=window).std().to_numpy()
+
+
+def pandas_momentum(close, period=4):
+    return close.diff(period).to_numpy()
+
+
+# Random-walk closes
+def make_close(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 1.1 + np.cumsum(rng.normal(0, 1e-4, n))
+
+
+@pytest.mark.parametrize("n", [30, 100, 1000, 10000])
+def test_kernels_match_pandas(n):
+    close = make_close(n, seed=n)
+    series = pd.Series(close)
+    pairs = [
+        (kernels.sma(close, 10), pandas_sma(series, 10)),
+        (kernels.sma(close, 20, 1), pandas_sma(series, 20, 1)),
+        (kernels.rsi(close, 14), pandas_rsi(series, 14)),
+        (kernels.macd(close), pandas_macd(series)),
+        (kernels.volatility(close, 5), pandas_volatility(series, 5)),
+        (kernels.momentum(close, 4), pandas_momentum(series, 4)),
+        (kernels.rsi(close, 14, last_only=True), pandas_rsi(series, 14)[-1]),
+        (kernels.macd(close, last_only=True), pandas_macd(series)[:, -1]),
+        (kernels.volatility(close, 5, last_only=True), pandas_volatility(series, 5)[-1]),
+    ]
+    for got, expected in pairs:
+        np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_flat_prices():
+    # No losses: RSI divides by zero the same way pandas does
+    close = np.full(50, 1.1)
+    np.testing.assert_array_equal(
+        np.isnan(kernels.rsi(close, 14)), np.isnan(pandas_rsi(pd.Series(close), 14))
+    )
@@ -0,0 +1,31 @@
+import time
+
+import numpy as np
+
+from model_search import search_model
+
+
+def make_data(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 7))
+    y = (X[:, 0] + rng.normal(size=n) > 0).astype(int)
+    return X, y
+
+
+def test_no_budget_fits_nothing():
+    X, y = make_data()
+    start = time.perf_counter()
+    params, results = search_model(X, y, time_budget=0, history_path=None)
+    assert time.perf_counter() - start < 0.1
+    assert params == {} and results == []
+
+
+def test_stays_within_budget():
+    X, y = make_data()
+    start = time.perf_counter()
+    params, results = search_model(X, y, time_budget=1.0, history_path=None)
+    elapsed = time.perf_counter() - start
+    assert results and params == results[0]["params"]
+    assert "n_estimators" in params
+    # A fit only starts when the last one says it will finish in time
+    assert elapsed < 1.5
@@ -0,0 +1,68 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from online_learning import OnlineModelUpdater
+from price_action_script import FEATURE_COLUMNS, preprocess_data, save_model_and_scaler
+
+
+def make_candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 1e-4, n))
+    open_ = np.concatenate([[1.1], close[:-1]])
+    spread = np.abs(rng.normal(0, 5e-5, n))
+    return pd.DataFrame(
+        {
+            "time": 1_700_000_000 + 60 * np.arange(n),
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+        }
+    )
+
+
+def make_updater(directory, **options):
+    data = preprocess_data(make_candles(1500)).reset_index(drop=True)
+    target = (data["close"].shift(-1) > data["close"]).astype(int).values
+    scaler = StandardScaler()
+    model = RandomForestClassifier(n_estimators=20, random_state=0)
+    model.fit(scaler.fit_transform(data[FEATURE_COLUMNS].iloc[:800]), target[:800])
+    model_path = os.path.join(directory, "price_action_model.pkl")
+    scaler_path = os.path.join(directory, "scaler.pkl")
+    save_model_and_scaler(model, scaler, model_path, scaler_path)
+    # A wide tolerance so every update is kept
+    updater = OnlineModelUpdater(
+        model_path, scaler_path, window=600, tolerance=1.0, **options
+    )
+    updater.seed(data.iloc[:800])
+    return updater, data.iloc[800:]
+
+
+def test_saves_every_n_accepted_updates(tmp_path):
+    updater, rows = make_updater(str(tmp_path), save_every=3, max_leaves=16)
+    saved_at = os.path.getmtime(updater.model_path)
+    results = [updater.add_bar(row) for row in rows.iloc[:6].to_dict("records")]
+    results = [result for result in results if result is not None]
+    assert [result["saved"] for result in results] == [False, False, True] * 2
+    assert all(result["accepted"] for result in results)
+
+    saved = joblib.load(updater.model_path)
+    assert os.path.getmtime(updater.model_path) >= saved_at
+    assert len(saved.estimators_) == len(updater.model.estimators_)
+    assert os.path.exists(updater.flat_path)
+
+
+def test_appended_trees_are_capped(tmp_path):
+    updater, rows = make_updater(str(tmp_path), max_leaves=16, trees_per_update=4)
+    for row in rows.iloc[:3].to_dict("records"):
+        updater.add_bar(row)
+    grown = updater.model.estimators_[20:]
+    assert len(grown) == 12
+    assert max(tree.get_n_leaves() for tree in grown) <= 16
+    # The trees trained before the cap are kept as they were
+    assert max(tree.get_n_leaves() for tree in updater.model.estimators_[:20]) > 16
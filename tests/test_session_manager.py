@@ -0,0 +1,104 @@
+import MetaTrader5 as mt5
+import pytest
+
+from session_manager import SessionManager
+from symbol_cache import get_symbol_info
+
+
+@pytest.fixture
+def accounts(terminal):
+    terminal.add_account(1001, "a", "Fake-Demo", balance=100.0)
+    terminal.add_account(1002, "b", "Fake-Demo", balance=200.0)
+    terminal.add_account(1003, "c", "Fake-Live", balance=300.0)
+    return terminal
+
+
+def balance():
+    return mt5.account_info().balance
+
+
+def test_reuses_the_active_session(accounts, virtual_clock):
+    manager = SessionManager()
+    assert manager.open(1001, "a", "Fake-Demo") == {"success": True}
+    assert manager.run(1001, "Fake-Demo", balance) == 100.0
+    assert manager.run(1001, "Fake-Demo", balance) == 100.0
+    assert accounts.calls["login"] == 1
+    assert manager.stats()["reuses"] == 2
+
+
+def test_switches_accounts_and_drops_their_caches(accounts, virtual_clock):
+    manager = SessionManager()
+    manager.open(1001, "a", "Fake-Demo")
+    manager.open(1002, "b", "Fake-Demo")
+    assert manager.run(1002, "Fake-Demo", balance) == 200.0
+    get_symbol_info("EURUSD")
+
+    assert manager.run(1001, "Fake-Demo", balance) == 100.0
+    stats = manager.stats()
+    assert stats["active"] == "1001@Fake-Demo"
+    assert stats["switches"] == 1
+    assert accounts.calls["login"] == 3
+    # Symbol data is per account, so the switch dropped it
+    calls = accounts.calls["symbol_info"]
+    get_symbol_info("EURUSD")
+    assert accounts.calls["symbol_info"] == calls + 1
+
+
+def test_rejects_bad_credentials_and_unknown_sessions(accounts, virtual_clock):
+    manager = SessionManager()
+    assert manager.open(1001, "wrong", "Fake-Demo")["success"] is False
+    with pytest.raises(LookupError):
+        manager.run(1001, "Fake-Demo", balance)
+
+
+def test_idle_sessions_expire(accounts, virtual_clock):
+    manager = SessionManager(idle_timeout=60)
+    manager.open(1001, "a", "Fake-Demo")
+    manager.open(1002, "b", "Fake-Demo")
+    virtual_clock.sleep(30)
+    manager.run(1002, "Fake-Demo", balance)
+    virtual_clock.sleep(45)
+    # 1001 has been idle for 75 s, 1002 for 45 s
+    with pytest.raises(LookupError):
+        manager.run(1001, "Fake-Demo", balance)
+    assert manager.run(1002, "Fake-Demo", balance) == 200.0
+    assert manager.stats()["expired"] == 1
+
+
+def test_evicts_the_least_recently_used_session(accounts, virtual_clock):
+    manager = SessionManager(max_sessions=2)
+    manager.open(1001, "a", "Fake-Demo")
+    manager.open(1002, "b", "Fake-Demo")
+    manager.run(1001, "Fake-Demo", balance)
+    manager.open(1003, "c", "Fake-Live")
+    stats = manager.stats()
+    assert stats["sessions"] == ["1001@Fake-Demo", "1003@Fake-Live"]
+    assert stats["evictions"] == 1
+    with pytest.raises(LookupError):
+        manager.run(1002, "Fake-Demo", balance)
+
+
+def test_health_check_catches_an_account_change(accounts, virtual_clock):
+    manager = SessionManager(health_interval=30)
+    manager.open(1001, "a", "Fake-Demo")
+    # Something else logs the terminal into another account
+    accounts.login(1002, password="b", server="Fake-Demo")
+    accounts.calls.clear()
+
+    # Within the interval the active session is trusted without asking
+    manager.run(1001, "Fake-Demo", lambda: None)
+    assert accounts.calls["account_info"] == 0
+
+    virtual_clock.sleep(31)
+    assert manager.run(1001, "Fake-Demo", balance) == 100.0
+    assert accounts.calls["login"] == 1
+
+
+def test_health_check_reconnects_a_lost_terminal(accounts, virtual_clock):
+    manager = SessionManager(health_interval=30)
+    manager.open(1001, "a", "Fake-Demo")
+    accounts.drop_connection()
+    virtual_clock.sleep(31)
+    assert manager.run(1001, "Fake-Demo", balance) == 100.0
+    assert manager.stats()["reconnects"] == 1
+    assert accounts.calls["initialize"] == 1
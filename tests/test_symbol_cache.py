@@ -0,0 +1,21 @@
+from price_action_script import close_position, place_trade
+
+
+def test_warm_place_trade_fetches_one_tick(terminal, virtual_clock):
+    place_trade("EURUSD", 0.1, "BUY", 0.001, 0.002)
+    # Past the tick TTL, so only the symbol data is still cached
+    virtual_clock.sleep(1.0)
+    terminal.calls.clear()
+    place_trade("EURUSD", 0.1, "SELL", 0.001, 0.002)
+    assert terminal.calls["symbol_info_tick"] == 1
+    assert terminal.calls["symbol_info"] <= 1
+    assert terminal.calls["order_send"] == 1
+    assert len(terminal.positions_get()) == 2
+
+
+def test_close_position_fetches_one_tick(terminal, virtual_clock):
+    ticket = terminal.add_position("EURUSD", type=terminal.ORDER_TYPE_BUY, volume=0.1)
+    terminal.calls.clear()
+    close_position(ticket, "EURUSD", terminal.ORDER_TYPE_BUY, 0.1)
+    assert terminal.calls["symbol_info_tick"] == 1
+    assert terminal.positions_get() == ()
@@ -0,0 +1,97 @@
+import io
+import json
+
+import fake_mt5
+import mt5_trade_manager
+from mt5_trade_manager import ensure_connected, handle_request, serve
+from symbol_cache import get_symbol_info
+
+
+def test_handle_request(terminal):
+    terminal.add_position("EURUSD")
+    response = handle_request({"id": 7, "command": "get_open_trades"})
+    assert response["id"] == 7
+    assert [trade["symbol"] for trade in response["result"]] == ["EURUSD"]
+
+    response = handle_request({"id": 8, "command": "no_such_command"})
+    assert response == {"id": 8, "error": "Unknown command: no_such_command"}
+
+
+def test_handle_request_runs_in_session(terminal):
+    terminal.add_account(1001, "secret", "Fake-Demo", balance=500.0)
+    assert handle_request(
+        {"id": 1, "command": "login", "args": [1001, "secret", "Fake-Demo"]}
+    )["result"] == {"success": True}
+    response = handle_request(
+        {
+            "id": 2,
+            "command": "get_open_trades",
+            "session": {"login": 1001, "server": "Fake-Demo"},
+        }
+    )
+    assert response == {"id": 2, "result": []}
+
+    response = handle_request(
+        {
+            "id": 3,
+            "command": "get_open_trades",
+            "session": {"login": 2002, "server": "Fake-Demo"},
+        }
+    )
+    assert "No open session" in response["error"]
+
+
+def test_serve_answers_one_line_per_request(terminal):
+    terminal.add_position("EURUSD")
+    terminal.add_position("EURUSD")
+    requests = [
+        {"id": 1, "command": "get_open_trades"},
+        "not json",
+        {"id": 2, "command": "get_open_trades", "stream": True},
+        {"id": 3, "command": "is_autotrade_active"},
+    ]
+    stdin = io.StringIO(
+        "\n".join(r if isinstance(r, str) else json.dumps(r) for r in requests) + "\n\n"
+    )
+    stdout = io.StringIO()
+    serve(stdin, stdout)
+    lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    assert lines[0]["id"] == 1 and len(lines[0]["result"]) == 2
+    assert lines[1] == {"id": None, "error": "Invalid JSON request"}
+    # The streamed request sends one line per position, then a closing result
+    assert [line["id"] for line in lines[2:5]] == [2, 2, 2]
+    assert "item" in lines[2] and "item" in lines[3]
+    assert lines[4]["result"] == {"streamed": 2}
+    assert lines[5]["id"] == 3 and "result" in lines[5]
+    assert len(lines) == 6
+    # The terminal is shut down when stdin closes
+    assert terminal.calls["shutdown"] == 1
+
+
+def test_ensure_connected_reconnects_and_drops_caches(terminal):
+    get_symbol_info("EURUSD")
+    terminal.drop_connection()
+    terminal.fail_next_initialize(2)
+    assert ensure_connected(retries=3, backoff=0)
+    assert terminal.calls["initialize"] == 3
+    # The symbol cache started over, so the next lookup hits the terminal
+    symbol_info_calls = terminal.calls["symbol_info"]
+    get_symbol_info("EURUSD")
+    assert terminal.calls["symbol_info"] == symbol_info_calls + 1
+
+
+def test_ensure_connected_gives_up(terminal):
+    terminal.drop_connection()
+    terminal.fail_next_initialize(5)
+    assert not ensure_connected(retries=3, backoff=0)
+    assert terminal.calls["initialize"] == 3
+
+
+def test_handle_request_reports_lost_terminal(terminal, monkeypatch):
+    monkeypatch.setattr(
+        mt5_trade_manager, "ensure_connected", lambda: fake_mt5.terminal_info() is not None
+    )
+    terminal.drop_connection()
+    response = handle_request({"id": 4, "command": "get_open_trades"})
+    assert response == {"id": 4, "error": "Failed to connect to MT5"}